@@ -0,0 +1,193 @@
+from argparse import ArgumentParser, Namespace
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable
+import json
+import platform
+import subprocess
+import tracemalloc
+from utils import *
+from genetic_algorithm import *
+from random import seed as random_seed
+from time import perf_counter
+
+
+def seed_generators(seed: int) -> None:
+	"""
+	Seeds the random generators used by the solver
+	:param seed: the seed
+	"""
+	random_seed(seed)
+	np.random.seed(seed % 2**32)
+
+
+def measure(name: str, function: Callable[[int], Any], repetitions: int, seed: int, track_memory: bool) -> tuple[dict[str, Any], Any]:
+	"""
+	Runs a function a fixed number of times with seeded generators, and measures its speed, then its peak memory in a second identical pass
+	The memory is measured in its own pass because tracemalloc slows down the allocations, and so the timings
+	:param name: name of the benchmark
+	:param function: function to run, called with the index of the repetition
+	:param repetitions: number of calls
+	:param seed: seed of the random generators, the same for both passes
+	:param track_memory: False to skip the memory pass
+	:return: the measures, and the value returned by the last call
+	"""
+	seed_generators(seed)
+	start_time = perf_counter()
+	for i in range(repetitions):
+		value = function(i)
+	seconds = perf_counter() - start_time
+
+	peak_memory = None
+	if track_memory:
+		seed_generators(seed)
+		tracemalloc.start()
+		for i in range(repetitions):
+			function(i)
+		peak_memory = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+
+	return {
+		"benchmark": name,
+		"repetitions": repetitions,
+		"seconds": seconds,
+		"operations_per_second": repetitions / seconds if seconds else None,
+		"peak_memory_bytes": peak_memory
+	}, value
+
+
+def benchmark_instance(instance_path: Path, arguments: Namespace) -> list[dict[str, Any]]:
+	"""
+	Benchmarks the building blocks and the genetic algorithm on an instance
+	The building blocks run on a fixed set of solutions built from the same seed, so that every version of the solver does the same work
+	:param instance_path: path to the folder of the instance
+	:param arguments: the parsed arguments
+	:return: the measures of each benchmark
+	"""
+	instance = open_instance(instance_path)
+	repetitions = arguments.repetitions
+	seed_generators(arguments.seed)
+	solutions = list(generate_initial_population(instance, arguments.size))
+	mutated_solutions = [solution.copy() for solution in solutions]
+	for solution in mutated_solutions:
+		solution.mutate(instance, arguments.mutated_genes_rate)
+	evaluated_solutions = solutions + mutated_solutions  # valid and possibly invalid solutions, as in a generation
+	results = []
+
+	result, _ = measure("nearest_neighbour", lambda i: get_nearest_neighbour_solution(instance), repetitions, arguments.seed, arguments.memory)
+	results.append(result)
+
+	def get_fitness(i: int) -> float:
+		solution = evaluated_solutions[i % len(evaluated_solutions)]
+		solution.evaluation = None  # the evaluation is stored in the solution, it is forgotten to be computed again
+		return solution.get_fitness(instance)
+
+	result, _ = measure("get_fitness", get_fitness, repetitions, arguments.seed, arguments.memory)
+	result["evaluations_per_second"] = result["operations_per_second"]
+	results.append(result)
+
+	def is_valid(i: int) -> bool:
+		solution = evaluated_solutions[i % len(evaluated_solutions)]
+		solution.evaluation = None
+		return solution.is_valid(instance)
+
+	result, _ = measure("is_valid", is_valid, repetitions, arguments.seed, arguments.memory)
+	result["evaluations_per_second"] = result["operations_per_second"]
+	results.append(result)
+
+	result, _ = measure("crossover", lambda i: crossover(solutions[i % len(solutions)], solutions[(i + 1) % len(solutions)], instance.missions_nb), repetitions, arguments.seed, arguments.memory)
+	results.append(result)
+
+	result, _ = measure("mutate", lambda i: mutated_solutions[i % len(mutated_solutions)].mutate(instance, arguments.mutated_genes_rate), repetitions, arguments.seed, arguments.memory)
+	results.append(result)
+
+	fitness_caches = []  # cache of each run, whose misses are the children actually evaluated
+
+	def run_genetic_algorithm(_: int) -> Solution:
+		fitness_caches.append(FitnessCache())
+		with redirect_stdout(StringIO()):
+			return genetic_algorithm(instance, arguments.size, arguments.crossover_rate, arguments.mutation_rate, float("inf"), arguments.tournament_size, arguments.mutated_genes_rate, fitness_cache=fitness_caches[-1], max_iterations=arguments.iterations)
+
+	result, solution = measure("genetic_algorithm", run_genetic_algorithm, 1, arguments.seed, arguments.memory)
+	fitness_cache = fitness_caches[0]  # the cache of the timed run, the memory pass being identical
+	children_per_iteration = 2 * round(arguments.crossover_rate * arguments.size / 2)
+	fitness = solution.evaluate(instance)
+	result.update({
+		"iterations": arguments.iterations,
+		"iterations_per_second": arguments.iterations / result["seconds"],
+		# the initial population and the children missing from the fitness cache are the only calls of the evaluator
+		"evaluations_per_second": (arguments.size + fitness_cache.misses) / result["seconds"],
+		"children_per_second": arguments.iterations * children_per_iteration / result["seconds"],
+		"fitness_cache_hit_rate": fitness_cache.get_hit_rate(),
+		"best_fitness": {"assignments_nb": fitness.assignments_nb, "travel_cost": fitness.travel_cost, "corresponding_specialities_nb": fitness.specialities_nb},
+		"valid": solution.is_valid(instance)
+	})
+	results.append(result)
+
+	for result in results:
+		result["instance"] = instance_path.name
+	return results
+
+
+def get_version() -> str:
+	"""
+	Returns the git commit of the solver, to compare the results of several versions
+	:return: the commit hash, None if it is not available
+	"""
+	try:
+		return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def parse_arguments(arguments: list[str] = None) -> Namespace:
+	"""
+	Parses the command line arguments
+	:param arguments: the arguments, the ones of the command line by default
+	:return: the parsed arguments
+	"""
+	parser = ArgumentParser(description="Benchmarks the solver with fixed seeds and iteration counts, and writes the results as JSON.")
+	parser.add_argument("instances", nargs="*", type=Path, help="instance folders to benchmark, all the bundled instances by default")
+	parser.add_argument("-o", "--output", type=Path, default=Path("benchmark.json"), help="JSON file where the results are written")
+	parser.add_argument("--seed", type=int, default=0, help="seed of the random generators")
+	parser.add_argument("-r", "--repetitions", type=int, default=1000, help="number of calls of each building block")
+	parser.add_argument("-i", "--iterations", type=int, default=100, help="number of iterations of the genetic algorithm")
+	parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the peak memory measures, which run every benchmark a second time")
+	parser.add_argument("-s", "--size", type=int, default=DEFAULT_POPULATION_SIZE, help="population size")
+	parser.add_argument("-c", "--crossover-rate", type=float, default=DEFAULT_CROSSOVER_RATE, help="probability of crossover")
+	parser.add_argument("-m", "--mutation-rate", type=float, default=DEFAULT_MUTATION_RATE, help="probability of mutation")
+	parser.add_argument("-k", "--tournament-size", type=int, default=DEFAULT_TOURNAMENT_SIZE, help="number of individuals to consider in tournament selection")
+	parser.add_argument("-g", "--mutated-genes-rate", type=float, default=DEFAULT_MUTATED_GENES_PER_CHROMOSOME_RATE, help="rate of the assigned genes to mutate")
+	arguments = parser.parse_args(arguments)
+	if arguments.repetitions <= 0 or arguments.iterations <= 0 or arguments.size <= 0 or arguments.tournament_size <= 0:
+		parser.error("the repetitions, iterations, population size and tournament size must be positive")
+	if not arguments.instances:
+		arguments.instances = sorted(path for path in (Path(__file__).parent / "instances").iterdir() if (path / "missions.csv").is_file())
+	return arguments
+
+
+if __name__ == "__main__":
+
+	arguments = parse_arguments()
+
+	results = []
+	for instance_path in arguments.instances:
+		for result in benchmark_instance(instance_path, arguments):
+			print(f"{result['instance']} {result['benchmark']}: {round(result['operations_per_second'], 1)} op/s" + (f", {round(result['evaluations_per_second'])} evaluations/s" if "evaluations_per_second" in result else "") + (f", {round(result['children_per_second'])} children/s, {round(100 * result['fitness_cache_hit_rate'], 1)}% cache hits" if "children_per_second" in result else "") + (f", {round(result['peak_memory_bytes'] / 1024)} KiB peak" if result["peak_memory_bytes"] is not None else ""))
+			results.append(result)
+
+	report = {
+		"version": get_version(),
+		"date": datetime.now(timezone.utc).isoformat(),
+		"python": platform.python_version(),
+		"numpy": np.__version__,
+		"machine": platform.platform(),
+		"parameters": {name: str(value) if isinstance(value, Path) else value for name, value in vars(arguments).items() if name not in ("instances", "output")},
+		"results": results
+	}
+	with open(arguments.output, "w") as f:
+		json.dump(report, f, indent=4)
+
+	print(f"Results written to {arguments.output}")
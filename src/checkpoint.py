@@ -0,0 +1,156 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any
+import os
+import random
+import numpy as np
+from models.fitness import FITNESS_DTYPE, Fitness
+from models.population import Population
+from fitness_cache import FitnessCache
+
+
+CHECKPOINT_VERSION = 1  # version of the checkpoint format, a checkpoint of another version cannot be resumed
+
+
+class Checkpoint:
+	"""
+	State of a run of the genetic algorithm, saved periodically so that a run stopped by a crash or a preemption can be resumed
+	It is written as one compressed .npz file: the population, the best individual, the evaluations of the fitness cache,
+	the states of the random generators and the counters of the run, without any pickled object
+	"""
+
+	population: Population  		# the population, sorted by decreasing fitness
+	best_assignments: np.ndarray  	# the best individual found, as a row of the population matrix
+	fitness_cache: FitnessCache  	# the evaluations of the children, None if they are not saved
+	searched: set[int]  			# hashes of the individuals of the population already improved by local search
+	counters: dict[str, float]  	# counters of the run, with the state of its controller, see RunController.get_state()
+	random_state: tuple  			# state of the random module
+	numpy_random_state: tuple  		# state of the global numpy generator
+
+
+	def __init__(self, population: Population, best_assignments: np.ndarray, fitness_cache: FitnessCache, searched: set[int], counters: dict[str, float], random_state: tuple = None, numpy_random_state: tuple = None) -> None:
+		self.population = population
+		self.best_assignments = best_assignments
+		self.fitness_cache = fitness_cache
+		self.searched = searched
+		self.counters = counters
+		self.random_state = random.getstate() if random_state is None else random_state
+		self.numpy_random_state = np.random.get_state() if numpy_random_state is None else numpy_random_state
+
+
+	def save(self, path: Path) -> None:
+		"""
+		Writes the checkpoint, to a temporary file renamed at the end so that a crash while writing keeps the previous checkpoint
+		:param path: path of the .npz file
+		"""
+		entries = list(self.fitness_cache.entries.items()) if self.fitness_cache is not None else []
+		version, mt_state, gauss_next = self.random_state
+		algorithm, keys, position, has_gauss, cached_gaussian = self.numpy_random_state
+		counter_names = sorted(self.counters)
+
+		temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+		with open(temporary_path, "wb") as f:
+			np.savez_compressed(
+				f,
+				version=np.array(CHECKPOINT_VERSION),
+				assignments=self.population.assignments,
+				fitnesses=self.population.fitnesses,
+				best_assignments=self.best_assignments,
+				cache_keys=np.array([key for key, _ in entries], dtype=np.uint64),
+				cache_valid=np.array([value[0] for _, value in entries], dtype=bool),
+				cache_fitnesses=np.array([tuple(value[1]) for _, value in entries], dtype=FITNESS_DTYPE),
+				cache_max_entries=np.array(self.fitness_cache.max_entries if self.fitness_cache is not None else 0),
+				searched=np.array(sorted(self.searched), dtype=np.uint64),
+				counter_names=np.array(counter_names),
+				counter_values=np.array([float(self.counters[name]) for name in counter_names], dtype=np.float64),
+				random_state=np.array((version, *mt_state), dtype=np.int64),
+				random_gauss=np.array(np.nan if gauss_next is None else gauss_next),
+				numpy_random_keys=keys,
+				numpy_random_state=np.array((position, has_gauss, cached_gaussian), dtype=np.float64)
+			)
+		os.replace(temporary_path, path)
+
+
+	@staticmethod
+	def load(path: Path, missions_nb: int) -> Checkpoint:
+		"""
+		Reads a checkpoint
+		:param path: path of the .npz file
+		:param missions_nb: number of missions of the instance being solved, to check that the checkpoint belongs to it
+		:return: the checkpoint
+		"""
+		with np.load(path, allow_pickle=False) as data:
+			if int(data["version"]) != CHECKPOINT_VERSION:
+				raise ValueError(f"the checkpoint {path} has version {int(data['version'])}, expected {CHECKPOINT_VERSION}")
+			if data["assignments"].shape[1] != missions_nb:
+				raise ValueError(f"the checkpoint {path} has {data['assignments'].shape[1]} missions, the instance has {missions_nb} missions")
+
+			fitness_cache = None
+			if int(data["cache_max_entries"]) > 0:
+				fitness_cache = FitnessCache(int(data["cache_max_entries"]))
+				for key, is_valid, fitness in zip(data["cache_keys"].tolist(), data["cache_valid"].tolist(), data["cache_fitnesses"].tolist()):
+					fitness_cache.put(key, (is_valid, Fitness(*fitness)))
+
+			random_state = data["random_state"].tolist()
+			random_gauss = float(data["random_gauss"])
+			position, has_gauss, cached_gaussian = data["numpy_random_state"].tolist()
+
+			return Checkpoint(
+				Population(data["assignments"], data["fitnesses"]),
+				data["best_assignments"],
+				fitness_cache,
+				set(data["searched"].tolist()),
+				dict(zip(data["counter_names"].tolist(), data["counter_values"].tolist())),
+				(random_state[0], tuple(random_state[1:]), None if np.isnan(random_gauss) else random_gauss),
+				("MT19937", data["numpy_random_keys"], int(position), int(has_gauss), cached_gaussian)
+			)
+
+
+	def restore_random_states(self) -> None:
+		"""
+		Puts the random generators back in the state they had when the checkpoint was taken
+		"""
+		random.setstate(self.random_state)
+		np.random.set_state(self.numpy_random_state)
+
+
+class ConvergenceLog:
+	"""
+	History of the best solutions of a run, written as CSV one line per improvement and flushed at once,
+	so that the convergence of a long run can be followed while it runs, and survives a crash
+	A resumed run appends to the history of the run it resumes
+	"""
+
+	FIELDS = ("iteration", "elapsed_time", "assignments_nb", "travel_cost", "specialities_nb")
+
+	file: Any  # the file of the history
+
+
+	def __init__(self, path: Path, append: bool = False) -> None:
+		"""
+		:param path: path of the .csv file
+		:param append: True to append to an existing history, False to start a new one
+		"""
+		is_new = not append or not path.is_file() or path.stat().st_size == 0
+		self.file = open(path, "a" if append else "w")
+		if is_new:
+			self.file.write(",".join(self.FIELDS) + "\n")
+			self.file.flush()
+
+
+	def write(self, iteration: int, elapsed_time: float, fitness: Fitness) -> None:
+		"""
+		Writes an improvement of the best solution
+		:param iteration: iteration at which it was found
+		:param elapsed_time: time since the start of the run, in seconds
+		:param fitness: its fitness
+		"""
+		self.file.write(f"{iteration},{round(elapsed_time, 3)},{fitness.assignments_nb},{fitness.travel_cost},{fitness.specialities_nb}\n")
+		self.file.flush()
+
+
+	def close(self) -> None:
+		"""
+		Closes the file of the history
+		"""
+		self.file.close()
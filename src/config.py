@@ -2,4 +2,26 @@ TRAVEL_SPEED = 50 / 60  # km/min
 MAX_DAILY_WORK_TIME = 7 * 60  # min
 MAX_WEEKLY_WORK_TIME = 35 * 60  # min
 MAX_DAILY_TIME_RANGE = 13 * 60  # min
-COST_PER_KM = .2  # cost per kilometer
\ No newline at end of file
+COST_PER_KM = .2  # cost per kilometer
+FITNESS_CACHE_MAX_ENTRIES = 200_000  # maximum number of evaluations kept by a FitnessCache, around 200 bytes each
+DEFAULT_POPULATION_SIZE = 100  # default parameters of the genetic algorithm
+DEFAULT_CROSSOVER_RATE = .7
+DEFAULT_MUTATION_RATE = .8
+DEFAULT_MAX_EXECUTION_TIME = 60  # s
+DEFAULT_TOURNAMENT_SIZE = 5
+DEFAULT_MUTATED_GENES_PER_CHROMOSOME_RATE = .025
+EARTH_RADIUS = 6371.  # km, used by the haversine distances
+SPARSE_DISTANCE_DETOUR_FACTOR = 1.  # factor applied to the straight distances computed for the pairs missing from a sparse distance matrix, around 1.3 for road distances
+INSTANCE_CACHE_FOLDER = ".instance_cache"  # folder of the binary cache, in each instance folder
+INSTANCE_CACHE_VERSION = 1  # version of the binary cache format, a cache of another version is rebuilt
+DENSE_DISTANCE_TABLE_MAX_MISSIONS = 2000  # above this number of missions, the distances between missions are read from the matrix instead of being copied into nested lists
+LOCAL_SEARCH_MAX_EVALUATIONS = 20_000  # maximum number of moves evaluated by one local search
+DEFAULT_LOCAL_SEARCH_ELITES = 0  # number of best individuals improved by local search at each iteration of the genetic algorithm, 0 to disable it
+DEFAULT_MIGRATION_INTERVAL = 50  # number of iterations of each island of the island model between two migrations
+DEFAULT_MIGRANTS = 2  # number of individuals sent by each island at each migration
+PERTURBATION_MUTATED_GENES_RATE = .2  # rate of the assigned genes mutated when a stalled population is perturbed
+CHECKPOINT_INTERVAL = 60  # s, time between two checkpoints of a run of the genetic algorithm
+REOPTIMIZATION_MAX_EXECUTION_TIME = 5  # s, default time budget of an incremental re-optimisation
+REOPTIMIZATION_CANDIDATE_EMPLOYEES = 3  # number of employees, the nearest ones with its skill, that may take a mission left without employee by a change
+EXACT_MAX_NODES = 2_000_000  # maximum number of nodes of the branch and bound of one part of an instance
+EXACT_MAX_PART_MISSIONS = 400  # parts of an instance with more missions are not searched by the exact solver, their upper bound only is computed
@@ -0,0 +1,101 @@
+from __future__ import annotations
+from multiprocessing import Pool
+from os import cpu_count
+from random import Random, seed as random_seed
+from time import time
+from typing import Callable
+import numpy as np
+from models.instance import Instance
+from models.solution import Solution
+
+
+DECOMPOSITIONS = ("skill", "skill_center")  # how an instance is split into independent parts
+
+
+def get_parts(instance: Instance, decomposition: str = "skill") -> list[tuple[list[int],list[int]]]:
+	"""
+	Splits an instance into parts solved independently
+	As a mission can only be assigned to an employee with its skill, the parts of the "skill" decomposition are independent and lose nothing,
+	the "skill_center" decomposition also splits each skill by center, a mission going to the part of the nearest center having employees with its skill,
+	which gives smaller parts but forbids assigning a mission to an employee of another center
+	The missions whose skill no employee has cannot be assigned, and belong to no part
+	:param instance: the instance
+	:param decomposition: one of DECOMPOSITIONS
+	:return: the mission ids and the employee ids of each part having missions
+	"""
+	if decomposition not in DECOMPOSITIONS:
+		raise ValueError(f"unknown decomposition {decomposition}, expected one of {DECOMPOSITIONS}")
+
+	parts: dict[tuple[str,int], tuple[list[int],list[int]]] = dict()  # mission ids and employee ids by skill and center, the center being 0 for the "skill" decomposition
+	for employee_id, employee in sorted(instance.employees.items()):
+		parts.setdefault((employee.skill, employee.center_id if decomposition == "skill_center" else 0), ([], []))[1].append(employee_id)
+
+	centers_by_skill: dict[str, list[int]] = dict()
+	for skill, center_id in parts:
+		centers_by_skill.setdefault(skill, []).append(center_id)
+	for mission_id, mission in sorted(instance.missions.items()):
+		centers = centers_by_skill.get(mission.skill)
+		if centers is None:
+			continue
+		center_id = min(centers, key=lambda center_id: (instance.departure_distance_table[center_id][mission_id], center_id)) if decomposition == "skill_center" else 0
+		parts[(mission.skill, center_id)][0].append(mission_id)
+
+	return [part for part in parts.values() if part[0]]
+
+
+def _solve_part(engine: Callable[[Instance, float], Solution], part: Instance, max_execution_time: float, seed: int) -> np.ndarray:
+	"""
+	Solves a part of an instance, in a worker process or in the calling process
+	:param engine: the solver, taking an instance and a time budget in seconds and returning a solution of the instance
+	:param part: the part, as an instance
+	:param max_execution_time: time budget of the part, in seconds
+	:param seed: seed of the random generators for this part
+	:return: the assignments of the solution of the part, as a row of a population matrix
+	"""
+	random_seed(seed)
+	np.random.seed(seed % 2**32)
+	return engine(part, max_execution_time).to_array(part.missions_nb)
+
+
+def solve_by_parts(instance: Instance, engine: Callable[[Instance, float], Solution], max_execution_time: float, decomposition: str = "skill", processes_nb: int = None, seed: int = None) -> Solution:
+	"""
+	Splits an instance into independent parts, see get_parts, solves them at once on a pool of processes, and merges their solutions
+	Each part is extracted as an instance of its own, with renumbered missions and employees, so that any solver works on it unchanged,
+	and the fitnesses adding up over the employees, the merged solution is as good as its parts
+	The solve stays within its time budget: the parts solved at once share it, and the parts solved one after the other split it,
+	each one in this process getting the time left divided by the number of parts left
+	:param instance: the instance
+	:param engine: the solver of the parts, taking an instance and a time budget in seconds and returning a solution of the instance,
+	such as a functools.partial of a function calling genetic_algorithm, it must be picklable to run in other processes
+	:param max_execution_time: time budget of the whole solve, in seconds
+	:param decomposition: one of DECOMPOSITIONS
+	:param processes_nb: number of processes solving the parts, one per part up to the number of CPU cores by default, 1 to solve them one after the other in this process
+	:param seed: seed of the run, None for a random one
+	:return: the solution of the instance
+	"""
+	start_time = time()
+	parts = get_parts(instance, decomposition)
+	rng = Random(seed)
+	tasks = [(engine, instance.extract(mission_ids, employee_ids), rng.getrandbits(63)) for mission_ids, employee_ids in parts]
+	processes_nb = min(processes_nb or cpu_count() or 1, len(tasks))
+
+	print(f"  {len(parts)} parts of {', '.join(str(len(mission_ids)) for mission_ids, _ in parts)} missions, solved by {max(processes_nb, 1)} processes")
+
+	if processes_nb > 1:
+		# the pool solves the parts in rounds of processes_nb parts, each round getting its share of the budget
+		rounds_nb = -(-len(tasks) // processes_nb)
+		part_max_execution_time = (max_execution_time - (time() - start_time)) / rounds_nb
+		with Pool(processes_nb) as pool:
+			part_assignments = pool.starmap(_solve_part, [(engine, part, part_max_execution_time, part_seed) for engine, part, part_seed in tasks])
+	else:
+		part_assignments = []
+		for index, (engine, part, part_seed) in enumerate(tasks):
+			part_max_execution_time = (max_execution_time - (time() - start_time)) / (len(tasks) - index)
+			part_assignments.append(_solve_part(engine, part, part_max_execution_time, part_seed))
+
+	solution = Solution()
+	for (mission_ids, employee_ids), assignments in zip(parts, part_assignments):
+		for part_mission_id, part_employee_id in enumerate(assignments.tolist(), 1):
+			if part_employee_id != 0:
+				solution.assignments[mission_ids[part_mission_id - 1]] = employee_ids[part_employee_id - 1]
+	return solution
@@ -0,0 +1,536 @@
+from __future__ import annotations
+from itertools import accumulate
+from config import *
+from models.instance import Instance
+from models.mission import Mission
+from models.solution import Solution
+from decomposition import get_parts
+
+
+def get_exact_parts(instance: Instance) -> list[tuple[list[int],list[int]]]:
+	"""
+	Splits an instance into the independent parts solved by the exact solver
+	The parts are the skills, see decomposition.get_parts, and each skill is also split by day when the weekly work time cannot be reached,
+	i.e. when the instance has no more days than MAX_WEEKLY_WORK_TIME allows at MAX_DAILY_WORK_TIME per day, as the days of an employee are then independent
+	:param instance: the instance
+	:return: the mission ids, in chronological order, and the employee ids of each part
+	"""
+	days = sorted({mission.day for mission in instance.missions.values()})
+	by_day = len(days) * MAX_DAILY_WORK_TIME <= MAX_WEEKLY_WORK_TIME
+	rank = {mission_id: position for position, mission_id in enumerate(instance.chronological_order.tolist())}
+	exact_parts = []
+	for mission_ids, employee_ids in get_parts(instance, "skill"):
+		mission_ids = sorted(mission_ids, key=rank.__getitem__)
+		if not by_day:
+			exact_parts.append((mission_ids, employee_ids))
+			continue
+		for day in days:
+			day_mission_ids = [mission_id for mission_id in mission_ids if instance.missions[mission_id].day == day]
+			if day_mission_ids:
+				exact_parts.append((day_mission_ids, employee_ids))
+	return exact_parts
+
+
+def get_interval_bound(missions: list[Mission], machines_nb: int) -> int:
+	"""
+	Returns the maximum number of missions that machines_nb employees can take if the travel times and the work time limits are ignored,
+	each employee only needing its missions not to overlap, for missions of the same day
+	This is interval scheduling on identical machines, solved exactly by taking the missions by end time,
+	each one on the employee free the latest before its start
+	:param missions: the missions
+	:param machines_nb: number of employees
+	:return: the number of missions
+	"""
+	free_times = [-1.] * machines_nb  # end of the last mission taken by each employee
+	count = 0
+	for mission in sorted(missions, key=lambda mission: mission.end_time):
+		latest = -1
+		for machine, free_time in enumerate(free_times):
+			if free_time < mission.start_time and (latest == -1 or free_time > free_times[latest]):
+				latest = machine
+		if latest != -1:
+			free_times[latest] = mission.end_time
+			count += 1
+	return count
+
+
+def get_work_time_bound(instance: Instance, missions: list[Mission], employee_ids: list[int]) -> int:
+	"""
+	Returns the maximum number of missions of the same day that some employees can take within MAX_DAILY_WORK_TIME,
+	each employee taking the shortest missions, with the shortest trip from its center and back
+	:param instance: the instance
+	:param missions: the missions
+	:param employee_ids: ids of the employees
+	:return: the number of missions
+	"""
+	durations = sorted(mission.end_time - mission.start_time for mission in missions)
+	count = 0
+	for employee_id in employee_ids:
+		center_id = instance.employees[employee_id].center_id
+		travel_time = min(instance.departure_travel_time_table[center_id][mission.id] for mission in missions) + min(instance.return_travel_time_table[mission.id][center_id] for mission in missions)
+		count += sum(1 for work_time in accumulate(durations) if work_time + travel_time <= MAX_DAILY_WORK_TIME)
+	return count
+
+
+class ChainBounds:
+	"""
+	Bounds the number of missions of one day that an employee can take within MAX_DAILY_WORK_TIME, by the shortest work time of each chain length:
+	a chain is a sequence of missions that can follow each other, the first one leaving the center and the last one going back to it,
+	and its work time counts the durations and the travel times as Schedule.add_mission does
+	Each employee is bounded on its own, so the bound of several employees ignores that they compete for the same missions
+	"""
+
+	instance: Instance  		# the instance
+	missions: list[Mission]  	# missions of the day, in chronological order
+	max_length: int  			# length of the longest chain whose durations alone fit in MAX_DAILY_WORK_TIME
+	chain_work_times: dict[int, list[list[float]]]  # by center, [m][length - 1] is the shortest work time of a chain of this length starting at mission m, inf if none
+	empty_lengths: dict[int, list[int]]  			# by center, [i] is the longest chain among the missions i and after that fits in the work time of an empty day
+	next_work_times: dict[int, list[list[float]]]  	# by center, [m][length - 1] is the shortest work time added by a chain of this length after mission m
+
+
+	def __init__(self, instance: Instance, missions: list[Mission], center_ids: set[int]) -> None:
+		"""
+		:param instance: the instance
+		:param missions: missions of the day, in chronological order
+		:param center_ids: centers of the employees
+		"""
+		self.instance = instance
+		self.missions = missions
+		self.max_length = sum(1 for work_time in accumulate(sorted(mission.end_time - mission.start_time for mission in missions)) if work_time <= MAX_DAILY_WORK_TIME)
+		self.chain_work_times = dict()
+		self.empty_lengths = dict()
+		self.next_work_times = dict()
+		travel_times = instance.mission_travel_time_table
+		missions_nb = len(missions)
+		inf = float("inf")
+		# followers[m] are the missions that can follow mission m on the same day, with the travel time to them
+		followers = [[(n, travel_times[mission.id][missions[n].id]) for n in range(m + 1, missions_nb) if missions[n].start_time > mission.end_time and mission.end_time + travel_times[mission.id][missions[n].id] <= missions[n].start_time] for m, mission in enumerate(missions)]
+
+		for center_id in center_ids:
+			return_travel_times = [instance.return_travel_time_table[mission.id][center_id] for mission in missions]
+			chains = [[inf] * self.max_length for _ in range(missions_nb)]
+			next_work_times = [[inf] * self.max_length for _ in range(missions_nb)]
+			for m in range(missions_nb - 1, -1, -1):
+				duration = missions[m].end_time - missions[m].start_time
+				chains[m][0] = duration + return_travel_times[m]
+				for n, travel_time in followers[m]:
+					for length in range(1, self.max_length):
+						next_work_time = travel_time + chains[n][length - 1] - return_travel_times[m]
+						if next_work_time < next_work_times[m][length - 1]:
+							next_work_times[m][length - 1] = next_work_time
+						if duration + return_travel_times[m] + next_work_time < chains[m][length]:
+							chains[m][length] = duration + return_travel_times[m] + next_work_time
+				if followers[m] and self.max_length:
+					next_work_times[m][self.max_length - 1] = min(travel_time + chains[n][self.max_length - 1] - return_travel_times[m] for n, travel_time in followers[m])
+
+			empty_lengths = [0] * (missions_nb + 1)
+			shortest = [inf] * self.max_length  # shortest work time of each chain length among the missions i and after, leaving the center
+			for i in range(missions_nb - 1, -1, -1):
+				departure_travel_time = instance.departure_travel_time_table[center_id][missions[i].id]
+				for length in range(self.max_length):
+					shortest[length] = min(shortest[length], departure_travel_time + chains[i][length])
+				empty_lengths[i] = max((length + 1 for length in range(self.max_length) if shortest[length] <= MAX_DAILY_WORK_TIME), default=0)
+			self.chain_work_times[center_id] = chains
+			self.empty_lengths[center_id] = empty_lengths
+			self.next_work_times[center_id] = next_work_times
+
+
+	def get_next_length(self, center_id: int, m: int, work_time: float) -> int:
+		"""
+		Returns the longest chain an employee whose day ends with a mission can still add within MAX_DAILY_WORK_TIME
+		:param center_id: center of the employee
+		:param m: index of the last mission of its day
+		:param work_time: work time of its day
+		:return: the length of the chain
+		"""
+		next_work_times = self.next_work_times[center_id][m]
+		for length in range(self.max_length, 0, -1):
+			if work_time + next_work_times[length - 1] <= MAX_DAILY_WORK_TIME:
+				return length
+		return 0
+
+
+def get_part_upper_bound(instance: Instance, mission_ids: list[int], employee_ids: list[int], use_chains: bool = True) -> int:
+	"""
+	Returns an upper bound of the number of missions of a part that can be assigned, the best of the interval, work time and chain bounds of each day
+	:param instance: the instance
+	:param mission_ids: ids of the missions of the part
+	:param employee_ids: ids of the employees of the part
+	:param use_chains: False not to compute the chain bounds, which take a time cubic in the number of missions of a day
+	:return: the upper bound
+	"""
+	missions_by_day: dict[int, list[Mission]] = dict()
+	for mission_id in mission_ids:
+		missions_by_day.setdefault(instance.missions[mission_id].day, []).append(instance.missions[mission_id])
+	upper_bound = 0
+	for missions in missions_by_day.values():
+		day_bound = min(len(missions), get_interval_bound(missions, len(employee_ids)), get_work_time_bound(instance, missions, employee_ids))
+		if use_chains and len(missions) <= EXACT_MAX_PART_MISSIONS:
+			missions.sort(key=lambda mission: (mission.start_time, mission.id))
+			center_ids = [instance.employees[employee_id].center_id for employee_id in employee_ids]
+			chain_bounds = ChainBounds(instance, missions, set(center_ids))
+			day_bound = min(day_bound, sum(chain_bounds.empty_lengths[center_id][0] for center_id in center_ids))
+		upper_bound += day_bound
+	return upper_bound
+
+
+def get_assignments_upper_bound(instance: Instance) -> int:
+	"""
+	Returns an upper bound of the number of missions that can be assigned in the instance, without any search
+	:param instance: the instance
+	:return: the upper bound
+	"""
+	return sum(get_part_upper_bound(instance, mission_ids, employee_ids) for mission_ids, employee_ids in get_exact_parts(instance))
+
+
+class PartSearch:
+	"""
+	Branch and bound on a part of an instance, finding the assignments of its missions with the best fitness:
+	the most missions assigned, then the shortest distance, then the most corresponding specialities
+	The missions are taken in chronological order and each one is given to each employee it fits, cheapest first, or left unassigned,
+	so that a mission is always appended at the end of its employee's day and checked as in Schedule.can_fit_in_schedule
+	The search runs first for the number of assignments only, which cuts far more branches and proves the upper bound of the part,
+	then for the distance and the specialities with this number of assignments:
+	a branch is cut when the number of missions left that can still be assigned, bounded as in get_part_upper_bound and, for a part of one day,
+	by the chains each employee can still add after its last mission, cannot beat the best assignments found,
+	or can only equal it with more distance, bounded by the smallest distance each mission can add
+	Employees with the same center and speciality whose day is empty are interchangeable, only the first of them is tried
+	The distance minimised is the exact distance, so the travel cost, its integer part, is optimal too,
+	but assignments a little longer may have the same travel cost and more corresponding specialities:
+	get_speciality_front() then searches the assignments of the best count within a distance limit, see solve_exact
+	"""
+
+	instance: Instance  		# the instance
+	missions: list[Mission]  	# missions of the part, in chronological order
+	employee_ids: list[int]  	# ids of the employees of the part
+	max_nodes: int  			# maximum number of nodes of the search, the search stops once reached
+	nodes: int  				# number of nodes searched
+	upper_bound: int  			# upper bound of the number of missions of the part that can be assigned, exact once the search completed
+	is_complete: bool  			# True if the search completed, so that the best assignments are optimal
+
+	remaining_bounds: list[int]  	# remaining_bounds[i] bounds the number of missions i and after that can be assigned, without the chain bounds
+	chain_bounds: ChainBounds  		# chain bounds of the missions, None if the part has several days
+	mission_indices: dict[int, int]  # index of each mission in the part, by id
+	center_ids: list[int]  			# center of each employee
+	minimum_added_distances: list[list[float]]  # minimum_added_distances[i] are the smallest distances that the missions i and after can add, sorted, cumulated
+	matching_missions: list[int]  	# matching_missions[i] is the number of missions i and after that an employee of their speciality can take
+
+	assignments: list[int]  		# index of the employee of each mission in the current branch, -1 if unassigned
+	last_missions: list[Mission]  	# last mission of the current day of each employee, None if its day is empty
+	days: list[int]  				# current day of each employee
+	first_starts: list[float]  		# start of the day of each employee, as checked by the daily time range
+	daily_work_times: list[float]  	# work time of the current day of each employee
+	weekly_work_times: list[float]  # work time of the week of each employee
+	count: int  					# number of missions assigned in the current branch
+	distance: float  				# distance traveled in the current branch
+	specialities: int  				# number of corresponding specialities in the current branch
+
+	best_assignments: list[int]  	# best assignments found, as assignments
+	best_count: int  				# number of missions assigned by the best assignments
+	best_distance: float  			# distance traveled with the best assignments
+	best_specialities: int  		# number of corresponding specialities of the best assignments
+	objective: str  				# "count" while searching the number of assignments, "fitness" while searching the best assignments, "front" while searching the speciality front
+	distance_limit: float  			# while searching the speciality front, maximum distance of the assignments
+	front: list[tuple[float,int,list[int]]]  # while searching the speciality front, distance, specialities and assignments of the non dominated assignments found
+
+
+	def __init__(self, instance: Instance, mission_ids: list[int], employee_ids: list[int], max_nodes: int = EXACT_MAX_NODES) -> None:
+		"""
+		:param instance: the instance
+		:param mission_ids: ids of the missions of the part, in chronological order
+		:param employee_ids: ids of the employees of the part
+		:param max_nodes: maximum number of nodes of the search
+		"""
+		self.instance = instance
+		self.missions = [instance.missions[mission_id] for mission_id in mission_ids]
+		self.employee_ids = employee_ids
+		self.max_nodes = max_nodes
+		self.nodes = 0
+		self.upper_bound = get_part_upper_bound(instance, mission_ids, employee_ids)
+		self.is_complete = False
+
+		missions_nb = len(self.missions)
+		specialities = {instance.employees[employee_id].speciality_code for employee_id in employee_ids}
+		self.remaining_bounds = [0] * (missions_nb + 1)
+		self.matching_missions = [0] * (missions_nb + 1)
+		self.minimum_added_distances = [[0.]] * (missions_nb + 1)
+		added_distances = [self.get_minimum_added_distance(i) for i in range(missions_nb)]
+		for i in range(missions_nb - 1, -1, -1):
+			self.remaining_bounds[i] = get_part_upper_bound(instance, mission_ids[i:], employee_ids, False)
+			self.matching_missions[i] = self.matching_missions[i + 1] + (self.missions[i].speciality_code in specialities)
+			self.minimum_added_distances[i] = [0.] + list(accumulate(sorted(added_distances[i:])))
+
+		self.center_ids = [instance.employees[employee_id].center_id for employee_id in employee_ids]
+		self.mission_indices = {mission.id: i for i, mission in enumerate(self.missions)}
+		self.chain_bounds = ChainBounds(instance, self.missions, set(self.center_ids)) if len({mission.day for mission in self.missions}) == 1 else None
+
+		employees_nb = len(employee_ids)
+		self.assignments = [-1] * missions_nb
+		self.last_missions = [None] * employees_nb
+		self.days = [-1] * employees_nb
+		self.first_starts = [0.] * employees_nb
+		self.daily_work_times = [0.] * employees_nb
+		self.weekly_work_times = [0.] * employees_nb
+		self.count = 0
+		self.distance = 0.
+		self.specialities = 0
+		self.best_assignments = [-1] * missions_nb
+		self.best_count = -1
+		self.best_distance = 0.
+		self.best_specialities = 0
+		self.objective = "count"
+		self.distance_limit = None
+		self.front = []
+
+
+	def get_minimum_added_distance(self, i: int) -> float:
+		"""
+		Returns the smallest distance that appending a mission to the day of one of the employees can add
+		:param i: index of the mission in the part
+		:return: the distance
+		"""
+		instance = self.instance
+		mission = self.missions[i]
+		minimum = None
+		for employee_id in self.employee_ids:
+			center_id = instance.employees[employee_id].center_id
+			return_distance = instance.return_distance_table[mission.id][center_id]
+			distance = instance.departure_distance_table[center_id][mission.id] + return_distance
+			for previous_mission in self.missions[:i]:
+				if previous_mission.day == mission.day and previous_mission.end_time + instance.mission_travel_time_table[previous_mission.id][mission.id] <= mission.start_time:
+					distance = min(distance, instance.mission_distance_table[previous_mission.id][mission.id] + return_distance - instance.return_distance_table[previous_mission.id][center_id])
+			minimum = distance if minimum is None else min(minimum, distance)
+		return minimum
+
+
+	def get_append(self, employee: int, mission: Mission) -> tuple[float,float] | None:
+		"""
+		Checks whether a mission can be appended to the current day of an employee, with the checks of Schedule.can_fit_in_schedule
+		:param employee: index of the employee in the part
+		:param mission: the mission, starting after the missions of the employee
+		:return: the work time and the distance added, None if the mission does not fit
+		"""
+		instance = self.instance
+		center_id = instance.employees[self.employee_ids[employee]].center_id
+		mission_duration = mission.end_time - mission.start_time
+		return_travel_time = instance.return_travel_time_table[mission.id][center_id]
+		last_mission = self.last_missions[employee] if self.days[employee] == mission.day else None
+
+		if last_mission is None:
+			added_travel_time = instance.departure_travel_time_table[center_id][mission.id] + return_travel_time
+			if not (mission_duration + added_travel_time <= MAX_DAILY_WORK_TIME
+					and self.weekly_work_times[employee] + mission_duration + added_travel_time <= MAX_WEEKLY_WORK_TIME
+					and mission.end_time + return_travel_time - (mission.start_time - instance.departure_distance_table[center_id][mission.id]) <= MAX_DAILY_TIME_RANGE):
+				return None
+			added_distance = instance.departure_distance_table[center_id][mission.id] + instance.return_distance_table[mission.id][center_id]
+		else:
+			if mission.start_time <= last_mission.end_time:
+				return None
+			travel_time = instance.mission_travel_time_table[last_mission.id][mission.id]
+			added_travel_time = travel_time + return_travel_time - instance.return_travel_time_table[last_mission.id][center_id]
+			if not (last_mission.end_time + travel_time <= mission.start_time
+					and mission_duration + added_travel_time + self.daily_work_times[employee] <= MAX_DAILY_WORK_TIME
+					and mission_duration + added_travel_time + self.weekly_work_times[employee] <= MAX_WEEKLY_WORK_TIME
+					and mission.end_time + return_travel_time - self.first_starts[employee] <= MAX_DAILY_TIME_RANGE):
+				return None
+			added_distance = instance.mission_distance_table[last_mission.id][mission.id] + instance.return_distance_table[mission.id][center_id] - instance.return_distance_table[last_mission.id][center_id]
+
+		return mission.end_time - mission.start_time + added_travel_time, added_distance
+
+
+	def is_cut(self, i: int) -> bool:
+		"""
+		Checks whether the branch cannot give better assignments than the best ones found
+		:param i: index of the next mission to assign
+		:return: True if the branch can be cut, False otherwise
+		"""
+		count_bound = self.count + self.remaining_bounds[i]
+		if self.chain_bounds is not None:
+			chain_bound = self.count
+			for employee, center_id in enumerate(self.center_ids):
+				last_mission = self.last_missions[employee]
+				if last_mission is None:
+					chain_bound += self.chain_bounds.empty_lengths[center_id][i]
+				else:
+					chain_bound += self.chain_bounds.get_next_length(center_id, self.mission_indices[last_mission.id], self.daily_work_times[employee])
+			count_bound = min(count_bound, chain_bound)
+		if self.objective == "count":
+			return count_bound <= self.best_count
+		if count_bound != self.best_count:
+			return count_bound < self.best_count
+		# a better branch must assign exactly the missions left to reach the best count, adding at least their smallest distances
+		needed = self.best_count - self.count
+		distance_bound = self.distance + self.minimum_added_distances[i][needed]
+		specialities_bound = self.specialities + min(needed, self.matching_missions[i])
+		if self.objective == "front":
+			return distance_bound > self.distance_limit or any(distance <= distance_bound and specialities >= specialities_bound for distance, specialities, _ in self.front)
+		if distance_bound != self.best_distance:
+			return distance_bound > self.best_distance
+		return specialities_bound <= self.best_specialities
+
+
+	def search(self, i: int = 0) -> None:
+		"""
+		Searches the assignments of the missions i and after, depth first, and keeps the best assignments found
+		:param i: index of the next mission to assign
+		"""
+		self.nodes += 1
+		if i == len(self.missions):
+			if self.objective == "front":
+				if self.count == self.best_count and self.distance <= self.distance_limit and not any(distance <= self.distance and specialities >= self.specialities for distance, specialities, _ in self.front):
+					self.front = [point for point in self.front if point[0] < self.distance or point[1] > self.specialities]
+					self.front.append((self.distance, self.specialities, self.assignments.copy()))
+			elif self.count > self.best_count or (self.objective == "fitness" and (self.count, -self.distance, self.specialities) > (self.best_count, -self.best_distance, self.best_specialities)):
+				self.best_assignments = self.assignments.copy()
+				self.best_count, self.best_distance, self.best_specialities = self.count, self.distance, self.specialities
+			return
+		if self.nodes >= self.max_nodes or self.is_cut(i):
+			return
+
+		mission = self.missions[i]
+		instance = self.instance
+		moves = []
+		tried = set()  # center and speciality of the employees tried with an empty day
+		for employee in range(len(self.employee_ids)):
+			employee_object = instance.employees[self.employee_ids[employee]]
+			if self.days[employee] != mission.day:
+				key = (employee_object.center_id, employee_object.speciality_code, self.weekly_work_times[employee])
+				if key in tried:
+					continue
+				tried.add(key)
+			append = self.get_append(employee, mission)
+			if append is not None:
+				is_matching = employee_object.speciality_code == mission.speciality_code
+				moves.append((append[1], not is_matching, employee, append[0]))
+		moves.sort()
+
+		for added_distance, is_not_matching, employee, added_work_time in moves:
+			previous_state = (self.last_missions[employee], self.days[employee], self.first_starts[employee], self.daily_work_times[employee], self.weekly_work_times[employee], self.distance)
+			if self.days[employee] != mission.day:
+				self.days[employee] = mission.day
+				self.first_starts[employee] = mission.start_time - instance.departure_distance_table[instance.employees[self.employee_ids[employee]].center_id][mission.id]
+				self.daily_work_times[employee] = 0.
+			self.last_missions[employee] = mission
+			self.daily_work_times[employee] += added_work_time
+			self.weekly_work_times[employee] += added_work_time
+			self.distance += added_distance
+			self.count += 1
+			self.specialities += not is_not_matching
+			self.assignments[i] = employee
+
+			self.search(i + 1)
+
+			self.last_missions[employee], self.days[employee], self.first_starts[employee], self.daily_work_times[employee], self.weekly_work_times[employee], self.distance = previous_state
+			self.count -= 1
+			self.specialities -= not is_not_matching
+			self.assignments[i] = -1
+
+		self.search(i + 1)
+
+
+	def solve(self) -> bool:
+		"""
+		Runs the search for the number of assignments, then for the best assignments
+		:return: True if both searches completed, so that the best assignments are optimal, False if one of them stopped at max_nodes
+		"""
+		self.objective = "count"
+		self.search()
+		self.is_complete = self.nodes < self.max_nodes
+		if self.is_complete:
+			self.upper_bound = self.best_count
+
+		self.objective = "fitness"
+		self.nodes = 0
+		self.search()
+		self.is_complete &= self.nodes < self.max_nodes
+		return self.is_complete
+
+
+	def get_speciality_front(self, distance_limit: float) -> list[tuple[float,int,list[int]]]:
+		"""
+		Searches, once solve() completed, the assignments of the best count within a distance limit that no other assignments beat
+		on both the distance and the number of corresponding specialities
+		:param distance_limit: maximum distance of the assignments
+		:return: the distance, specialities and assignments of each of them, the best assignments of solve() being one of them,
+		complete only if the search did not stop at max_nodes
+		"""
+		self.objective = "front"
+		self.distance_limit = distance_limit
+		self.front = [(self.best_distance, self.best_specialities, self.best_assignments)]
+		self.nodes = 0
+		self.search()
+		self.is_complete &= self.nodes < self.max_nodes
+		return sorted(self.front, key=lambda point: point[0])
+
+
+def solve_exact(instance: Instance, max_nodes: int = EXACT_MAX_NODES) -> tuple[Solution,int,bool]:
+	"""
+	Solves an instance by branch and bound, one independent part at a time, see get_exact_parts and PartSearch
+	The parts first get their most missions assigned with the shortest distance, which gives the optimal number of assignments and travel cost,
+	then as the travel cost is the integer part of COST_PER_KM times the distance, the distance can grow a little without changing it:
+	the speciality front of each part is searched within this slack, and the combination of the fronts with the most corresponding specialities
+	whose total distance keeps the travel cost is kept
+	The parts having more than EXACT_MAX_PART_MISSIONS missions are not searched, their upper bound only is computed
+	:param instance: the instance
+	:param max_nodes: maximum number of nodes of each search of each part
+	:return: the best solution found, an upper bound of the number of missions that can be assigned,
+	and True if the solution is proved optimal, False otherwise
+	"""
+	parts = get_exact_parts(instance)
+	part_searches = []
+	upper_bound = 0
+	is_optimal = True
+	for mission_ids, employee_ids in parts:
+		if len(mission_ids) > EXACT_MAX_PART_MISSIONS:
+			upper_bound += get_part_upper_bound(instance, mission_ids, employee_ids)
+			is_optimal = False
+			continue
+		part_search = PartSearch(instance, mission_ids, employee_ids, max_nodes)
+		is_optimal &= part_search.solve()
+		upper_bound += part_search.upper_bound
+		part_searches.append((mission_ids, employee_ids, part_search))
+
+	solution = get_part_solution(part_searches, [part_search.best_assignments for _, _, part_search in part_searches])
+	if not is_optimal:
+		return solution, upper_bound, False
+
+	# the combinations of the fronts, as total distance, total specialities and front index of each part, dominated ones removed
+	total_distance = sum(part_search.best_distance for _, _, part_search in part_searches)
+	travel_cost = int(COST_PER_KM * total_distance)
+	distance_limit = (travel_cost + 1) / COST_PER_KM * (1 - 1e-12)  # the total distance of the solutions of the same travel cost stays below it
+	combinations = [(0., 0, [])]
+	fronts = []
+	for _, _, part_search in part_searches:
+		front = part_search.get_speciality_front(part_search.best_distance + distance_limit - total_distance)
+		is_optimal &= part_search.is_complete
+		fronts.append(front)
+		combinations = [(distance + point_distance, specialities + point_specialities, choices + [index]) for distance, specialities, choices in combinations
+						for index, (point_distance, point_specialities, _) in enumerate(front) if distance + point_distance < distance_limit]
+		combinations.sort(key=lambda combination: (combination[0], -combination[1]))
+		non_dominated = []
+		for combination in combinations:
+			if not non_dominated or combination[1] > non_dominated[-1][1]:
+				non_dominated.append(combination)
+		combinations = non_dominated
+
+	_, _, choices = max(combinations, key=lambda combination: (combination[1], -combination[0]))
+	best_solution = get_part_solution(part_searches, [front[index][2] for front, index in zip(fronts, choices)])
+	# the distances are summed in another order by the evaluation, the solution of shortest distance is kept if it rounds to another travel cost
+	if best_solution.get_fitness(instance).travel_cost != solution.get_fitness(instance).travel_cost:
+		return solution, upper_bound, False
+	return best_solution, upper_bound, is_optimal
+
+
+def get_part_solution(part_searches: list[tuple[list[int],list[int],PartSearch]], part_assignments: list[list[int]]) -> Solution:
+	"""
+	Merges assignments of the parts of an instance into a solution
+	:param part_searches: mission ids, employee ids and search of each part
+	:param part_assignments: assignments of each part, as PartSearch.assignments
+	:return: the solution
+	"""
+	solution = Solution()
+	for (mission_ids, employee_ids, _), assignments in zip(part_searches, part_assignments):
+		for mission_id, employee in zip(mission_ids, assignments):
+			if employee != -1:
+				solution.assignments[mission_id] = employee_ids[employee]
+	return solution
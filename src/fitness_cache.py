@@ -0,0 +1,112 @@
+from collections import OrderedDict
+import numpy as np
+from config import *
+from models.fitness import Fitness
+
+
+MASK_64 = (1 << 64) - 1
+
+
+def zobrist_key(mission_id: int, employee_id: int) -> int:
+	"""
+	Returns the Zobrist key of a gene, i.e. the random 64 bits number XORed in the hash when the mission is assigned to the employee
+	The keys are derived with splitmix64 instead of being drawn in a table, so that they are the same in every process without any state
+	:param mission_id: id of the mission
+	:param employee_id: id of the employee
+	:return: the key of the gene
+	"""
+	z = (((mission_id << 32) | employee_id) + 0x9E3779B97F4A7C15) & MASK_64
+	z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+	z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+	return z ^ (z >> 31)
+
+
+def zobrist_hash(assignments: np.ndarray) -> np.ndarray:
+	"""
+	Computes the Zobrist hash of every row of a population matrix, same values as zobrist_key() XORed over the assigned genes
+	:param assignments: population matrix of shape (individuals, missions), 0 meaning unassigned
+	:return: the hash of each row, as unsigned 64 bits integers
+	"""
+	mission_ids = np.arange(1, assignments.shape[1] + 1, dtype=np.uint64)
+	z = ((mission_ids << np.uint64(32)) | assignments.astype(np.uint64)) + np.uint64(0x9E3779B97F4A7C15)
+	z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+	z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+	z ^= z >> np.uint64(31)
+	z[assignments == 0] = 0  # unassigned genes do not change the hash
+	return np.bitwise_xor.reduce(z, axis=1)
+
+
+class FitnessCache:
+	"""
+	Bounded cache of evaluations, keyed by the Zobrist hash of the assignments
+	An evaluation is the validity of the assignments and their fitness, as returned by PopulationEvaluator.evaluate for one row,
+	the fitness being computed even for invalid assignments, so that every user of a cache can share it
+	The least recently used entries are evicted once the cache is full
+	"""
+
+	max_entries: int  				# maximum number of entries kept, bounding the memory used by the cache
+	entries: OrderedDict[int, tuple[bool,Fitness]]  # evaluations by hash, from the least to the most recently used
+	hits: int  						# number of lookups that found an entry
+	misses: int  					# number of lookups that did not find an entry
+	evictions: int  				# number of entries evicted
+
+
+	def __init__(self, max_entries: int = FITNESS_CACHE_MAX_ENTRIES) -> None:
+		self.max_entries = max_entries
+		self.entries = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+
+	def get(self, key: int) -> tuple[bool,Fitness]:
+		"""
+		Looks up an evaluation and marks it as recently used
+		:param key: hash of the assignments
+		:return: the validity and the fitness, None if they are not in the cache
+		"""
+		value = self.entries.get(key)
+		if value is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		self.entries.move_to_end(key)
+		return value
+
+
+	def put(self, key: int, value: tuple[bool,Fitness]) -> None:
+		"""
+		Stores an evaluation, evicting the least recently used one if the cache is full
+		:param key: hash of the assignments
+		:param value: the validity and the fitness
+		"""
+		self.entries[key] = value
+		self.entries.move_to_end(key)
+		if len(self.entries) > self.max_entries:
+			self.entries.popitem(last=False)
+			self.evictions += 1
+
+
+	def get_hit_rate(self) -> float:
+		"""
+		Returns the rate of lookups that found an entry
+		:return: the hit rate, between 0 and 1
+		"""
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups else 0.
+
+
+	def __contains__(self, key: int) -> bool:
+		return key in self.entries
+
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+
+	def __str__(self) -> str:
+		return f"{len(self)}/{self.max_entries} entries, {self.hits} hits, {self.misses} misses ({round(100 * self.get_hit_rate(), 1)}% hit rate), {self.evictions} evictions"
+
+
+	def __repr__(self) -> str:
+		return self.__str__()
@@ -0,0 +1,192 @@
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from pathlib import Path
+import numpy as np
+
+
+SKILLS = {"LSF": 1., "LPC": 1.}  # default skill mix, relative weights
+SPECIALITIES = {"Musique": 1., "Mecanique": 1., "Electricite": 1., "Jardinage": 1., "Menuiserie": 1.}  # default speciality mix, relative weights
+MISSION_DURATIONS = (60, 120, 180, 240)  # min
+FIRST_MISSION_START = 8 * 60  # min, missions start at 8h at the earliest
+LAST_MISSION_END = 19 * 60  # min, and end at 19h at the latest
+MISSION_START_STEP = 10  # min, missions start on multiples of 10 minutes
+DISTANCES_PER_CHUNK = 1 << 22  # distances computed and written at once, bounding the memory used
+DISTANCE_FORMATS = ("dense", "sparse", "none")  # distances.csv, sparse_distances.csv, or coordinates.csv only
+
+
+def generate_coordinates(rng: np.random.Generator, centers_nb: int, missions_nb: int, spread: float) -> np.ndarray:
+	"""
+	Draws the positions of the centers and the missions in a square area
+	The centers are drawn in the middle of the area, and each mission is drawn around a random center
+	:param rng: random generator
+	:param centers_nb: number of centers
+	:param missions_nb: number of missions
+	:param spread: side of the square area in km
+	:return: array of shape (centers + missions, 2) of the positions in km, centers first, in the order of the distance matrix
+	"""
+	centers = rng.uniform(spread / 4, 3 * spread / 4, size=(centers_nb, 2))
+	missions = centers[rng.integers(0, centers_nb, size=missions_nb)] + rng.normal(0, spread / 6, size=(missions_nb, 2))
+	return np.concatenate((centers, np.clip(missions, 0, spread)))
+
+
+def get_rows_per_chunk(points_nb: int) -> int:
+	"""
+	Returns the number of rows of the distance matrix computed at once, so that a chunk holds about DISTANCES_PER_CHUNK distances
+	:param points_nb: number of points, i.e. of columns of the matrix
+	:return: the number of rows
+	"""
+	return max(1, DISTANCES_PER_CHUNK // points_nb)
+
+
+def get_distances_chunk(coordinates: np.ndarray, first_row: int, rows_nb: int) -> np.ndarray:
+	"""
+	Computes rows of the euclidean distance matrix of the positions
+	:param coordinates: positions in km, in the order of the matrix
+	:param first_row: index of the first row
+	:param rows_nb: number of rows
+	:return: the rows of the matrix
+	"""
+	rows = coordinates[first_row:first_row + rows_nb]
+	return np.sqrt(((rows[:, None, :] - coordinates[None, :, :]) ** 2).sum(axis=2))
+
+
+def write_distances_csv(path: Path, coordinates: np.ndarray) -> None:
+	"""
+	Writes the euclidean distance matrix of the positions, in chunks of rows so that the memory used stays linear in the number of positions
+	:param path: path of the csv file
+	:param coordinates: positions in km, in the order of the matrix
+	"""
+	rows_nb = get_rows_per_chunk(len(coordinates))
+	with open(path, "w") as f:
+		for first_row in range(0, len(coordinates), rows_nb):
+			np.savetxt(f, get_distances_chunk(coordinates, first_row, rows_nb), fmt="%.5g", delimiter=",")
+
+
+def write_sparse_distances_csv(path: Path, coordinates: np.ndarray, neighbours_nb: int) -> None:
+	"""
+	Writes the euclidean distances from each position to its nearest neighbours, as origin,destination,distance rows,
+	in chunks of rows so that the memory used stays linear in the number of positions
+	:param path: path of the csv file
+	:param coordinates: positions in km, in the order of the matrix
+	:param neighbours_nb: number of neighbours of each position
+	"""
+	neighbours_nb = min(neighbours_nb, len(coordinates) - 1)
+	rows_nb = get_rows_per_chunk(len(coordinates))
+	with open(path, "w") as f:
+		for first_row in range(0, len(coordinates), rows_nb):
+			distances = get_distances_chunk(coordinates, first_row, rows_nb)
+			origins = np.arange(first_row, first_row + len(distances))
+			distances[np.arange(len(distances)), origins] = np.inf  # a point is not its own neighbour
+			neighbours = np.argpartition(distances, neighbours_nb - 1, axis=1)[:, :neighbours_nb]
+			rows = np.column_stack((np.repeat(origins, neighbours_nb), neighbours.ravel(), np.take_along_axis(distances, neighbours, axis=1).ravel()))
+			np.savetxt(f, rows, fmt=("%d", "%d", "%.5g"), delimiter=",")
+
+
+def generate_instance(path: Path, missions_nb: int, employees_nb: int, centers_nb: int, days_nb: int = 5, skills: dict[str, float] = SKILLS, specialities: dict[str, float] = SPECIALITIES, spread: float = 20., seed: int = None, distance_format: str = "dense", neighbours_nb: int = 32) -> None:
+	"""
+	Generates a random instance in the format read by utils.open_instance
+	The folder gets missions.csv, employees.csv, centers.csv, coordinates.csv with the positions of the centers and the missions,
+	and the distances computed from the positions, as a full matrix (distances.csv) or for the nearest neighbours only (sparse_distances.csv)
+	:param path: folder of the instance, created if needed
+	:param missions_nb: number of missions
+	:param employees_nb: number of employees, spread evenly between the centers
+	:param centers_nb: number of centers
+	:param days_nb: number of days of the week
+	:param skills: relative weights of the skills, shared by the missions and the employees
+	:param specialities: relative weights of the specialities, shared by the missions and the employees
+	:param spread: side of the square area of the instance in km
+	:param seed: seed of the random generator, None for a random one
+	:param distance_format: one of DISTANCE_FORMATS, the full matrix takes a space quadratic in the number of missions
+	:param neighbours_nb: number of distances written for each point with the sparse format
+	"""
+	rng = np.random.default_rng(seed)
+	path.mkdir(parents=True, exist_ok=True)
+	skill_names = list(skills)
+	skill_weights = np.array(list(skills.values())) / sum(skills.values())
+	speciality_names = list(specialities)
+	speciality_weights = np.array(list(specialities.values())) / sum(specialities.values())
+
+	with open(path / "centers.csv", "w") as f:
+		for center_id in range(1, centers_nb + 1):
+			f.write(f"{center_id},center{center_id}\n")
+
+	# every skill gets at least one employee when possible, so that its missions can be assigned
+	employee_skills = rng.choice(len(skill_names), size=employees_nb, p=skill_weights)
+	employee_skills[:min(len(skill_names), employees_nb)] = np.arange(min(len(skill_names), employees_nb))
+	employee_specialities = rng.choice(len(speciality_names), size=employees_nb, p=speciality_weights)
+	with open(path / "employees.csv", "w") as f:
+		for i in range(employees_nb):
+			f.write(f"{i + 1},{i % centers_nb + 1},{skill_names[employee_skills[i]]},{speciality_names[employee_specialities[i]]}\n")
+
+	# the missions are numbered by day then start time
+	durations = rng.choice(MISSION_DURATIONS, size=missions_nb)
+	latest_starts = (LAST_MISSION_END - durations - FIRST_MISSION_START) // MISSION_START_STEP
+	starts = FIRST_MISSION_START + MISSION_START_STEP * rng.integers(0, latest_starts + 1)
+	days = rng.integers(1, days_nb + 1, size=missions_nb)
+	mission_skills = rng.choice(len(skill_names), size=missions_nb, p=skill_weights)
+	mission_specialities = rng.choice(len(speciality_names), size=missions_nb, p=speciality_weights)
+	order = np.lexsort((starts, days))
+	with open(path / "missions.csv", "w") as f:
+		for mission_id, i in enumerate(order.tolist(), start=1):
+			f.write(f"{mission_id},{days[i]},{starts[i]},{starts[i] + durations[i]},{skill_names[mission_skills[i]]},{speciality_names[mission_specialities[i]]}\n")
+
+	coordinates = generate_coordinates(rng, centers_nb, missions_nb, spread)
+	np.savetxt(path / "coordinates.csv", coordinates, fmt="%.5f", delimiter=",")
+	if distance_format == "dense":
+		write_distances_csv(path / "distances.csv", coordinates)
+	elif distance_format == "sparse" and len(coordinates) > 1:
+		write_sparse_distances_csv(path / "sparse_distances.csv", coordinates, neighbours_nb)
+
+
+def parse_weights(text: str) -> dict[str, float]:
+	"""
+	Parses a mix of skills or specialities given as "name:weight,name:weight", the weight being 1 when omitted
+	:param text: the mix
+	:return: the relative weight of each name
+	"""
+	weights = dict()
+	for item in text.split(","):
+		name, _, weight = item.partition(":")
+		try:
+			weights[name.strip()] = float(weight) if weight else 1.
+		except ValueError:
+			raise ArgumentTypeError(f"invalid weight in {item}")
+		if weights[name.strip()] < 0 or not name.strip():
+			raise ArgumentTypeError(f"invalid item {item}")
+	if sum(weights.values()) <= 0:
+		raise ArgumentTypeError("the weights must not all be zero")
+	return weights
+
+
+def parse_arguments(arguments: list[str] = None) -> Namespace:
+	"""
+	Parses the command line arguments
+	:param arguments: the arguments, the ones of the command line by default
+	:return: the parsed arguments
+	"""
+	parser = ArgumentParser(description="Generates a random instance, to test the solver on larger instances than the bundled ones.")
+	parser.add_argument("path", type=Path, help="folder of the instance")
+	parser.add_argument("-n", "--missions", type=int, default=1000, help="number of missions")
+	parser.add_argument("-e", "--employees", type=int, default=None, help="number of employees, one per 15 missions by default, as in the bundled instances")
+	parser.add_argument("-c", "--centers", type=int, default=2, help="number of centers")
+	parser.add_argument("-d", "--days", type=int, default=5, help="number of days")
+	parser.add_argument("--skills", type=parse_weights, default=SKILLS, help="skill mix, as name:weight,name:weight")
+	parser.add_argument("--specialities", type=parse_weights, default=SPECIALITIES, help="speciality mix, as name:weight,name:weight")
+	parser.add_argument("--spread", type=float, default=20., help="side of the square area of the instance, in km")
+	parser.add_argument("--seed", type=int, default=None, help="seed of the random generator")
+	parser.add_argument("--distances", choices=DISTANCE_FORMATS, default="dense", help="full distance matrix, distances to the nearest neighbours only, or no distances (coordinates only)")
+	parser.add_argument("--neighbours", type=int, default=32, help="number of distances written for each point with --distances sparse")
+	arguments = parser.parse_args(arguments)
+	if arguments.employees is None:
+		arguments.employees = max(arguments.centers, arguments.missions // 15)
+	if arguments.missions <= 0 or arguments.employees <= 0 or arguments.centers <= 0 or arguments.days <= 0 or arguments.spread <= 0 or arguments.neighbours <= 0:
+		parser.error("the numbers of missions, employees, centers, days and neighbours, and the spread must be positive")
+	return arguments
+
+
+if __name__ == "__main__":
+
+	arguments = parse_arguments()
+
+	generate_instance(arguments.path, arguments.missions, arguments.employees, arguments.centers, arguments.days, arguments.skills, arguments.specialities, arguments.spread, arguments.seed, arguments.distances, arguments.neighbours)
+
+	print(f"Instance written to {arguments.path}: {arguments.missions} missions, {arguments.employees} employees, {arguments.centers} centers")
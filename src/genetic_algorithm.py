@@ -1,85 +1,266 @@
+from __future__ import annotations
+from pathlib import Path
 from time import time
 from models.solution import Solution
-from utils import print_solution_evaluation, get_solution_individual_fitnesses
+from models.population import Population
+from models.fitness import FITNESS_DTYPE, Fitness
+from population_evaluator import PopulationEvaluator
+from parallel_evaluation import ParallelEvaluator
+from fitness_cache import FitnessCache, zobrist_hash
+from local_search import improve_elites
+from run_controller import RunController
+from profiler import Profiler, NULL_PROFILER
+from checkpoint import Checkpoint, ConvergenceLog
+from utils import print_solution_evaluation
 from genetic_algorithm_utils import *
 
 
-def genetic_algorithm(employees: dict[int, Employee], missions: dict[Mission], centers: list[Center], distance_matrix: list[list[float]], size: int, crossover_rate: float, mutation_rate: float, max_execution_time: int, k: int, mutated_genes_per_chromosome_rate: float) -> Solution:
+def genetic_algorithm(instance: Instance, size: int, crossover_rate: float, mutation_rate: float, max_execution_time: int, k: int, mutated_genes_per_chromosome_rate: float, fitness_cache_size: int = FITNESS_CACHE_MAX_ENTRIES, workers_nb: int = 1, evaluator: PopulationEvaluator | ParallelEvaluator = None, fitness_cache: FitnessCache = None, max_iterations: int = None, local_search_elites: int = DEFAULT_LOCAL_SEARCH_ELITES, local_search_strategy: str = "first", local_search_max_evaluations: int = LOCAL_SEARCH_MAX_EVALUATIONS, crossover_operator: str = "uniform", repair: bool = False, controller: RunController = None, profiler: Profiler = NULL_PROFILER, checkpoint_path: Path = None, checkpoint_interval: float = CHECKPOINT_INTERVAL, resume: bool = False, history_path: Path = None, initial_solutions: list[Solution] = None) -> Solution:
 	"""
 	Performs the genetic algorithm
-	:param employees: dict of employees to assign to missions
-	:param missions: dict of missions to assign to employees
-	:param distance_matrix: matrix of distances between center-center, centers-missions, missions-missions
+	The population is kept as one integer matrix and each generation is evaluated at once by a PopulationEvaluator
+	:param instance: the instance to solve
 	:param size: size of the population
 	:param crossover_rate: probability of crossover
 	:param mutation_rate: probability of mutation
 	:param max_execution_time: maximum execution time of the algorithm in seconds
 	:param k: number of individuals to consider in tournament selection
+	:param mutated_genes_per_chromosome_rate: rate of the assigned genes to mutate
+	:param fitness_cache_size: maximum number of evaluations kept in the fitness cache
+	:param workers_nb: number of processes evaluating the children of each generation, used when no evaluator is given
+	:param evaluator: evaluator of the instance, to reuse the same one (and its worker processes) between several runs
+	:param fitness_cache: cache of the evaluations of the instance, to keep it warm between several runs, a new one of fitness_cache_size entries by default
+	:param max_iterations: maximum number of iterations, None for no limit other than the execution time
+	:param local_search_elites: number of best individuals improved by local search after each iteration (memetic algorithm), 0 to disable it
+	:param local_search_strategy: "first" or "best" improvement, see local_search.local_search()
+	:param local_search_max_evaluations: maximum number of moves evaluated by the local search of one individual
+	:param crossover_operator: one of CROSSOVER_OPERATORS, "uniform" by gene or "employee_day" by route
+	:param repair: True to repair the invalid children instead of discarding them
+	:param controller: decides when the run stops, restarts or perturbs its population, a controller stopping at max_execution_time and max_iterations by default
+	:param profiler: profiler measuring the phases of the run and tracing its generations, a disabled one by default
+	:param checkpoint_path: .npz file where the state of the run is saved every checkpoint_interval seconds and at its end, None for no checkpoint
+	:param checkpoint_interval: seconds between two checkpoints
+	:param resume: True to resume the run saved in checkpoint_path if the file exists, with the remaining time and iterations of its controller
+	:param history_path: .csv file where each improvement of the best solution is written as soon as it is found, None for no history
+	:param initial_solutions: solutions put in the initial population instead of nearest neighbour solutions, such as a previous solution of the instance, repaired if they are not valid
 	:return: the best solution of the population
 	"""
-	start_time = time()
-	population = generate_initial_population(employees, missions, centers, distance_matrix, size)
+	owned_evaluator = None  # evaluator created by this run, closed at its end
+	if evaluator is None:
+		evaluator = owned_evaluator = ParallelEvaluator(instance, workers_nb) if workers_nb > 1 else PopulationEvaluator(instance)
 
-	fitness_memo = dict()  # used to store the fitness of solutions to avoid computing them multiple times
-	best_solution = pick_best_solutions(population, employees, missions, distance_matrix, 1, len(centers), fitness_memo)[0]
-	fitness_memo[best_solution] = best_solution.evaluate(distance_matrix, employees, missions, len(centers), fitness_memo)
+	try:
+		if controller is None:
+			controller = RunController(max_execution_time, max_iterations)
+		controller.start()
+		if fitness_cache is None:
+			fitness_cache = FitnessCache(fitness_cache_size)  # used to avoid evaluating the same children multiple times
+		checkpoint = Checkpoint.load(checkpoint_path, instance.missions_nb) if resume and checkpoint_path is not None and checkpoint_path.is_file() else None
 
-	print("  Best initial solution:")
+		if checkpoint is None:
+			initial_solutions = list(initial_solutions or [])[:size]
+			population = Population.from_solutions(initial_solutions + list(generate_initial_population(instance, size - len(initial_solutions))), instance.missions_nb)
+			valid, population.fitnesses = evaluator.evaluate(population.assignments)
+			for index in np.flatnonzero(~valid).tolist():  # only given solutions can be invalid
+				population.fitnesses[index] = repair_assignments(population.assignments[index], instance)
 
-	print_solution_evaluation(fitness_memo[best_solution])
+			best_index = pick_best_indices(population.fitnesses, 1)[0]
+			best_assignments = population.assignments[best_index].copy()
+			best_fitness = Fitness.from_record(population.fitnesses[best_index])
+			controller.update(best_fitness)
+			nb_evaluations = 0
+			nb_accepted = 0
+			nb_improved = 0
+			searched = set()  # hashes of the individuals of the population already improved by local search, so that an elite surviving several iterations is searched once
 
-	print("\nRunning genetic algorithm...")
+			print("  Best initial solution:")
+		else:
+			population = checkpoint.population
+			best_assignments = checkpoint.best_assignments.copy()
+			controller.set_state(checkpoint.counters)
+			best_fitness = controller.best_fitness
+			nb_evaluations = int(checkpoint.counters.get("evaluations", 0))
+			nb_accepted = int(checkpoint.counters.get("accepted", 0))
+			nb_improved = int(checkpoint.counters.get("improved", 0))
+			searched = checkpoint.searched
+			if checkpoint.fitness_cache is not None:
+				for key, evaluation in checkpoint.fitness_cache.entries.items():
+					fitness_cache.put(key, evaluation)
+			checkpoint.restore_random_states()
 
-	nb_it = 0
-	while time() - start_time < max_execution_time:
-		nb_it += 1
+			print(f"  Resumed from {checkpoint_path} at iteration {controller.iterations}, best solution:")
 
-		population = genetic_algorithm_iteration(employees, missions, population, distance_matrix, size, crossover_rate, mutation_rate, k, len(centers), fitness_memo, mutated_genes_per_chromosome_rate)
+		print_solution_evaluation(best_fitness)
 
-		new_best = max(best_solution, population[0], key=lambda sol: (fitness_memo[sol]))
-		if fitness_memo[new_best] != fitness_memo[best_solution]:
-			best_solution = new_best
-			print(f"  New best solution: {get_solution_individual_fitnesses(fitness_memo[best_solution])} at iteration {nb_it}")
-			
-	print(f"  {nb_it} iterations")
+		history = ConvergenceLog(history_path, append=checkpoint is not None) if history_path is not None else None
+		if history is not None and checkpoint is None:
+			history.write(0, controller.get_elapsed_time(), best_fitness)
+		last_checkpoint_time = time()
 
-	return best_solution
+		print("\nRunning genetic algorithm...")
 
+		while not controller.should_stop():
+			if controller.should_restart():
+				with profiler.measure("restart"):
+					population = restart_population(evaluator, population, size, controller.stall_action)
+				print(f"  Search stalled, {'restart' if controller.stall_action == 'restart' else 'perturbation'} {controller.restarts} at iteration {controller.iterations}")
+			controller.next_iteration()
 
-def genetic_algorithm_iteration(employees: dict[int, Employee], missions: dict[Mission], population: np.ndarray[Solution], distance_matrix: list[list[float]], size: int, crossover_rate: float, mutation_rate: float, k: int, centers_nb: int, fitness_memo: dict[Solution, tuple[int,int,int]], mutated_genes_per_chromosome_rate: float) -> list[Solution]:
+			population, children_nb, accepted_nb = genetic_algorithm_iteration(evaluator, population, size, crossover_rate, mutation_rate, k, mutated_genes_per_chromosome_rate, fitness_cache, crossover_operator, repair, profiler)
+			nb_evaluations += children_nb
+			nb_accepted += accepted_nb
+
+			if local_search_elites > 0:
+				with profiler.measure("local_search"):
+					population, improved_nb = improve_elites(population, instance, local_search_elites, searched, local_search_strategy, local_search_max_evaluations)
+				nb_improved += improved_nb
+
+			profiler.record_generation(controller.iterations, population)
+
+			if controller.update(Fitness.from_record(population.fitnesses[0])):
+				best_assignments = population.assignments[0].copy()
+				best_fitness = Fitness.from_record(population.fitnesses[0])
+				print(f"  New best solution: {tuple(best_fitness)} at iteration {controller.iterations}")
+				if history is not None:
+					history.write(controller.iterations, controller.get_elapsed_time(), best_fitness)
+
+			if checkpoint_path is not None and time() - last_checkpoint_time >= checkpoint_interval:
+				with profiler.measure("checkpoint"):
+					save_checkpoint(checkpoint_path, population, best_assignments, fitness_cache, searched, controller, nb_evaluations, nb_accepted, nb_improved)
+				last_checkpoint_time = time()
+
+		if checkpoint_path is not None:
+			save_checkpoint(checkpoint_path, population, best_assignments, fitness_cache, searched, controller, nb_evaluations, nb_accepted, nb_improved)
+		if history is not None:
+			history.close()
+
+		print(f"  {controller}, {round(nb_evaluations / controller.get_elapsed_time())} evaluations per second")
+		print(f"  Accepted children: {round(100 * nb_accepted / max(nb_evaluations, 1), 1)}% ({nb_accepted}/{nb_evaluations})")
+		print(f"  Fitness cache: {fitness_cache}")
+		if local_search_elites > 0:
+			print(f"  Local search: {nb_improved} individuals improved")
+		if profiler.enabled:
+			print(profiler.get_report())
+
+		return Solution.from_array(best_assignments)
+	finally:
+		if isinstance(owned_evaluator, ParallelEvaluator):
+			owned_evaluator.close()
+
+
+def save_checkpoint(path: Path, population: Population, best_assignments: np.ndarray, fitness_cache: FitnessCache, searched: set[int], controller: RunController, nb_evaluations: int, nb_accepted: int, nb_improved: int) -> None:
+	"""
+	Saves the state of a run of the genetic algorithm, see Checkpoint
+	:param path: .npz file of the checkpoint
+	:param population: current population
+	:param best_assignments: best individual found
+	:param fitness_cache: cache of the evaluations of the children
+	:param searched: hashes of the individuals of the population already improved by local search
+	:param controller: controller of the run
+	:param nb_evaluations: number of children evaluated
+	:param nb_accepted: number of children accepted
+	:param nb_improved: number of individuals improved by local search
+	"""
+	counters = dict(controller.get_state(), evaluations=nb_evaluations, accepted=nb_accepted, improved=nb_improved)
+	Checkpoint(population, best_assignments, fitness_cache, searched, counters).save(path)
+
+
+def restart_population(evaluator: PopulationEvaluator | ParallelEvaluator, population: Population, size: int, stall_action: str) -> Population:
+	"""
+	Replaces a stalled population, keeping its best individual
+	:param evaluator: evaluator of the instance
+	:param population: current population, sorted by decreasing fitness
+	:param size: size of the population
+	:param stall_action: "restart" to draw a new initial population, "perturb" to mutate heavily every individual but the best,
+	the mutated individuals that are not valid being kept as they were
+	:return: the new population, sorted by decreasing fitness
+	"""
+	instance = evaluator.instance
+	if stall_action == "restart":
+		assignments = Population.from_solutions(generate_initial_population(instance, size - 1), instance.missions_nb).assignments
+		_, fitnesses = evaluator.evaluate(assignments)
+	else:
+		assignments = population.assignments[1:].copy()
+		for individual in assignments:
+			mutate_assignments(individual, instance, PERTURBATION_MUTATED_GENES_RATE)
+		valid, fitnesses = evaluator.evaluate(assignments)
+		assignments[~valid] = population.assignments[1:][~valid]
+		fitnesses[~valid] = population.fitnesses[1:][~valid]
+
+	assignments = np.concatenate((population.assignments[:1], assignments))
+	fitnesses = np.concatenate((population.fitnesses[:1], fitnesses))
+	best_indices = pick_best_indices(fitnesses, size)
+	return Population(assignments[best_indices], fitnesses[best_indices])
+
+
+def genetic_algorithm_iteration(evaluator: PopulationEvaluator | ParallelEvaluator, population: Population, size: int, crossover_rate: float, mutation_rate: float, k: int, mutated_genes_per_chromosome_rate: float, fitness_cache: FitnessCache, crossover_operator: str = "uniform", repair: bool = False, profiler: Profiler = NULL_PROFILER) -> tuple[Population,int,int]:
 	"""
 	Performs a single iteration of the genetic algorithm
-	:param employees: dict of employees to assign to missions
-	:param missions: dict of missions to assign to employees
-	:param population: list of solutions
-	:param distance_matrix: matrix of distances between center-center, centers-missions, missions-missions
+	:param evaluator: evaluator of the instance, in this process or on a pool of workers
+	:param population: current population, with its fitnesses
 	:param size: size of the population
 	:param crossover_rate: probability of crossover
 	:param mutation_rate: probability of mutation
 	:param k: number of individuals to consider in tournament selection
-	:param centers_nb: number of centers
-	:return: the new population
+	:param mutated_genes_per_chromosome_rate: rate of the assigned genes to mutate
+	:param fitness_cache: cache of the validity and fitness of the children already evaluated
+	:param crossover_operator: one of CROSSOVER_OPERATORS
+	:param repair: True to repair the invalid children with repair_assignments() instead of discarding them
+	:param profiler: profiler measuring the phases of the iteration, a disabled one by default
+	:return: the new population, sorted by decreasing fitness, the number of children evaluated and the number of children accepted
 	"""
+	pairs_nb = round(crossover_rate * size / 2)
+
+	# choosing the parents for the crossover
+	with profiler.measure("selection"):
+		parents = tournament_choice_indices(population.fitnesses, k, 2 * pairs_nb)
+		parents1, parents2 = parents[:pairs_nb], parents[pairs_nb:]
+
+	with profiler.measure("crossover"):
+		if crossover_operator == "employee_day":
+			instance = evaluator.instance
+			children1, children2 = crossover_employee_days(population.assignments[parents1], population.assignments[parents2], instance.mission_table.day[1:], instance.employees_nb, int(instance.mission_table.day.max()))
+		else:
+			children1, children2 = crossover_assignments(population.assignments[parents1], population.assignments[parents2])
+		children = np.concatenate((children1, children2))
 
-	children = []
+	# mutating the children
+	with profiler.measure("mutation"):
+		for child in children:
+			if random() < mutation_rate:
+				mutate_assignments(child, evaluator.instance, mutated_genes_per_chromosome_rate)
 
-	for _ in range(round(crossover_rate * size / 2)):
+	# evaluating the children that are not in the cache, the validity and the fitness are computed in the same pass
+	with profiler.measure("cache"):
+		keys = zobrist_hash(children).tolist()
+		evaluations = [fitness_cache.get(key) for key in keys]
+		missing = [i for i, evaluation in enumerate(evaluations) if evaluation is None]
+	profiler.count("cache_hits", len(children) - len(missing))
+	profiler.count("cache_misses", len(missing))
+	if missing:
+		with profiler.measure("evaluation"):
+			missing_valid, missing_fitnesses = evaluator.evaluate(children[missing])
+		for i, is_valid, fitness in zip(missing, missing_valid.tolist(), missing_fitnesses.tolist()):
+			evaluations[i] = (is_valid, Fitness(*fitness))
+			fitness_cache.put(keys[i], evaluations[i])
 
-		# choosing the parents for the crossover
-		parent1 = tournament_choice(population, employees, missions, distance_matrix, k, centers_nb, fitness_memo)
-		parent2 = tournament_choice(population, employees, missions, distance_matrix, k, centers_nb, fitness_memo)
-		child1, child2 = crossover(parent1, parent2, len(missions))
+	# repairing the invalid children, the repaired child is cached under its own hash
+	if repair:
+		with profiler.measure("repair"):
+			for i, evaluation in enumerate(evaluations):
+				if not evaluation[0]:
+					evaluations[i] = (True, repair_assignments(children[i], evaluator.instance))
+					fitness_cache.put(zobrist_hash(children[i:i + 1]).item(), evaluations[i])
+					profiler.count("repaired_children")
 
-		# mutating the children
-		if random() < mutation_rate:
-			child1.mutate(missions, employees, mutated_genes_per_chromosome_rate)
-		if random() < mutation_rate:
-			child2.mutate(missions, employees, mutated_genes_per_chromosome_rate)
+	# adding the children to the population if they are valid
+	with profiler.measure("replacement"):
+		valid = np.array([evaluation[0] for evaluation in evaluations], dtype=bool)
+		fitnesses = np.array([evaluation[1] for evaluation in evaluations], dtype=FITNESS_DTYPE)
+		assignments = np.concatenate((population.assignments, children[valid]))
+		fitnesses = np.concatenate((population.fitnesses, fitnesses[valid]))
+		best_indices = pick_best_indices(fitnesses, size)
+	profiler.count("children", len(children))
+	profiler.count("accepted_children", int(np.count_nonzero(valid)))
 
-		# adding the children to the population if they are valid
-		if child1.is_valid(employees, missions, distance_matrix, centers_nb):
-			children.append(child1)
-		if child2.is_valid(employees, missions, distance_matrix, centers_nb):
-			children.append(child2)
-			
-	return pick_best_solutions(np.append(population, np.array(children)), employees, missions, distance_matrix, size, centers_nb, fitness_memo)
+	return Population(assignments[best_indices], fitnesses[best_indices]), len(children), int(np.count_nonzero(valid))
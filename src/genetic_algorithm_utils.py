@@ -6,60 +6,62 @@ from models.solution import Solution
 from models.employee import Employee
 from models.mission import Mission
 from models.center import Center
+from models.instance import Instance
+from models.fitness import Fitness, get_fitness_keys
 from utils import print_solution_evaluation
 
 
-def generate_initial_population(employees: dict[int, Employee], missions: dict[int, Mission], centers: list[Center], distance_matrix: list[list[float]], size: int) -> np.ndarray[Solution]:
+CROSSOVER_OPERATORS = ("uniform", "employee_day")  # crossovers of the population matrix, see crossover_assignments() and crossover_employee_days()
+
+
+def generate_initial_population(instance: Instance, size: int) -> np.ndarray[Solution]:
 	"""
 	Generates an initial population of solutions
-	:param employees: list of employees
-	:param missions: dict of missions
-	:param centers: list of centers
-	:param distance_matrix: matrix of distances between center-center, centers-missions, missions-missions
+	:param instance: the instance
 	:param size: size of the population
 	:return: list of valid solutions
 	"""
 	solutions = np.array([None] * size)
 	for i in range(size):
 		# as the nearest neighbour function has random choices, the population will be diverse enough
-		solutions[i] = get_nearest_neighbour_solution(employees, missions, centers, distance_matrix)
+		solutions[i] = get_nearest_neighbour_solution(instance)
 
 	return solutions
 
 
-def get_nearest_neighbour_solution(employees: dict[int, Employee], missions: dict[int, Mission], centers: list[Center], distance_matrix: list[list[float]]) -> Solution:
+def get_nearest_neighbour_solution(instance: Instance) -> Solution:
 	"""
 	Generates a valid solution using the nearest neighbour algorithm
-	:param employees: list of employees
-	:param missions: dict of missions
-	:param distance_matrix: matrix of distances between center-center, centers-missions, missions-missions
+	:param instance: the instance
 	:return: A valid solution
 	"""
 	solution = Solution()
-	centers_nb = len(centers)
+	employees = instance.employees
+	missions = instance.missions
 	probability_to_pick_non_optimal_employee = .8
 
-	for mission_id, mission in sorted(missions.items(), key=lambda m: (m[1].day, m[1].start_time)):  # assigns the mission in chronological order
+	for mission_id in instance.chronological_order.tolist():  # assigns the mission in chronological order
+		mission = missions[mission_id]
 		employees_distances_from_mission: dict[int, float] = {}
 
-		for employee_id, employee in employees.items():
+		for employee_id in instance.employees_by_skill.get(mission.skill, []):  # only the employees with the skill of the mission are considered
+			employee = employees[employee_id]
 
-			if employee.skill != mission.skill:  # if the skill does not match, does not consider this employee
+			if not employee.schedule.can_fit_in_schedule(mission, instance, employee.center_id):  # if the employee cannot fit the mission in its schedule, does not consider him
 				continue
-		
-			if employee.schedule.is_empty_for_day(mission.day) and employee.schedule.can_fit_in_schedule(mission, distance_matrix, centers_nb, employee.center_id):
-				# if the employee has no mission for the current day, he starts from its center
-				employees_distances_from_mission[employee_id] = distance_matrix[employee.center_id - 1][centers_nb + mission_id - 1]
-			else:
 
-				if not employee.schedule.can_fit_in_schedule(mission, distance_matrix, centers_nb, employee.center_id):  # if the employee cannot fit the mission in its schedule, does not consider him
-					continue
+			missions_of_day = employee.schedule.missions_by_day.get(mission.day)
 
-				# gets the distance from the last mission of the employee
-				last_mission = employee.schedule.missions[-1]
+			if not missions_of_day:
+				# if the employee has no mission for the current day, he starts from its center
+				employees_distances_from_mission[employee_id] = instance.departure_distance_table[employee.center_id][mission_id]
+			else:
+				# gets the distance from the last mission of the employee, as missions are assigned in chronological order it is the last one of the day
+				last_mission = missions_of_day[-1]
 
-				distance_from_last_mission = distance_matrix[centers_nb + last_mission.id - 1][centers_nb + mission_id - 1]
-				travel_time_from_last_mission = distance_from_last_mission * TRAVEL_SPEED
+				distance_from_last_mission = instance.mission_distance_table[last_mission.id][mission_id]
+				# in minutes, the distance divided by TRAVEL_SPEED in km/min, as in Schedule
+				travel_time_from_last_mission = instance.mission_travel_time_table[last_mission.id][mission_id]
 
 				if (last_mission.end_time + travel_time_from_last_mission) >= mission.start_time:
 					# if the employee cannot make it before the end of its last mission, does not consider him
@@ -80,7 +82,7 @@ def get_nearest_neighbour_solution(employees: dict[int, Employee], missions: dic
 			picked_employee = employees[choice(nearest_employees_ids)]
 
 			solution.assignments[mission_id] = picked_employee.id  # picks a random employee from the closest one to add diversity
-			picked_employee.schedule.add_mission(mission, distance_matrix, centers_nb, picked_employee.center_id)
+			picked_employee.schedule.add_mission(mission, instance, picked_employee.center_id)
 
 	for _, employee in employees.items():
 		employee.reset_schedule()
@@ -88,47 +90,6 @@ def get_nearest_neighbour_solution(employees: dict[int, Employee], missions: dic
 	return solution
 
 
-def tournament_choice(population: np.ndarray[Solution], employees: dict[int, Employee], missions: dict[int, Mission], distance_matrix: list[list[float]], k: int, centers_nb: int, fitness_memo: dict[Solution, tuple[int,int,int]]) -> Solution:
-	"""
-	Performs a tournament iteration 
-	:param population: list of solutions
-	:param distance_matrix: matrix of distances between center-center, centers-missions, missions-missions
-	:param k: number of solutions to pick
-	:return: list of solutions
-	"""
-	solutions = np.array([None] * k)
-	for i in range(k):
-		solutions[i] = choice(population)
-
-	return pick_best_solutions(solutions, employees, missions, distance_matrix, 1, centers_nb, fitness_memo)[0]
-
-
-def pick_best_solutions(solutions: np.ndarray[Solution], employees: dict[int, Employee], missions: dict[int, Mission], distance_matrix: list[list[float]], number_of_solutions_to_keep: int, centers_nb: int, fitness_memo: dict[Solution, tuple[int,int,int]]) -> np.ndarray[Solution]:
-	"""
-	Picks the best solution in a list using the solutions fitnesses
-	:param solutions: solutions from which we pick the best
-	:param employees: dict of employees
-	:param missions: dict of missions
-	:param distance_matrix: matrix of distances between center-center, centers-missions, missions-missions
-	:param number_of_solutions_to_keep: number of solutions to keep
-	:param centers_nb: number of centers
-	:param fitness_memo: memoization dict for fitnesses
-	:return: the best solution in the list
-	"""
-
-	for sol in solutions:
-		if not fitness_memo.get(sol):
-			fitness_memo[sol] = sol.get_fitness(employees, missions, distance_matrix, centers_nb)
-
-	if number_of_solutions_to_keep == 1:
-		return [max(solutions, key=lambda sol: fitness_memo[sol])]
-
-	sorted_indices = np.argsort(np.array([-fitness_memo[sol] for sol in solutions], dtype=np.int64), kind="heapsort")  # "-evaluation" to sort in descending order
-	sorted_solutions = solutions[sorted_indices]
-
-	return sorted_solutions[:number_of_solutions_to_keep]
-
-
 def crossover(solution1: Solution, solution2: Solution, missions_nb: int) -> tuple[Solution,Solution]:
 	"""
 	Performs a crossover between two solutions using uniform crossover
@@ -156,3 +117,148 @@ def crossover(solution1: Solution, solution2: Solution, missions_nb: int) -> tup
 				child2.assignments[mission_id] = assignment1
 
 	return child1, child2
+
+
+def tournament_choice_index(fitnesses: np.ndarray, k: int) -> int:
+	"""
+	Performs a tournament iteration on a population matrix
+	:param fitnesses: fitnesses of the population
+	:param k: number of individuals to pick
+	:return: index of the winner of the tournament
+	"""
+	return int(tournament_choice_indices(fitnesses, k, 1)[0])
+
+
+def tournament_choice_indices(fitnesses: np.ndarray, k: int, tournaments_nb: int) -> np.ndarray:
+	"""
+	Performs several tournaments on a population matrix at once
+	:param fitnesses: fitnesses of the population
+	:param k: number of individuals to pick in each tournament
+	:param tournaments_nb: number of tournaments
+	:return: index of the winner of each tournament
+	"""
+	indices = np.random.randint(0, len(fitnesses), (tournaments_nb, k))
+	return indices[np.arange(tournaments_nb), np.argmax(get_fitness_keys(fitnesses)[indices], axis=1)]
+
+
+def pick_best_indices(fitnesses: np.ndarray, number_of_solutions_to_keep: int) -> np.ndarray:
+	"""
+	Picks the indices of the best individuals of a population matrix
+	The best individuals are first separated from the others with a partial sort, then only them are sorted
+	:param fitnesses: fitnesses of the population
+	:param number_of_solutions_to_keep: number of individuals to keep
+	:return: the indices of the best individuals, sorted by decreasing fitness
+	"""
+	keys = get_fitness_keys(fitnesses)
+	if number_of_solutions_to_keep < len(keys):
+		best_indices = np.argpartition(-keys, number_of_solutions_to_keep - 1)[:number_of_solutions_to_keep]  # "-keys" to select the highest ones
+	else:
+		best_indices = np.arange(len(keys))
+	return best_indices[np.argsort(-keys[best_indices], kind="stable")]
+
+
+def crossover_assignments(parents1: np.ndarray, parents2: np.ndarray) -> tuple[np.ndarray,np.ndarray]:
+	"""
+	Performs the uniform crossover of crossover() on rows of a population matrix, all the pairs at once
+	:param parents1: first parents, one per row
+	:param parents2: second parents, one per row
+	:return: two matrices of children
+	"""
+	gene_mask = np.random.randint(0, 2, parents1.shape).astype(bool)
+	return np.where(gene_mask, parents1, parents2), np.where(gene_mask, parents2, parents1)
+
+
+def crossover_employee_days(parents1: np.ndarray, parents2: np.ndarray, mission_days: np.ndarray, employees_nb: int, days_nb: int) -> tuple[np.ndarray,np.ndarray]:
+	"""
+	Performs a crossover inheriting whole days of the employees, all the pairs at once
+	Each (employee, day) of the first child takes the missions of that day from the first or the second parent, and the second child from the other one,
+	so that the routes of the children are routes of the parents, minus the missions that another inherited route already took
+	:param parents1: first parents, one per row
+	:param parents2: second parents, one per row
+	:param mission_days: day of each mission, mission_days[j] is the day of mission j + 1
+	:param employees_nb: number of employees of the instance
+	:param days_nb: number of days of the instance
+	:return: two matrices of children
+	"""
+	pairs = np.arange(len(parents1))[:, None]
+	route_mask = np.random.randint(0, 2, (len(parents1), employees_nb + 1, days_nb + 1)).astype(bool)  # True if the first child takes the route of the first parent
+	from_first1 = route_mask[pairs, parents1, mission_days] & (parents1 != 0)
+	from_first2 = ~route_mask[pairs, parents2, mission_days] & (parents2 != 0)
+	from_second2 = route_mask[pairs, parents2, mission_days] & (parents2 != 0)
+	from_second1 = ~route_mask[pairs, parents1, mission_days] & (parents1 != 0)
+	children1 = np.where(from_first1, parents1, np.where(from_first2, parents2, 0))
+	children2 = np.where(from_second2, parents2, np.where(from_second1, parents1, 0))
+	return children1.astype(parents1.dtype, copy=False), children2.astype(parents1.dtype, copy=False)
+
+
+def repair_assignments(assignments: np.ndarray, instance: Instance) -> Fitness:
+	"""
+	Makes an individual of a population matrix valid, in place
+	The missions are added to the schedules of their employees in chronological order, as in Solution.check_and_get_fitness,
+	and a mission that does not fit is reassigned to another employee with its skill whose schedule can take it, or unassigned if none can
+	:param assignments: row of the population matrix, assignments[i] is the id of the employee assigned to mission i + 1, 0 if unassigned
+	:param instance: the instance
+	:return: the fitness of the repaired individual
+	"""
+	employees = instance.employees
+	missions = instance.missions
+	specialities_count = 0
+
+	for mission_id in instance.chronological_order.tolist():
+		employee_id = int(assignments[mission_id - 1])
+		if employee_id == 0:
+			continue
+
+		mission = missions[mission_id]
+		employee = employees[employee_id]
+		if mission.skill_code != employee.skill_code or not employee.schedule.can_fit_in_schedule(mission, instance, employee.center_id):
+			candidates = instance.employees_by_skill.get(mission.skill, [])
+			first = randint(0, len(candidates) - 1) if candidates else 0  # the candidates are tried from a random one, so that the first ones are not always preferred
+			employee = next((employees[candidate_id] for candidate_id in candidates[first:] + candidates[:first] if employees[candidate_id].schedule.can_fit_in_schedule(mission, instance, employees[candidate_id].center_id)), None)
+			assignments[mission_id - 1] = 0 if employee is None else employee.id
+			if employee is None:
+				continue
+
+		employee.schedule.add_mission(mission, instance, employee.center_id)
+		specialities_count += employee.speciality_code == mission.speciality_code
+
+	total_distance = 0
+	for _, employee in employees.items():
+		total_distance += employee.schedule.distance_traveled
+		employee.reset_schedule()
+
+	return Fitness(int(np.count_nonzero(assignments)), int(COST_PER_KM * total_distance), specialities_count)
+
+
+def mutate_assignments(assignments: np.ndarray, instance: Instance, mutated_genes_per_chromosome_rate: float) -> None:
+	"""
+	Mutates an individual of a population matrix in place, same operator as Solution.mutate
+	:param assignments: row of the population matrix, assignments[i] is the id of the employee assigned to mission i + 1, 0 if unassigned
+	:param instance: the instance
+	:param mutated_genes_per_chromosome_rate: rate of the assigned genes to mutate
+	"""
+	missions = instance.missions
+	employees = instance.employees
+	for _ in range(randint(1, max(int(mutated_genes_per_chromosome_rate * np.count_nonzero(assignments)), 1))):
+		gene1 = randint(1, len(missions))
+		skill = missions[gene1].skill_code
+
+		if assignments[gene1 - 1] == 0:
+			assignments[gene1 - 1] = randint(1, len(employees))
+
+			while employees[assignments[gene1 - 1]].skill_code != skill:
+				assignments[gene1 - 1] = randint(1, len(employees))
+
+		else:
+			gene2 = randint(1, len(missions))
+			while missions[gene2].skill_code != skill:
+				gene2 = randint(1, len(missions))
+
+			if assignments[gene2 - 1] == 0:
+				assignments[gene2 - 1] = assignments[gene1 - 1]
+
+				if random() < .5:
+					assignments[gene1 - 1] = 0
+
+			else:
+				assignments[gene1 - 1], assignments[gene2 - 1] = assignments[gene2 - 1], assignments[gene1 - 1]
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Callable
+import json
+import os
+import numpy as np
+from config import *
+
+
+def get_cache_folder(path_to_folder: Path) -> Path:
+	"""
+	Returns the folder where the binary cache of an instance folder is stored
+	:param path_to_folder: path to the folder of the instance
+	:return: path to the cache folder
+	"""
+	return path_to_folder / INSTANCE_CACHE_FOLDER
+
+
+def get_source_signature(source_path: Path) -> list[int]:
+	"""
+	Returns what identifies a version of a source file, its modification time and its size
+	:param source_path: path to the source file
+	:return: the modification time in nanoseconds and the size in bytes
+	"""
+	stat = source_path.stat()
+	return [stat.st_mtime_ns, stat.st_size]
+
+
+def open_cached_array(path_to_folder: Path, file_name: str, parse: Callable[[Path], np.ndarray], use_cache: bool = True) -> np.ndarray:
+	"""
+	Opens an array parsed from a csv file of an instance folder, from its binary cache when it is up to date
+	The array is compiled once into a .npy file, next to a .json header giving the cache version and the modification time and size
+	of the csv file it comes from, a change of either of them invalidating the cache
+	The .npy file is memory-mapped, so opening it is almost instant whatever its size, and the processes opening the same instance
+	share its pages instead of each holding a copy
+	If the cache cannot be written, the parsed array is returned as is
+	:param path_to_folder: path to the folder of the instance
+	:param file_name: name of the csv file in the folder
+	:param parse: function parsing the csv file, given the folder
+	:param use_cache: False to always parse the csv file, without reading nor writing the cache
+	:return: the array, read-only
+	"""
+	if not use_cache:
+		return parse(path_to_folder)
+
+	cache_folder = get_cache_folder(path_to_folder)
+	array_path = cache_folder / f"{Path(file_name).stem}.npy"
+	header_path = cache_folder / f"{Path(file_name).stem}.json"
+	header = {"version": INSTANCE_CACHE_VERSION, "source": get_source_signature(path_to_folder / file_name)}
+
+	try:
+		with open(header_path) as f:
+			cached_header = json.load(f)
+		if cached_header == dict(header, size=array_path.stat().st_size):
+			return np.load(array_path, mmap_mode="r")
+	except (OSError, ValueError):
+		pass  # no cache, or a corrupted one, which is rebuilt
+
+	array = np.ascontiguousarray(parse(path_to_folder))
+	try:
+		cache_folder.mkdir(exist_ok=True)
+		# written to temporary files then renamed, so that a process reading the cache never sees a partly written file
+		temporary_array_path = array_path.with_name(f"{array_path.name}.{os.getpid()}.tmp")
+		temporary_header_path = header_path.with_name(f"{header_path.name}.{os.getpid()}.tmp")
+		with open(temporary_array_path, "wb") as f:
+			np.save(f, array)
+		os.replace(temporary_array_path, array_path)
+		with open(temporary_header_path, "w") as f:
+			json.dump(dict(header, size=array_path.stat().st_size), f)
+		os.replace(temporary_header_path, header_path)
+	except OSError:
+		array.flags.writeable = False
+		return array
+
+	return np.load(array_path, mmap_mode="r")
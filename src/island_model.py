@@ -0,0 +1,174 @@
+from multiprocessing import Pool
+from os import cpu_count
+from random import Random, seed as random_seed
+from time import time
+import numpy as np
+from models.instance import Instance
+from models.population import Population
+from models.solution import Solution
+from models.fitness import Fitness
+from population_evaluator import PopulationEvaluator
+from fitness_cache import FitnessCache
+from genetic_algorithm import genetic_algorithm_iteration
+from genetic_algorithm_utils import generate_initial_population, pick_best_indices
+from utils import print_solution_evaluation
+from config import *
+
+
+TOPOLOGIES = ("ring", "fully_connected", "random")
+
+# state of an island worker process, set once by _init_island_worker so that the instance is not sent with every task
+_worker_evaluator: PopulationEvaluator = None
+_worker_fitness_cache: FitnessCache = None
+
+
+def _init_island_worker(instance: Instance, fitness_cache_size: int) -> None:
+	"""
+	Initializes an island worker process with the instance to solve
+	:param instance: the instance
+	:param fitness_cache_size: maximum number of evaluations kept in the fitness cache of the worker
+	"""
+	global _worker_evaluator, _worker_fitness_cache
+	_worker_evaluator = PopulationEvaluator(instance)
+	_worker_fitness_cache = FitnessCache(fitness_cache_size)
+
+
+def _seed_worker(seed: int) -> None:
+	"""
+	Seeds the random generators of a worker, so that every island and epoch draws its own random numbers
+	:param seed: the seed
+	"""
+	random_seed(seed)
+	np.random.seed(seed % 2**32)
+
+
+def _create_island(seed: int, size: int) -> tuple[np.ndarray,np.ndarray]:
+	"""
+	Creates and evaluates the initial population of an island
+	:param seed: seed of the island
+	:param size: size of the population
+	:return: the population matrix and its fitnesses
+	"""
+	_seed_worker(seed)
+	population = Population.from_solutions(generate_initial_population(_worker_evaluator.instance, size), _worker_evaluator.instance.missions_nb)
+	_, fitnesses = _worker_evaluator.evaluate(population.assignments)
+	best_indices = pick_best_indices(fitnesses, size)
+	return population.assignments[best_indices], fitnesses[best_indices]
+
+
+def _run_island_epoch(seed: int, assignments: np.ndarray, fitnesses: np.ndarray, iterations: int, deadline: float, size: int, crossover_rate: float, mutation_rate: float, k: int, mutated_genes_per_chromosome_rate: float) -> tuple[np.ndarray,np.ndarray,int]:
+	"""
+	Runs the genetic algorithm on an island between two migrations
+	:param seed: seed of the island for this epoch
+	:param assignments: population matrix of the island
+	:param fitnesses: fitnesses of the population
+	:param iterations: number of iterations to run
+	:param deadline: time at which the epoch stops even if all the iterations were not run
+	:return: the new population matrix, its fitnesses and the number of iterations run
+	"""
+	_seed_worker(seed)
+	population = Population(assignments, fitnesses)
+	nb_it = 0
+	while nb_it < iterations and time() < deadline:
+		nb_it += 1
+		population, _, _ = genetic_algorithm_iteration(_worker_evaluator, population, size, crossover_rate, mutation_rate, k, mutated_genes_per_chromosome_rate, _worker_fitness_cache)
+	return population.assignments, population.fitnesses, nb_it
+
+
+def migrate(populations: list[Population], migrants_nb: int, topology: str, rng: Random) -> None:
+	"""
+	Sends copies of the best individuals of each island to other islands, where they replace the worst individuals
+	The populations are sorted by decreasing fitness, and stay sorted
+	:param populations: populations of the islands
+	:param migrants_nb: number of individuals sent by each island
+	:param topology: "ring" sends to the next island, "fully_connected" gives each island the best migrants of all the others,
+	"random" sends to a random other island
+	:param rng: random generator used by the random topology
+	"""
+	islands_nb = len(populations)
+	if islands_nb < 2 or migrants_nb <= 0:
+		return
+
+	emigrants = [(population.assignments[:migrants_nb].copy(), population.fitnesses[:migrants_nb].copy()) for population in populations]
+
+	for i, population in enumerate(populations):
+		if topology == "ring":
+			sources = [(i - 1) % islands_nb]
+		elif topology == "fully_connected":
+			sources = [j for j in range(islands_nb) if j != i]
+		elif topology == "random":
+			sources = [rng.choice([j for j in range(islands_nb) if j != i])]
+		else:
+			raise ValueError(f"unknown migration topology {topology}, expected one of {TOPOLOGIES}")
+
+		immigrants = np.concatenate([emigrants[j][0] for j in sources])
+		immigrants_fitnesses = np.concatenate([emigrants[j][1] for j in sources])
+		best_immigrants = pick_best_indices(immigrants_fitnesses, min(migrants_nb, len(population)))  # several sources may send more migrants than the island has individuals
+
+		kept = len(population) - len(best_immigrants)
+		assignments = np.concatenate((population.assignments[:kept], immigrants[best_immigrants]))
+		fitnesses = np.concatenate((population.fitnesses[:kept], immigrants_fitnesses[best_immigrants]))
+		best_indices = pick_best_indices(fitnesses, len(fitnesses))
+		populations[i] = Population(assignments[best_indices], fitnesses[best_indices])
+
+
+def island_genetic_algorithm(instance: Instance, size: int, crossover_rate: float, mutation_rate: float, max_execution_time: float, k: int, mutated_genes_per_chromosome_rate: float, islands_nb: int = None, migration_interval: int = DEFAULT_MIGRATION_INTERVAL, migrants_nb: int = DEFAULT_MIGRANTS, topology: str = "ring", seed: int = None, fitness_cache_size: int = FITNESS_CACHE_MAX_ENTRIES) -> Solution:
+	"""
+	Performs the genetic algorithm on several independent populations (islands), each one evolving in its own process
+	Every migration_interval iterations, the islands exchange their best individuals following the migration topology
+	:param instance: the instance to solve
+	:param size: size of the population of each island
+	:param crossover_rate: probability of crossover
+	:param mutation_rate: probability of mutation
+	:param max_execution_time: maximum execution time of the algorithm in seconds
+	:param k: number of individuals to consider in tournament selection
+	:param mutated_genes_per_chromosome_rate: rate of the assigned genes to mutate
+	:param islands_nb: number of islands, one per CPU core by default
+	:param migration_interval: number of iterations of each island between two migrations
+	:param migrants_nb: number of individuals sent by each island at each migration
+	:param topology: migration topology, one of TOPOLOGIES
+	:param seed: seed of the run, None for a random one
+	:param fitness_cache_size: maximum number of evaluations kept in the fitness cache of each process
+	:return: the best solution found by all the islands
+	"""
+	if topology not in TOPOLOGIES:
+		raise ValueError(f"unknown migration topology {topology}, expected one of {TOPOLOGIES}")
+
+	start_time = time()
+	deadline = start_time + max_execution_time
+	islands_nb = islands_nb or cpu_count() or 1
+	rng = Random(seed)
+
+	with Pool(min(islands_nb, cpu_count() or 1), initializer=_init_island_worker, initargs=(instance, fitness_cache_size)) as pool:
+		islands = pool.starmap(_create_island, [(rng.getrandbits(63), size) for _ in range(islands_nb)])
+		populations = [Population(assignments, fitnesses) for assignments, fitnesses in islands]
+
+		best_population = max(populations, key=lambda population: Fitness.from_record(population.fitnesses[0]))
+		best_assignments = best_population.assignments[0].copy()
+		best_fitness = Fitness.from_record(best_population.fitnesses[0])
+
+		print(f"  Best initial solution of {islands_nb} islands:")
+
+		print_solution_evaluation(best_fitness)
+
+		print("\nRunning island genetic algorithm...")
+
+		nb_it = 0
+		nb_epochs = 0
+		while time() < deadline:
+			nb_epochs += 1
+			epochs = pool.starmap(_run_island_epoch, [(rng.getrandbits(63), population.assignments, population.fitnesses, migration_interval, deadline, size, crossover_rate, mutation_rate, k, mutated_genes_per_chromosome_rate) for population in populations])
+			populations = [Population(assignments, fitnesses) for assignments, fitnesses, _ in epochs]
+			nb_it += max(epoch_it for _, _, epoch_it in epochs)
+
+			for population in populations:
+				if Fitness.from_record(population.fitnesses[0]) > best_fitness:
+					best_assignments = population.assignments[0].copy()
+					best_fitness = Fitness.from_record(population.fitnesses[0])
+					print(f"  New best solution: {tuple(best_fitness)} at iteration {nb_it}")
+
+			migrate(populations, migrants_nb, topology, rng)
+
+	print(f"  {nb_it} iterations per island, {nb_epochs} migrations")
+
+	return Solution.from_array(best_assignments)
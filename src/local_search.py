@@ -0,0 +1,255 @@
+from __future__ import annotations
+from bisect import insort
+from random import shuffle
+from typing import Iterator
+from config import *
+from models.instance import Instance
+from models.population import Population
+from models.solution import Solution
+from models.fitness import Fitness
+from models.solution_state import SolutionState, evaluate_day_route
+from fitness_cache import zobrist_hash
+from genetic_algorithm_utils import pick_best_indices
+
+
+LOCAL_SEARCH_STRATEGIES = ("first", "best")
+
+# a move is the list of the assignments it changes (mission id, new employee id or None to unassign),
+# the routes it changes by (employee id, day), the change of the number of assignments and the change of the number of corresponding specialities
+Move = tuple[list[tuple[int,int]], dict[tuple[int,int], list[int]], int, int]
+
+
+def get_route_with(instance: Instance, route: list[int], mission_id: int) -> list[int]:
+	"""
+	Returns a copy of a route with a mission inserted at its place, as SolutionState.add() does
+	:param instance: the instance
+	:param route: ids of the missions of the route, sorted by start time
+	:param mission_id: id of the mission to insert
+	:return: the new route
+	"""
+	missions = instance.missions
+	new_route = list(route)
+	insort(new_route, mission_id, key=lambda m: (missions[m].start_time, m))
+	return new_route
+
+
+def get_route_without(route: list[int], mission_id: int) -> list[int]:
+	"""
+	Returns a copy of a route without a mission
+	:param route: ids of the missions of the route
+	:param mission_id: id of the mission to remove
+	:return: the new route
+	"""
+	return [m for m in route if m != mission_id]
+
+
+def evaluate_move(state: SolutionState, changed_routes: dict[tuple[int,int], list[int]]) -> tuple[bool,float]:
+	"""
+	Evaluates the routes changed by a move against the evaluations cached in the state, without changing the state
+	:param state: the incremental evaluation state of the solution, valid before the move
+	:param changed_routes: new route of each changed (employee id, day)
+	:return: whether the solution stays valid, and the change of the total distance
+	"""
+	state.refresh()
+	instance = state.instance
+	distance_change = 0.
+	work_time_changes = dict()
+
+	for (employee_id, day), route in changed_routes.items():
+		_, old_distance, old_work_time = state.route_evaluations.get(employee_id, dict()).get(day, (True, 0., 0.))
+		if route:
+			is_feasible, distance, work_time = evaluate_day_route(instance, instance.employees[employee_id].center_id, route)
+			if not is_feasible:
+				return False, 0.
+		else:
+			distance, work_time = 0., 0.
+		distance_change += distance - old_distance
+		work_time_changes[employee_id] = work_time_changes.get(employee_id, 0.) + work_time - old_work_time
+
+	for employee_id, work_time_change in work_time_changes.items():
+		if state.weekly_work_time.get(employee_id, 0.) + work_time_change > MAX_WEEKLY_WORK_TIME:
+			return False, 0.
+
+	return True, distance_change
+
+
+def get_insert_moves(solution: Solution, instance: Instance) -> Iterator[Move]:
+	"""
+	Generates the moves assigning an unassigned mission to an employee with its skill
+	:param solution: the solution, with its incremental evaluation state
+	:param instance: the instance
+	:return: the moves
+	"""
+	routes = solution.state.routes
+	unassigned = [mission_id for mission_id in instance.missions if mission_id not in solution.assignments]
+	shuffle(unassigned)
+	for mission_id in unassigned:
+		mission = instance.missions[mission_id]
+		for employee_id in instance.employees_by_skill.get(mission.skill, []):
+			route = routes.get(employee_id, dict()).get(mission.day, [])
+			speciality_change = instance.employees[employee_id].speciality_code == mission.speciality_code
+			yield [(mission_id, employee_id)], {(employee_id, mission.day): get_route_with(instance, route, mission_id)}, 1, speciality_change
+
+
+def get_relocate_moves(solution: Solution, instance: Instance) -> Iterator[Move]:
+	"""
+	Generates the moves reassigning an assigned mission to another employee with its skill
+	:param solution: the solution, with its incremental evaluation state
+	:param instance: the instance
+	:return: the moves
+	"""
+	routes = solution.state.routes
+	assigned = list(solution.assignments.items())
+	shuffle(assigned)
+	for mission_id, employee_id in assigned:
+		mission = instance.missions[mission_id]
+		route = get_route_without(routes[employee_id][mission.day], mission_id)
+		old_speciality = instance.employees[employee_id].speciality_code == mission.speciality_code
+		for other_employee_id in instance.employees_by_skill.get(mission.skill, []):
+			if other_employee_id == employee_id:
+				continue
+			other_route = routes.get(other_employee_id, dict()).get(mission.day, [])
+			speciality_change = (instance.employees[other_employee_id].speciality_code == mission.speciality_code) - old_speciality
+			yield [(mission_id, other_employee_id)], {(employee_id, mission.day): route, (other_employee_id, mission.day): get_route_with(instance, other_route, mission_id)}, 0, speciality_change
+
+
+def get_swap_moves(solution: Solution, instance: Instance) -> Iterator[Move]:
+	"""
+	Generates the moves exchanging the employees of two missions of the same day and skill
+	:param solution: the solution, with its incremental evaluation state
+	:param instance: the instance
+	:return: the moves
+	"""
+	routes = solution.state.routes
+	employees = instance.employees
+	missions_by_group = dict()
+	for mission_id, employee_id in solution.assignments.items():
+		mission = instance.missions[mission_id]
+		missions_by_group.setdefault((mission.day, mission.skill_code), []).append((mission_id, employee_id))
+
+	pairs = [(first, second) for group in missions_by_group.values() for i, first in enumerate(group) for second in group[i + 1:] if first[1] != second[1]]
+	shuffle(pairs)
+	for (mission_id1, employee_id1), (mission_id2, employee_id2) in pairs:
+		mission1 = instance.missions[mission_id1]
+		mission2 = instance.missions[mission_id2]
+		day = mission1.day
+		route1 = get_route_with(instance, get_route_without(routes[employee_id1][day], mission_id1), mission_id2)
+		route2 = get_route_with(instance, get_route_without(routes[employee_id2][day], mission_id2), mission_id1)
+		speciality_change = (employees[employee_id2].speciality_code == mission1.speciality_code) + (employees[employee_id1].speciality_code == mission2.speciality_code) \
+							- (employees[employee_id1].speciality_code == mission1.speciality_code) - (employees[employee_id2].speciality_code == mission2.speciality_code)
+		yield [(mission_id1, employee_id2), (mission_id2, employee_id1)], {(employee_id1, day): route1, (employee_id2, day): route2}, 0, speciality_change
+
+
+NEIGHBOURHOODS = (get_insert_moves, get_relocate_moves, get_swap_moves)
+
+
+def apply_move(solution: Solution, assignments: list[tuple[int,int]]) -> list[tuple[int,int]]:
+	"""
+	Changes the assignments of a solution
+	:param solution: the solution
+	:param assignments: mission ids and their new employee ids, None to unassign
+	:return: the changes undoing the move
+	"""
+	undo = [(mission_id, solution.assignments.get(mission_id)) for mission_id, _ in assignments]
+	for mission_id, employee_id in assignments:
+		if employee_id is None:
+			solution.unassign(mission_id)
+		else:
+			solution.assign(mission_id, employee_id)
+	return undo
+
+
+def local_search(solution: Solution, instance: Instance, strategy: str = "first", max_evaluations: int = LOCAL_SEARCH_MAX_EVALUATIONS) -> int:
+	"""
+	Improves a valid solution with insert, relocate and swap moves until no move improves it
+	Each move is scored by evaluating only the routes it changes against the evaluations cached in the incremental state of the solution
+	:param solution: the solution to improve, in place, its incremental evaluation is enabled if needed
+	:param instance: the instance
+	:param strategy: "first" applies the first improving move found in a neighbourhood, "best" the best move of the neighbourhood
+	:param max_evaluations: maximum number of moves evaluated
+	:return: the number of moves applied
+	"""
+	if strategy not in LOCAL_SEARCH_STRATEGIES:
+		raise ValueError(f"unknown local search strategy {strategy}, expected one of {LOCAL_SEARCH_STRATEGIES}")
+	if solution.state is None:
+		solution.enable_incremental_evaluation(instance)
+
+	is_valid, fitness = solution.check_and_get_fitness(instance)
+	if not is_valid:
+		return 0
+
+	evaluations_nb = 0
+	moves_nb = 0
+	improved = True
+	while improved and evaluations_nb < max_evaluations:
+		improved = False
+		for get_moves in NEIGHBOURHOODS:
+			total_distance = solution.state.get_total_distance()
+			assignments_nb = len(solution.assignments)
+			specialities_count = solution.state.specialities_count
+			best_move, best_fitness = None, fitness
+
+			for assignments, changed_routes, assignments_change, speciality_change in get_moves(solution, instance):
+				evaluations_nb += 1
+				if evaluations_nb > max_evaluations:
+					break
+				is_valid, distance_change = evaluate_move(solution.state, changed_routes)
+				if not is_valid:
+					continue
+				move_fitness = Fitness(assignments_nb + assignments_change, int(COST_PER_KM * (total_distance + distance_change)), specialities_count + speciality_change)
+				if move_fitness > best_fitness:
+					best_move, best_fitness = assignments, move_fitness
+					if strategy == "first":
+						break
+
+			if best_move is None:
+				continue
+
+			# the fitness of the move was estimated from a sum of distance changes, the move is kept only if the exact fitness is better
+			undo = apply_move(solution, best_move)
+			is_valid, new_fitness = solution.check_and_get_fitness(instance)
+			if is_valid and new_fitness > fitness:
+				fitness = new_fitness
+				moves_nb += 1
+				improved = True
+			else:
+				apply_move(solution, undo)
+				solution.check_and_get_fitness(instance)
+
+	return moves_nb
+
+
+def improve_elites(population: Population, instance: Instance, elites_nb: int, searched: set[int], strategy: str = "first", max_evaluations: int = LOCAL_SEARCH_MAX_EVALUATIONS) -> tuple[Population,int]:
+	"""
+	Applies the local search to the best individuals of a population that were not searched yet (memetic step of the genetic algorithm)
+	Only the hashes of the individuals still in the population are kept in searched, so that it stays as small as the population
+	:param population: population sorted by decreasing fitness
+	:param instance: the instance
+	:param elites_nb: number of best individuals to consider
+	:param searched: hashes of the individuals of the population already searched, or found by a search, updated by the function
+	:param strategy: local search strategy, see local_search()
+	:param max_evaluations: maximum number of moves evaluated for each individual
+	:return: the population with the improved individuals, sorted by decreasing fitness, and the number of individuals improved
+	"""
+	elites_nb = min(elites_nb, len(population))
+	hashes = zobrist_hash(population.assignments[:elites_nb]).tolist()
+	assignments = population.assignments.copy()
+	fitnesses = population.fitnesses.copy()
+	improved_nb = 0
+
+	for i, key in enumerate(hashes):
+		if key in searched:
+			continue
+		searched.add(key)
+		solution = population.get_solution(i)
+		if local_search(solution, instance, strategy, max_evaluations) > 0:
+			assignments[i] = solution.to_array(instance.missions_nb)
+			fitnesses[i] = solution.check_and_get_fitness(instance)[1]
+			searched.add(solution.get_hash())
+			improved_nb += 1
+
+	if improved_nb > 0:
+		best_indices = pick_best_indices(fitnesses, len(fitnesses))
+		population = Population(assignments[best_indices], fitnesses[best_indices])
+	searched.intersection_update(zobrist_hash(population.assignments).tolist())
+	return population, improved_nb
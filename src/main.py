@@ -1,28 +1,306 @@
+from argparse import ArgumentParser, Namespace
+from functools import partial
+from multiprocessing import Pool
 from pathlib import Path
 from utils import *
 from genetic_algorithm import *
+from local_search import LOCAL_SEARCH_STRATEGIES
+from run_controller import RunController, STALL_ACTIONS
+from profiler import Profiler, NULL_PROFILER
+from reoptimization import reoptimize, adapt_solution
+from decomposition import DECOMPOSITIONS, solve_by_parts
+from exact_solver import solve_exact, get_assignments_upper_bound
+from island_model import TOPOLOGIES, island_genetic_algorithm
+from random import seed as random_seed
+from time import time
 
 
-if __name__ == "__main__":
-	
+# instances, evaluators and fitness caches built by this process, by instance path, reused by the following solves of the same instance
+_solver_contexts: dict[Path, tuple[Instance, PopulationEvaluator | ParallelEvaluator, FitnessCache]] = dict()
+
+
+def parse_ids(text: str) -> list[int]:
+	"""
+	Parses a comma-separated list of ids of the command line
+	:param text: the list, such as "3,12,40"
+	:return: the ids
+	"""
+	return [int(value) for value in text.split(",") if value.strip()]
+
+
+def parse_arguments(arguments: list[str] = None) -> Namespace:
+	"""
+	Parses the command line arguments
+	:param arguments: the arguments, the ones of the command line by default
+	:return: the parsed arguments
+	"""
+	parser = ArgumentParser(description="Assigns missions to employees with a genetic algorithm, or by branch and bound with --exact. Without any instance, the parameters are asked interactively.")
+	parser.add_argument("instances", nargs="*", type=Path, help="instance folders to solve, one after the other or in parallel with --jobs")
+	parser.add_argument("-s", "--size", type=int, default=DEFAULT_POPULATION_SIZE, help="population size")
+	parser.add_argument("-c", "--crossover-rate", type=float, default=DEFAULT_CROSSOVER_RATE, help="probability of crossover")
+	parser.add_argument("-m", "--mutation-rate", type=float, default=DEFAULT_MUTATION_RATE, help="probability of mutation")
+	parser.add_argument("-t", "--time", type=float, default=None, help=f"time budget of each solve, in seconds, {DEFAULT_MAX_EXECUTION_TIME} by default and {REOPTIMIZATION_MAX_EXECUTION_TIME} with --reoptimize")
+	parser.add_argument("-k", "--tournament-size", type=int, default=DEFAULT_TOURNAMENT_SIZE, help="number of individuals to consider in tournament selection")
+	parser.add_argument("-g", "--mutated-genes-rate", type=float, default=DEFAULT_MUTATED_GENES_PER_CHROMOSOME_RATE, help="rate of the assigned genes to mutate")
+	parser.add_argument("--seed", type=int, default=None, help="seed of the random generators, run i of an instance uses seed + i")
+	parser.add_argument("--runs", type=int, default=1, help="number of solves of each instance, sharing the loaded instance and the fitness cache")
+	parser.add_argument("-j", "--jobs", type=int, default=1, help="number of instances solved in parallel")
+	parser.add_argument("-w", "--workers", type=int, default=None, help="number of processes evaluating the children of each solve, 1 by default, or solving its parts with --decompose, one per part up to the number of CPU cores by default, only without --jobs")
+	parser.add_argument("--cache-size", type=int, default=FITNESS_CACHE_MAX_ENTRIES, help="maximum number of evaluations kept in the fitness cache of each instance")
+	parser.add_argument("--distance-model", choices=DISTANCE_MODELS, default="auto", help="how the distances are read: full matrix, coordinates, or sparse matrix completed by the coordinates")
+	parser.add_argument("--metric", choices=CoordinatesDistanceProvider.METRICS, default="euclidean", help="metric of the coordinates: positions in km, or latitudes and longitudes in degrees")
+	parser.add_argument("--no-cache", dest="cache", action="store_false", help="parse the csv files of the instances instead of using their binary cache")
+	parser.add_argument("--local-search", type=int, default=DEFAULT_LOCAL_SEARCH_ELITES, metavar="ELITES", help="number of best individuals improved by local search at each iteration, 0 to disable it")
+	parser.add_argument("--local-search-strategy", choices=LOCAL_SEARCH_STRATEGIES, default="first", help="apply the first improving move found, or the best move of each neighbourhood")
+	parser.add_argument("--local-search-evaluations", type=int, default=LOCAL_SEARCH_MAX_EVALUATIONS, help="maximum number of moves evaluated by the local search of one individual")
+	parser.add_argument("--crossover", choices=CROSSOVER_OPERATORS, default="uniform", help="crossover by gene, or by whole days of the employees")
+	parser.add_argument("--repair", action="store_true", help="repair the invalid children instead of discarding them")
+	parser.add_argument("--stall-iterations", type=int, default=None, help="the search stalls after this number of iterations without improvement")
+	parser.add_argument("--stall-time", type=float, default=None, help="the search stalls after this number of seconds without improvement")
+	parser.add_argument("--on-stall", choices=STALL_ACTIONS, default="stop", help="stop the solve when the search stalls, or spend the remaining time on a new population or on a perturbation of the population")
+	parser.add_argument("--max-restarts", type=int, default=None, help="maximum number of restarts or perturbations, the solve stops when the search stalls once more")
+	parser.add_argument("--target-assignments", type=int, default=None, help="stop the solve once this number of missions is assigned")
+	parser.add_argument("--profile", action="store_true", help="measure the time spent in each phase of the genetic algorithm, and print it at the end of each solve")
+	parser.add_argument("--trace", type=Path, default=None, help="file where the state of each generation is written, as CSV if its extension is .csv and as JSON lines otherwise, suffixed by the instance and the run when there are several solves")
+	parser.add_argument("--checkpoint", type=Path, default=None, help="file where the state of the solve is saved periodically as .npz, suffixed by the instance and the run when there are several solves")
+	parser.add_argument("--checkpoint-interval", type=float, default=CHECKPOINT_INTERVAL, help="seconds between two checkpoints")
+	parser.add_argument("--resume", action="store_true", help="resume the solve saved in the --checkpoint file if it exists, with the remaining time of its budget")
+	parser.add_argument("--history", type=Path, default=None, help="CSV file where each improvement of the best solution is written as soon as it is found, appended to when resuming, suffixed by the instance and the run when there are several solves")
+	parser.add_argument("--warm-start", type=Path, default=None, metavar="SOLUTION", help="solution file of each instance folder, such as solution0.csv, put in the initial population")
+	parser.add_argument("--reoptimize", type=Path, default=None, metavar="SOLUTION", help="solution file of each instance folder to re-optimise after a few changes, re-solving the schedules of the affected employees only")
+	parser.add_argument("--unavailable-employees", type=parse_ids, default=[], metavar="IDS", help="with --reoptimize, comma-separated ids of the employees that cannot work anymore")
+	parser.add_argument("--cancelled-missions", type=parse_ids, default=[], metavar="IDS", help="with --reoptimize, comma-separated ids of the missions that are cancelled")
+	parser.add_argument("--changed-missions", type=parse_ids, default=[], metavar="IDS", help="with --reoptimize, comma-separated ids of the missions whose day, times, skill or speciality were changed in missions.csv")
+	parser.add_argument("--added-missions", type=parse_ids, default=[], metavar="IDS", help="with --reoptimize, comma-separated ids of the missions added to missions.csv since the solution was saved")
+	parser.add_argument("--decompose", choices=DECOMPOSITIONS, default=None, help="split each instance by skill, or by skill and nearest center, and solve the parts at once on --workers processes")
+	parser.add_argument("--islands", type=int, default=None, help="run the island model instead, this number of populations evolving in their own processes and exchanging their best individuals")
+	parser.add_argument("--migration-interval", type=int, default=None, help=f"with --islands, number of iterations of each island between two migrations, {DEFAULT_MIGRATION_INTERVAL} by default")
+	parser.add_argument("--migrants", type=int, default=None, help=f"with --islands, number of individuals sent by each island at each migration, {DEFAULT_MIGRANTS} by default")
+	parser.add_argument("--topology", choices=TOPOLOGIES, default=None, help="with --islands, to which islands the migrants are sent, ring by default")
+	parser.add_argument("--exact", action="store_true", help="solve each instance by branch and bound instead of the genetic algorithm, and print an upper bound of the number of missions that can be assigned and whether the solution is proved optimal")
+	parser.add_argument("--exact-nodes", type=int, default=EXACT_MAX_NODES, help="with --exact, maximum number of nodes of each search of each part of an instance")
+	parser.add_argument("--gap", type=float, default=None, help="stop the solve once the missions assigned are within this fraction of an upper bound of the number of missions that can be assigned, 0 to stop at the bound only")
+	parser.add_argument("--no-save", action="store_true", help="do not save the solutions in the instance folders")
+
+	arguments = parser.parse_args(arguments)
+	if arguments.size <= 0 or arguments.tournament_size <= 0 or arguments.runs <= 0 or arguments.jobs <= 0 or (arguments.workers is not None and arguments.workers <= 0):
+		parser.error("the population size, tournament size, runs, jobs and workers must be positive")
+	if arguments.local_search < 0 or arguments.local_search_evaluations <= 0:
+		parser.error("the number of local search elites must not be negative, and its number of evaluations must be positive")
+	if any(value is not None and value <= 0 for value in (arguments.stall_iterations, arguments.stall_time, arguments.target_assignments)) or (arguments.max_restarts is not None and arguments.max_restarts < 0):
+		parser.error("the stall iterations and time and the target assignments must be positive, and the maximum number of restarts must not be negative")
+	if arguments.checkpoint_interval < 0 or (arguments.resume and arguments.checkpoint is None):
+		parser.error("the checkpoint interval must not be negative, and --resume needs a --checkpoint file")
+	if arguments.reoptimize is not None and (arguments.warm_start is not None or arguments.target_assignments is not None or arguments.checkpoint is not None or arguments.history is not None or arguments.profile or arguments.trace is not None):
+		parser.error("--reoptimize cannot be combined with --warm-start, --target-assignments, --checkpoint, --history, --profile or --trace")
+	if arguments.reoptimize is None and (arguments.unavailable_employees or arguments.cancelled_missions or arguments.changed_missions or arguments.added_missions):
+		parser.error("the unavailable employees and the cancelled, changed and added missions need --reoptimize")
+	if arguments.decompose is not None and (arguments.reoptimize is not None or arguments.warm_start is not None or arguments.target_assignments is not None or arguments.checkpoint is not None or arguments.history is not None or arguments.profile or arguments.trace is not None):
+		parser.error("--decompose cannot be combined with --reoptimize, --warm-start, --target-assignments, --checkpoint, --history, --profile or --trace")
+	if arguments.exact and (arguments.reoptimize is not None or arguments.decompose is not None or arguments.warm_start is not None or arguments.target_assignments is not None or arguments.checkpoint is not None or arguments.history is not None or arguments.profile or arguments.trace is not None or arguments.gap is not None):
+		parser.error("--exact cannot be combined with --reoptimize, --decompose, --warm-start, --target-assignments, --checkpoint, --history, --profile, --trace or --gap")
+	if arguments.gap is not None and (arguments.reoptimize is not None or arguments.decompose is not None):
+		parser.error("--gap cannot be combined with --reoptimize or --decompose, which solve parts of the instances")
+	if arguments.exact_nodes <= 0 or (arguments.gap is not None and not 0 <= arguments.gap < 1):
+		parser.error("the number of nodes of the exact solver must be positive, and the gap must be between 0 and 1")
+	if arguments.islands is not None and (arguments.reoptimize is not None or arguments.decompose is not None or arguments.exact or arguments.warm_start is not None or arguments.target_assignments is not None or arguments.checkpoint is not None or arguments.history is not None or arguments.profile or arguments.trace is not None or arguments.gap is not None):
+		parser.error("--islands cannot be combined with --reoptimize, --decompose, --exact, --warm-start, --target-assignments, --checkpoint, --history, --profile, --trace or --gap")
+	if arguments.islands is not None and (arguments.local_search > 0 or arguments.crossover != "uniform" or arguments.repair or arguments.stall_iterations is not None or arguments.stall_time is not None or arguments.on_stall != "stop" or arguments.max_restarts is not None or arguments.jobs > 1 or arguments.workers is not None):
+		parser.error("the islands run the uniform crossover without local search, repair or stall handling, on one process each, so --islands cannot be combined with these options, --jobs or --workers")
+	if arguments.islands is None and (arguments.migration_interval is not None or arguments.migrants is not None or arguments.topology is not None):
+		parser.error("the migration interval, migrants and topology need --islands")
+	if any(value is not None and value <= 0 for value in (arguments.islands, arguments.migration_interval)) or (arguments.migrants is not None and not 0 <= arguments.migrants <= arguments.size):
+		parser.error("the number of islands and the migration interval must be positive, and the number of migrants must be between 0 and the population size")
+	if arguments.time is None:
+		arguments.time = REOPTIMIZATION_MAX_EXECUTION_TIME if arguments.reoptimize is not None else DEFAULT_MAX_EXECUTION_TIME
+	if arguments.time <= 0:
+		parser.error("the time budget must be positive")
+	if not 0 <= arguments.crossover_rate <= 1 or not 0 <= arguments.mutation_rate <= 1 or not 0 <= arguments.mutated_genes_rate <= 1:
+		parser.error("the rates must be between 0 and 1")
+	for instance_path in arguments.instances:
+		if not (instance_path / "missions.csv").is_file():
+			parser.error(f"{instance_path} is not an instance folder")
+
+	return arguments
+
+
+def get_solver_context(instance_path: Path, arguments: Namespace) -> tuple[Instance, PopulationEvaluator | ParallelEvaluator, FitnessCache]:
+	"""
+	Returns the instance, evaluator and fitness cache of an instance folder, loading them on the first call only
+	:param instance_path: path to the folder of the instance
+	:param arguments: the parsed arguments, giving the distance model, the number of processes of the evaluator and the size of the fitness cache
+	:return: the instance, its evaluator and its fitness cache
+	"""
+	instance_path = instance_path.resolve()
+	context = _solver_contexts.get(instance_path)
+	if context is None:
+		instance = open_instance(instance_path, arguments.distance_model, arguments.metric, arguments.cache)
+		evaluator = ParallelEvaluator(instance, arguments.workers) if arguments.workers is not None and arguments.workers > 1 and arguments.decompose is None else PopulationEvaluator(instance)
+		context = (instance, evaluator, FitnessCache(arguments.cache_size))
+		_solver_contexts[instance_path] = context
+	return context
+
+
+def release_solver_context(instance_path: Path) -> None:
+	"""
+	Forgets the instance, evaluator and fitness cache of an instance folder, and stops the worker processes of the evaluator
+	:param instance_path: path to the folder of the instance
+	"""
+	context = _solver_contexts.pop(instance_path.resolve(), None)
+	if context is not None and isinstance(context[1], ParallelEvaluator):
+		context[1].close()
+
+
+def solve_instance(instance_path: Path, arguments: Namespace, run: int) -> tuple[Path,int,Fitness,bool,float]:
+	"""
+	Solves an instance with the parameters of the command line, and saves the solution in the instance folder unless --no-save is given
+	:param instance_path: path to the folder of the instance
+	:param arguments: the parsed arguments
+	:param run: index of the run on this instance, offsetting the seed
+	:return: the instance path, the run index, the fitness and validity of the solution, and the time taken in seconds
+	"""
+	start_time = time()
+	instance, evaluator, fitness_cache = get_solver_context(instance_path, arguments)
+
+	if arguments.seed is not None:
+		random_seed(arguments.seed + run)
+		np.random.seed((arguments.seed + run) % 2**32)
+
+	# the lowest fitness of a solution assigning the target number of missions, whatever its travel cost and specialities
+	target_fitness = Fitness(arguments.target_assignments, np.iinfo(np.int64).max, 0) if arguments.target_assignments is not None else None
+	upper_bound = get_assignments_upper_bound(instance) if arguments.gap is not None else None
+	controller = RunController(arguments.time, stall_iterations=arguments.stall_iterations, stall_time=arguments.stall_time, target_fitness=target_fitness, stall_action=arguments.on_stall, max_restarts=arguments.max_restarts, upper_bound=upper_bound, gap=arguments.gap or 0.)
+
+	profiler = Profiler(get_output_path(arguments.trace, instance_path, arguments, run)) if arguments.profile or arguments.trace is not None else NULL_PROFILER
+
+	try:
+		if arguments.reoptimize is not None:
+			solution = reoptimize(instance, open_solution_csv(instance_path / arguments.reoptimize), arguments.size, arguments.crossover_rate, arguments.mutation_rate, arguments.time, arguments.tournament_size, arguments.mutated_genes_rate, set(arguments.unavailable_employees), set(arguments.cancelled_missions), set(arguments.changed_missions), set(arguments.added_missions), controller)
+		elif arguments.exact:
+			solution, upper_bound, is_optimal = solve_exact(instance, arguments.exact_nodes)
+			print(f"{instance_path} run {run}: at most {upper_bound} missions can be assigned, the solution is {'proved optimal' if is_optimal else 'not proved optimal'}")
+		elif arguments.islands is not None:
+			solution = island_genetic_algorithm(instance, arguments.size, arguments.crossover_rate, arguments.mutation_rate, arguments.time, arguments.tournament_size, arguments.mutated_genes_rate, arguments.islands, arguments.migration_interval or DEFAULT_MIGRATION_INTERVAL, DEFAULT_MIGRANTS if arguments.migrants is None else arguments.migrants, arguments.topology or "ring", None if arguments.seed is None else arguments.seed + run, arguments.cache_size)
+		elif arguments.decompose is not None:
+			solution = solve_by_parts(instance, partial(solve_part, arguments=arguments), arguments.time, arguments.decompose, arguments.workers, None if arguments.seed is None else arguments.seed + run)
+		else:
+			initial_solutions = [adapt_solution(open_solution_csv(instance_path / arguments.warm_start), instance)[0]] if arguments.warm_start is not None else None
+			solution = genetic_algorithm(instance, arguments.size, arguments.crossover_rate, arguments.mutation_rate, arguments.time, arguments.tournament_size, arguments.mutated_genes_rate, evaluator=evaluator, fitness_cache=fitness_cache, local_search_elites=arguments.local_search, local_search_strategy=arguments.local_search_strategy, local_search_max_evaluations=arguments.local_search_evaluations, crossover_operator=arguments.crossover, repair=arguments.repair, controller=controller, profiler=profiler, checkpoint_path=get_output_path(arguments.checkpoint, instance_path, arguments, run), checkpoint_interval=arguments.checkpoint_interval, resume=arguments.resume, history_path=get_output_path(arguments.history, instance_path, arguments, run), initial_solutions=initial_solutions)
+	finally:
+		profiler.close()
+	evaluation = solution.evaluate(instance)
+	is_valid = solution.is_valid(instance)
+
+	if not arguments.no_save:
+		save_solution_assignments(solution, instance.missions, instance.employees, instance_path, evaluation)
+
+	return instance_path, run, evaluation, is_valid, time() - start_time
+
+
+def solve_part(part: Instance, max_execution_time: float, arguments: Namespace) -> Solution:
+	"""
+	Solves a part of an instance with the genetic algorithm and the parameters of the command line, for --decompose
+	:param part: the part, as an instance
+	:param max_execution_time: time budget of the part, in seconds
+	:param arguments: the parsed arguments
+	:return: the solution of the part
+	"""
+	controller = RunController(max_execution_time, stall_iterations=arguments.stall_iterations, stall_time=arguments.stall_time, stall_action=arguments.on_stall, max_restarts=arguments.max_restarts)
+	return genetic_algorithm(part, arguments.size, arguments.crossover_rate, arguments.mutation_rate, max_execution_time, arguments.tournament_size, arguments.mutated_genes_rate, fitness_cache_size=arguments.cache_size, local_search_elites=arguments.local_search, local_search_strategy=arguments.local_search_strategy, local_search_max_evaluations=arguments.local_search_evaluations, crossover_operator=arguments.crossover, repair=arguments.repair, controller=controller)
+
+
+def get_output_path(path: Path, instance_path: Path, arguments: Namespace, run: int) -> Path:
+	"""
+	Returns the file a solve writes to, such as its trace or its checkpoint, suffixed by the instance and the run when there are several solves
+	:param path: the file given on the command line, None if the file is not written
+	:param instance_path: path to the folder of the instance
+	:param arguments: the parsed arguments
+	:param run: index of the run on this instance
+	:return: the path of the file, None if it is not written
+	"""
+	if path is None or (len(arguments.instances) <= 1 and arguments.runs == 1):
+		return path
+	return path.with_name(f"{path.stem}_{instance_path.name}_{run}{path.suffix}")
+
+
+def print_solve_summary(instance_path: Path, run: int, evaluation: Fitness, is_valid: bool, elapsed_time: float) -> None:
+	"""
+	Prints the result of a solve on one line
+	:param instance_path: path to the folder of the instance
+	:param run: index of the run on this instance
+	:param evaluation: fitness of the solution
+	:param is_valid: validity of the solution
+	:param elapsed_time: time taken by the solve in seconds
+	"""
+	print(f"{instance_path} run {run}: {evaluation.assignments_nb} missions assigned, travel cost {evaluation.travel_cost}, {evaluation.specialities_nb} corresponding specialities, {'valid' if is_valid else 'INVALID'}, {round(elapsed_time, 2)}s")
+
+
+def solve_instance_runs(instance_path: Path, arguments: Namespace) -> list[tuple[Path,int,Fitness,bool,float]]:
+	"""
+	Solves all the runs of an instance, sharing its loaded instance, evaluator and fitness cache, then releases them
+	:param instance_path: path to the folder of the instance
+	:param arguments: the parsed arguments
+	:return: the result of each run, as returned by solve_instance
+	"""
+	try:
+		return [solve_instance(instance_path, arguments, run) for run in range(arguments.runs)]
+	finally:
+		release_solver_context(instance_path)
+
+
+def run_batch(arguments: Namespace) -> None:
+	"""
+	Solves every instance of the command line, one after the other in this process, or on a pool of --jobs processes
+	Each task solves all the runs of one instance, loading it once, and releases its evaluator and fitness cache once done,
+	so that the memory of a process does not grow with the number of instances
+	:param arguments: the parsed arguments
+	"""
+	instance_paths = list(dict.fromkeys(arguments.instances))
+	results = []
+
+	if arguments.jobs > 1:
+		# the solves already run in parallel, so each of them evaluates its children in its own process
+		arguments.workers = 1
+		with Pool(min(arguments.jobs, len(instance_paths))) as pool:
+			for instance_results in pool.starmap(solve_instance_runs, [(instance_path, arguments) for instance_path in instance_paths]):
+				results.extend(instance_results)
+	else:
+		for instance_path in instance_paths:
+			results.extend(solve_instance_runs(instance_path, arguments))
+
+	print("\nSummary:")
+	for result in results:
+		print_solve_summary(*result)
+
+
+def run_interactive() -> None:
+	"""
+	Asks the instance and the parameters of the genetic algorithm, then solves the instance
+	"""
 	missions_nb, centers_nb = prompt_instance_parameters()
 
 	instance_path = Path(f"./instances/{missions_nb}Missions-{centers_nb}centres/")
 
-	employees = open_employees_csv(instance_path)
-	missions = open_missions_csv(instance_path)
-	centers = open_centers_csv(instance_path)
-	distance_matrix = open_distances_matrix(instance_path)
+	instance = open_instance(instance_path)
 
-	size, crossover_rate, mutation_rate, max_execution_time, k, mutated_genes_per_chromosome_rate = prompt_genetic_algorithm_parameters(100, .7, .8, 60, 5, .025)
+	size, crossover_rate, mutation_rate, max_execution_time, k, mutated_genes_per_chromosome_rate = prompt_genetic_algorithm_parameters(DEFAULT_POPULATION_SIZE, DEFAULT_CROSSOVER_RATE, DEFAULT_MUTATION_RATE, DEFAULT_MAX_EXECUTION_TIME, DEFAULT_TOURNAMENT_SIZE, DEFAULT_MUTATED_GENES_PER_CHROMOSOME_RATE)
 
-	solution = genetic_algorithm(employees, missions, centers, distance_matrix, size, crossover_rate, mutation_rate, max_execution_time, k, mutated_genes_per_chromosome_rate)
+	solution = genetic_algorithm(instance, size, crossover_rate, mutation_rate, max_execution_time, k, mutated_genes_per_chromosome_rate)
 
-	evaluation = solution.evaluate(distance_matrix, employees, missions, len(centers))
+	evaluation = solution.evaluate(instance)
 
 	print("\nBest solution found:")
 
-	save_solution_assignments(solution, missions, employees, instance_path, evaluation)
+	save_solution_assignments(solution, instance.missions, instance.employees, instance_path, evaluation)
 
 	print_solution_evaluation(evaluation)
-	
\ No newline at end of file
+
+
+if __name__ == "__main__":
+
+	arguments = parse_arguments()
+
+	if arguments.instances:
+		run_batch(arguments)
+	else:
+		run_interactive()
@@ -3,6 +3,8 @@ class Center:
 	Represents a center
 	"""
 
+	__slots__ = ("id", "name")
+
 	id: int  	# id of the center 
 	name: str  	# name of the center
 
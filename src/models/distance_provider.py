@@ -0,0 +1,326 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from math import sqrt
+import numpy as np
+from config import *
+
+
+class DistanceProvider(ABC):
+	"""
+	Gives the distances between the centers and the missions of an instance
+	The points are numbered as the rows of the dense distance matrix: the centers first, then the missions,
+	and the public methods take center and mission ids, so that the callers never compute matrix indices themselves
+	The distances from the centers to the missions take a memory linear in the number of missions and are always stored,
+	the distances between missions are either stored (DenseDistanceProvider) or computed when they are needed
+	A provider implements get_distance() and get_distances(), the other methods are built on them
+	"""
+
+	centers_nb: int  	# number of centers
+	missions_nb: int  	# number of missions
+
+
+	def __init__(self, centers_nb: int, missions_nb: int) -> None:
+		self.centers_nb = centers_nb
+		self.missions_nb = missions_nb
+
+
+	@abstractmethod
+	def get_distance(self, origin: int, destination: int) -> float:
+		"""
+		Returns the distance between two points
+		:param origin: index of the origin point, as a row of the distance matrix
+		:param destination: index of the destination point
+		:return: the distance in km
+		"""
+
+
+	@abstractmethod
+	def get_distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+		"""
+		Returns the distances between pairs of points, same values as get_distance()
+		:param origins: indices of the origin points
+		:param destinations: indices of the destination points, same shape as origins
+		:return: the distances in km
+		"""
+
+
+	def get_mission_distances(self, origin_mission_ids: np.ndarray, destination_mission_ids: np.ndarray) -> np.ndarray:
+		"""
+		Returns the distances between pairs of missions
+		:param origin_mission_ids: ids of the origin missions
+		:param destination_mission_ids: ids of the destination missions, same shape as origin_mission_ids
+		:return: the distances in km
+		"""
+		return self.get_distances(origin_mission_ids + (self.centers_nb - 1), destination_mission_ids + (self.centers_nb - 1))
+
+
+	def get_mission_distance_table(self, divisor: float = 1.) -> list[list[float]] | MissionDistanceTable:
+		"""
+		Returns the distances between missions, indexed by mission ids as table[origin_id][destination_id]
+		:param divisor: number the distances are divided by, TRAVEL_SPEED to get travel times
+		:return: the table, computing the distances when they are accessed
+		"""
+		return MissionDistanceTable(self, divisor)
+
+
+	def get_departure_distances(self) -> np.ndarray:
+		"""
+		Returns the distances from the centers to the missions, with an unused first row and column so that it is indexed by ids
+		:return: array where [c, m] is the distance from center c to mission m
+		"""
+		center_ids, mission_ids = np.meshgrid(np.arange(1, self.centers_nb + 1), np.arange(1, self.missions_nb + 1), indexing="ij")
+		distances = np.zeros((self.centers_nb + 1, self.missions_nb + 1), dtype=np.float64)
+		distances[1:, 1:] = self.get_distances(center_ids - 1, mission_ids + (self.centers_nb - 1))
+		return distances
+
+
+	def get_return_distances(self) -> np.ndarray:
+		"""
+		Returns the distances from the missions to the centers, with an unused first row and column so that it is indexed by ids
+		:return: array where [m, c] is the distance from mission m to center c
+		"""
+		mission_ids, center_ids = np.meshgrid(np.arange(1, self.missions_nb + 1), np.arange(1, self.centers_nb + 1), indexing="ij")
+		distances = np.zeros((self.missions_nb + 1, self.centers_nb + 1), dtype=np.float64)
+		distances[1:, 1:] = self.get_distances(mission_ids + (self.centers_nb - 1), center_ids - 1)
+		return distances
+
+
+class MissionDistanceTable:
+	"""
+	Distances between missions computed when they are accessed, with the same indexing as a nested list: table[origin_id][destination_id]
+	"""
+
+	__slots__ = ("provider", "divisor")
+
+	provider: DistanceProvider  # provider computing the distances
+	divisor: float  			# number the distances are divided by
+
+
+	def __init__(self, provider: DistanceProvider, divisor: float) -> None:
+		self.provider = provider
+		self.divisor = divisor
+
+
+	def __getitem__(self, origin_mission_id: int) -> MissionDistanceRow:
+		return MissionDistanceRow(self.provider, origin_mission_id + (self.provider.centers_nb - 1), self.divisor)
+
+
+class MissionDistanceRow:
+	"""
+	Distances from one mission to the others, computed when they are accessed
+	"""
+
+	__slots__ = ("provider", "origin", "divisor")
+
+	provider: DistanceProvider  # provider computing the distances
+	origin: int  				# index of the origin mission, as a row of the distance matrix
+	divisor: float  			# number the distances are divided by
+
+
+	def __init__(self, provider: DistanceProvider, origin: int, divisor: float) -> None:
+		self.provider = provider
+		self.origin = origin
+		self.divisor = divisor
+
+
+	def __getitem__(self, destination_mission_id: int) -> float:
+		return self.provider.get_distance(self.origin, destination_mission_id + (self.provider.centers_nb - 1)) / self.divisor
+
+
+class DenseDistanceProvider(DistanceProvider):
+	"""
+	Distances read from a full matrix, as in distances.csv
+	The memory used is quadratic in the number of missions, the matrix can be memory-mapped from the binary cache of the instance
+	so that the processes solving the same instance share it
+	"""
+
+	matrix: np.ndarray  # distance matrix between center-center, centers-missions, missions-missions
+
+
+	def __init__(self, matrix: list[list[float]] | np.ndarray, centers_nb: int) -> None:
+		if not isinstance(matrix, np.ndarray) or matrix.dtype != np.float64 or not matrix.flags.c_contiguous:
+			matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+		self.matrix = matrix
+		self.matrix.flags.writeable = False
+		super().__init__(centers_nb, len(self.matrix) - centers_nb)
+
+
+	def get_distance(self, origin: int, destination: int) -> float:
+		return float(self.matrix[origin, destination])
+
+
+	def get_distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+		return np.asarray(self.matrix[origins, destinations])
+
+
+	def get_mission_distance_table(self, divisor: float = 1.) -> list[list[float]] | MissionDistanceTable:
+		if self.missions_nb > DENSE_DISTANCE_TABLE_MAX_MISSIONS:
+			return MissionDistanceTable(self, divisor)  # nested lists would take several times the memory of the matrix
+		# the mission ids start right after the centers in the matrix, so a view starting one row before the first mission is indexed by mission id
+		first_mission_row = self.centers_nb - 1
+		return (self.matrix[first_mission_row:, first_mission_row:] / divisor).tolist()
+
+
+	def __getstate__(self) -> dict:
+		# a memory-mapped matrix is sent to other processes as the path of its file, so that they map the same pages instead of copying them
+		state = self.__dict__.copy()
+		if isinstance(self.matrix, np.memmap) and self.matrix.filename is not None:
+			state["matrix"] = str(self.matrix.filename)
+		return state
+
+
+	def __setstate__(self, state: dict) -> None:
+		if isinstance(state["matrix"], str):
+			state["matrix"] = np.load(state["matrix"], mmap_mode="r")
+		self.__dict__.update(state)
+
+
+class CoordinatesDistanceProvider(DistanceProvider):
+	"""
+	Distances computed from the positions of the points, the memory used is linear in the number of missions
+	The "euclidean" metric takes planar positions in km, the "haversine" metric takes latitudes and longitudes in degrees
+	and gives great-circle distances in km
+	The scalar and vectorized distances are computed with the same floating point operations, so they are always equal
+	"""
+
+	METRICS = ("euclidean", "haversine")
+
+	metric: str  					# "euclidean" or "haversine"
+	coordinates: np.ndarray  		# planar positions (x, y), or unit vectors (x, y, z) on the sphere for the haversine metric
+	coordinate_lists: list[list[float]]  # columns of coordinates as lists, for the scalar distances
+
+
+	def __init__(self, coordinates: np.ndarray, centers_nb: int, metric: str = "euclidean") -> None:
+		if metric not in self.METRICS:
+			raise ValueError(f"unknown distance metric {metric}, expected one of {self.METRICS}")
+		coordinates = np.asarray(coordinates, dtype=np.float64)
+		self.metric = metric
+		if metric == "haversine":
+			latitudes, longitudes = np.radians(coordinates[:, 0]), np.radians(coordinates[:, 1])
+			coordinates = np.stack((np.cos(latitudes) * np.cos(longitudes), np.cos(latitudes) * np.sin(longitudes), np.sin(latitudes)), axis=1)
+		self.coordinates = np.ascontiguousarray(coordinates)
+		self.coordinates.flags.writeable = False
+		self.coordinate_lists = self.coordinates.T.tolist()
+		super().__init__(centers_nb, len(self.coordinates) - centers_nb)
+
+
+	def get_distance(self, origin: int, destination: int) -> float:
+		squared_norm = 0.
+		for column in self.coordinate_lists:
+			delta = column[origin] - column[destination]
+			squared_norm += delta * delta
+		if self.metric == "euclidean":
+			return sqrt(squared_norm)
+		# the chord between the two unit vectors gives the angle between them
+		# numpy's arcsin, as math.asin may round differently from it
+		return 2 * EARTH_RADIUS * float(np.arcsin(min(1., sqrt(squared_norm) / 2)))
+
+
+	def get_distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+		squared_norm = np.zeros(np.shape(origins), dtype=np.float64)
+		for column in self.coordinates.T:
+			delta = column[origins] - column[destinations]
+			squared_norm += delta * delta
+		if self.metric == "euclidean":
+			return np.sqrt(squared_norm)
+		return 2 * EARTH_RADIUS * np.arcsin(np.minimum(1., np.sqrt(squared_norm) / 2))
+
+
+class SparseDistanceProvider(CoordinatesDistanceProvider):
+	"""
+	Distances given for some pairs of points only, usually the k nearest neighbours of each point,
+	the other distances being computed from the positions of the points and multiplied by a detour factor
+	The memory used is linear in the number of given distances
+	"""
+
+	detour_factor: float  					# factor applied to the distances computed from the positions
+	neighbours: list[dict[int, float]]  	# given distances from each point, by destination point, for the scalar distances
+	keys: np.ndarray  						# sorted origin * points_nb + destination of the given distances, for the vectorized distances
+	values: np.ndarray  					# given distances, in the order of keys
+
+
+	def __init__(self, coordinates: np.ndarray, centers_nb: int, origins: np.ndarray, destinations: np.ndarray, distances: np.ndarray, metric: str = "euclidean", detour_factor: float = SPARSE_DISTANCE_DETOUR_FACTOR) -> None:
+		"""
+		:param coordinates: positions of the points, see CoordinatesDistanceProvider
+		:param centers_nb: number of centers
+		:param origins: indices of the origin points of the given distances
+		:param destinations: indices of the destination points of the given distances
+		:param distances: given distances in km, a distance given in one direction only is used in both directions
+		:param metric: metric of the positions
+		:param detour_factor: factor applied to the distances computed from the positions
+		"""
+		super().__init__(coordinates, centers_nb, metric)
+		self.detour_factor = detour_factor
+		points_nb = len(self.coordinates)
+
+		origins = np.asarray(origins, dtype=np.int64)
+		destinations = np.asarray(destinations, dtype=np.int64)
+		distances = np.asarray(distances, dtype=np.float64)
+		# the reverse distances come after the given ones, so that a distance given in both directions keeps its own value
+		keys = np.concatenate((origins * points_nb + destinations, destinations * points_nb + origins))
+		keys, first_indices = np.unique(keys, return_index=True)
+		self.keys = keys
+		self.values = np.concatenate((distances, distances))[first_indices]
+		self.keys.flags.writeable = False
+		self.values.flags.writeable = False
+
+		self.neighbours = [dict() for _ in range(points_nb)]
+		for key, value in zip(self.keys.tolist(), self.values.tolist()):
+			self.neighbours[key // points_nb][key % points_nb] = value
+
+
+	def get_distance(self, origin: int, destination: int) -> float:
+		distance = self.neighbours[origin].get(destination)
+		if distance is None:
+			return self.detour_factor * super().get_distance(origin, destination)
+		return distance
+
+
+	def get_distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+		distances = self.detour_factor * super().get_distances(origins, destinations)
+		keys = np.asarray(origins, dtype=np.int64) * len(self.coordinates) + destinations
+		positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+		given = self.keys[positions] == keys if len(self.keys) else np.zeros(np.shape(keys), dtype=bool)
+		distances[given] = self.values[positions[given]]
+		return distances
+
+
+class SubsetDistanceProvider(DistanceProvider):
+	"""
+	Distances between the centers and some of the missions of another provider, renumbered from 1, for a part of an instance
+	The distances are read from the other provider, and the distances between missions are stored as nested lists
+	when the part is small enough, so that the scalar code of a small part is as fast as with a dense matrix
+	"""
+
+	provider: DistanceProvider  # provider of the whole instance
+	points: np.ndarray  		# index of each point of the part in the provider, the centers first, then the missions
+
+
+	def __init__(self, provider: DistanceProvider, mission_ids: np.ndarray) -> None:
+		"""
+		:param provider: provider of the whole instance
+		:param mission_ids: ids of the missions of the part in the whole instance, mission i of the part being mission_ids[i - 1]
+		"""
+		mission_ids = np.asarray(mission_ids, dtype=np.int64)
+		self.provider = provider
+		self.points = np.concatenate((np.arange(provider.centers_nb, dtype=np.int64), mission_ids + (provider.centers_nb - 1)))
+		self.points.flags.writeable = False
+		super().__init__(provider.centers_nb, len(mission_ids))
+
+
+	def get_distance(self, origin: int, destination: int) -> float:
+		return self.provider.get_distance(int(self.points[origin]), int(self.points[destination]))
+
+
+	def get_distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+		return self.provider.get_distances(self.points[origins], self.points[destinations])
+
+
+	def get_mission_distance_table(self, divisor: float = 1.) -> list[list[float]] | MissionDistanceTable:
+		if self.missions_nb > DENSE_DISTANCE_TABLE_MAX_MISSIONS:
+			return MissionDistanceTable(self, divisor)
+		# same layout as the table of a dense matrix: row and column 0 are unused, so that the table is indexed by mission id
+		origin_ids, destination_ids = np.meshgrid(np.arange(self.missions_nb + 1), np.arange(self.missions_nb + 1), indexing="ij")
+		table = np.zeros((self.missions_nb + 1, self.missions_nb + 1), dtype=np.float64)
+		table[1:, 1:] = self.get_mission_distances(origin_ids[1:, 1:], destination_ids[1:, 1:])
+		return (table / divisor).tolist()
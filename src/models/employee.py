@@ -4,12 +4,17 @@ from models.schedule import Schedule
 class Employee:
 	"""
 	Represents a SESSAD employee, that visits missions 
+	The skill and speciality codes are the interned integer values of the skill and speciality, set when the instance is built
 	"""
 
+	__slots__ = ("id", "center_id", "skill", "speciality", "skill_code", "speciality_code", "schedule")
+
 	id: int  			# id of the employee
 	center_id: int  	# id of the center the employee works at
 	skill: str  		# skill of the employee (LPC, LSF)
 	speciality: str  	# speciality of the employee (Musique, Mecanique, ect.)
+	skill_code: int  	# integer code of the skill, -1 until interned by the instance
+	speciality_code: int  # integer code of the speciality, -1 until interned by the instance
 	schedule: Schedule  # schedule of the employee's missions
 
 
@@ -18,6 +23,8 @@ class Employee:
 		self.center_id = center_id
 		self.skill = skill
 		self.speciality = speciality
+		self.skill_code = -1
+		self.speciality_code = -1
 		if schedule is None:
 			schedule = Schedule()
 		self.schedule = schedule
@@ -0,0 +1,29 @@
+import numpy as np
+from models.employee import Employee
+
+
+class EmployeeTable:
+	"""
+	Struct of arrays view of the employees of an instance, one numpy column per attribute
+	The columns are indexed by employee id, index 0 being an unused slot
+	The skills and specialities are stored as the integer codes interned by the instance
+	"""
+
+	center: np.ndarray  		# center id of each employee
+	skill: np.ndarray  			# skill code of each employee, -2 for the unused slot so that it never matches the unused slot of the missions
+	speciality: np.ndarray  	# speciality code of each employee, -2 for the unused slot
+
+
+	def __init__(self, employees: dict[int, Employee]) -> None:
+		size = max(employees, default=0) + 1
+		self.center = np.zeros(size, dtype=np.int64)
+		self.skill = np.full(size, -2, dtype=np.int64)
+		self.speciality = np.full(size, -2, dtype=np.int64)
+		for employee_id, employee in employees.items():
+			self.center[employee_id] = employee.center_id
+			self.skill[employee_id] = employee.skill_code
+			self.speciality[employee_id] = employee.speciality_code
+
+
+	def __len__(self) -> int:
+		return len(self.center) - 1
@@ -0,0 +1,103 @@
+from __future__ import annotations
+from typing import NamedTuple
+import numpy as np
+
+
+FITNESS_DTYPE = np.dtype([("assignments_nb", np.int64), ("travel_cost", np.int64), ("specialities_nb", np.int64)])  # fitnesses of a population, one record per individual
+
+
+class Fitness(NamedTuple):
+	"""
+	Represents the three fitnesses of a solution, compared in cascade:
+	the number of missions assigned first (higher is better), then the travel cost (lower is better),
+	then the number of corresponding specialities (higher is better)
+	The fitnesses are kept as separate integers, so that the order stays exact whatever their size
+	"""
+
+	assignments_nb: int  	# number of missions assigned
+	travel_cost: int  		# travel cost of the employees
+	specialities_nb: int  	# number of missions assigned to an employee of the same speciality
+
+
+	def get_key(self) -> tuple[int,int,int]:
+		"""
+		Returns a tuple ordered as the fitness, the travel cost being negated
+		:return: the key
+		"""
+		return self.assignments_nb, -self.travel_cost, self.specialities_nb
+
+
+	@staticmethod
+	def from_record(record: np.void) -> Fitness:
+		"""
+		Builds a fitness from a record of an array of FITNESS_DTYPE
+		:param record: the record
+		:return: the fitness
+		"""
+		return Fitness(*(int(value) for value in record.tolist()))
+
+
+	def __lt__(self, other: Fitness) -> bool:
+		return self.get_key() < other.get_key()
+
+
+	def __le__(self, other: Fitness) -> bool:
+		return self.get_key() <= other.get_key()
+
+
+	def __gt__(self, other: Fitness) -> bool:
+		return self.get_key() > other.get_key()
+
+
+	def __ge__(self, other: Fitness) -> bool:
+		return self.get_key() >= other.get_key()
+
+
+def make_fitnesses(assignments_nb: np.ndarray, travel_cost: np.ndarray, specialities_nb: np.ndarray) -> np.ndarray:
+	"""
+	Builds an array of fitnesses from the arrays of the three fitnesses
+	:param assignments_nb: number of missions assigned of each individual
+	:param travel_cost: travel cost of each individual
+	:param specialities_nb: number of corresponding specialities of each individual
+	:return: the array of FITNESS_DTYPE
+	"""
+	fitnesses = np.empty(len(assignments_nb), dtype=FITNESS_DTYPE)
+	fitnesses["assignments_nb"] = assignments_nb
+	fitnesses["travel_cost"] = travel_cost
+	fitnesses["specialities_nb"] = specialities_nb
+	return fitnesses
+
+
+def get_fitness_keys(fitnesses: np.ndarray) -> np.ndarray:
+	"""
+	Returns integers ordered as the fitnesses of an array, to compare, sort or select them with the usual integer operations
+	The three fitnesses are combined in mixed radix, each one shifted by its minimum and scaled by the range of the next ones in the array,
+	so that the key is exact for any values as long as the product of the three ranges fits in 63 bits,
+	and the keys are the ranks of the fitnesses otherwise
+	The keys are only comparable between fitnesses of the same array
+	:param fitnesses: array of FITNESS_DTYPE
+	:return: the keys, as 64 bits integers, higher for better fitnesses and equal for equal fitnesses
+	"""
+	if len(fitnesses) == 0:
+		return np.zeros(0, dtype=np.int64)
+
+	assignments_nb = fitnesses["assignments_nb"]
+	travel_cost = fitnesses["travel_cost"]
+	specialities_nb = fitnesses["specialities_nb"]
+	assignments_min, assignments_max = int(assignments_nb.min()), int(assignments_nb.max())
+	cost_min, cost_max = int(travel_cost.min()), int(travel_cost.max())
+	specialities_min, specialities_max = int(specialities_nb.min()), int(specialities_nb.max())
+	cost_range = cost_max - cost_min + 1
+	specialities_range = specialities_max - specialities_min + 1
+
+	# the bound is computed with Python integers, which do not overflow
+	if (assignments_max - assignments_min + 1) * cost_range * specialities_range < 2**63:
+		return ((assignments_nb - assignments_min) * cost_range + (cost_max - travel_cost)) * specialities_range + (specialities_nb - specialities_min)
+
+	order = np.lexsort((specialities_nb, -travel_cost, assignments_nb))  # increasing fitness
+	sorted_fitnesses = fitnesses[order]
+	is_new = np.ones(len(fitnesses), dtype=bool)
+	is_new[1:] = sorted_fitnesses[1:] != sorted_fitnesses[:-1]
+	keys = np.empty(len(fitnesses), dtype=np.int64)
+	keys[order] = np.cumsum(is_new)
+	return keys
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import Any
+import numpy as np
+from config import *
+from models.center import Center
+from models.distance_provider import DistanceProvider, DenseDistanceProvider, MissionDistanceTable, SubsetDistanceProvider
+from models.employee import Employee
+from models.employee_table import EmployeeTable
+from models.mission import Mission
+from models.mission_table import MissionTable
+
+
+class Instance:
+	"""
+	Represents an instance of the problem, precompiled once after loading the csv files
+	Every array or table indexed by a mission id, an employee id or a center id has an unused slot at index 0,
+	so that the hot paths use the ids directly as indices, without any offset arithmetic
+	The numpy arrays are used by the vectorized code, the nested lists (tables) by the scalar code, as single element access is much faster on lists
+	The distances between missions come from a DistanceProvider, which stores them or computes them when they are needed
+	"""
+
+	employees: dict[int, Employee]  		# employees of the instance, by id
+	missions: dict[int, Mission]  			# missions of the instance, by id
+	centers: list[Center]  					# centers of the instance
+	centers_nb: int  						# number of centers
+	missions_nb: int  						# number of missions
+	employees_nb: int  						# number of employees
+
+	distance_provider: DistanceProvider  	# distances between the centers and the missions
+	departure_distances: np.ndarray  		# distances from centers to missions, departure_distances[c, m] from center c to mission m
+	departure_travel_times: np.ndarray  	# travel times in minutes from centers to missions
+	return_distances: np.ndarray  			# distances from missions to centers, return_distances[m, c] from mission m to center c
+	return_travel_times: np.ndarray  		# travel times in minutes from missions to centers
+
+	mission_distance_table: list[list[float]] | MissionDistanceTable  	# distances between missions, [i][j] from mission i to mission j
+	mission_travel_time_table: list[list[float]] | MissionDistanceTable  # travel times between missions
+	departure_distance_table: list[list[float]]  	# same as departure_distances, as nested lists
+	departure_travel_time_table: list[list[float]]  # same as departure_travel_times, as nested lists
+	return_distance_table: list[list[float]]  		# same as return_distances, as nested lists
+	return_travel_time_table: list[list[float]]  	# same as return_travel_times, as nested lists
+
+	skill_codes: dict[str, int]  			# integer code of each skill
+	speciality_codes: dict[str, int]  		# integer code of each speciality
+	mission_table: MissionTable  			# attributes of the missions as numpy columns
+	employee_table: EmployeeTable  			# attributes of the employees as numpy columns
+	chronological_order: np.ndarray  		# mission ids sorted by day and start time
+	employees_by_skill: dict[str, list[int]]  # ids of the employees having each skill
+
+
+	def __init__(self, employees: dict[int, Employee], missions: dict[int, Mission], centers: list[Center], distances: DistanceProvider | list[list[float]]) -> None:
+		self.employees = employees
+		self.missions = missions
+		self.centers = centers
+		self.centers_nb = len(centers)
+		self.missions_nb = len(missions)
+		self.employees_nb = len(employees)
+
+		if not isinstance(distances, DistanceProvider):  # a full distance matrix
+			distances = DenseDistanceProvider(distances, self.centers_nb)
+		if distances.centers_nb != self.centers_nb or distances.missions_nb != self.missions_nb:
+			raise ValueError(f"the distances are given for {distances.centers_nb} centers and {distances.missions_nb} missions, the instance has {self.centers_nb} centers and {self.missions_nb} missions")
+		self.distance_provider = distances
+		self.departure_distances = distances.get_departure_distances()
+		self.departure_travel_times = self.departure_distances / TRAVEL_SPEED
+		self.return_distances = distances.get_return_distances()
+		self.return_travel_times = self.return_distances / TRAVEL_SPEED
+
+		self.mission_distance_table = distances.get_mission_distance_table()
+		self.mission_travel_time_table = distances.get_mission_distance_table(TRAVEL_SPEED)
+		self.departure_distance_table = self.departure_distances.tolist()
+		self.departure_travel_time_table = self.departure_travel_times.tolist()
+		self.return_distance_table = self.return_distances.tolist()
+		self.return_travel_time_table = self.return_travel_times.tolist()
+
+		# skills and specialities are interned as small integers, shared by the missions and the employees
+		self.skill_codes = dict()
+		self.speciality_codes = dict()
+		for entity in list(missions.values()) + list(employees.values()):
+			entity.skill_code = self.skill_codes.setdefault(entity.skill, len(self.skill_codes))
+			entity.speciality_code = self.speciality_codes.setdefault(entity.speciality, len(self.speciality_codes))
+		self.mission_table = MissionTable(missions)
+		self.employee_table = EmployeeTable(employees)
+
+		self.employees_by_skill = dict()
+		for employee_id, employee in employees.items():
+			self.employees_by_skill.setdefault(employee.skill, []).append(employee_id)
+
+		self.chronological_order = np.array(sorted(missions, key=lambda mission_id: (missions[mission_id].day, missions[mission_id].start_time, mission_id)), dtype=np.int64)
+
+		for value in list(vars(self).values()) + list(vars(self.mission_table).values()) + list(vars(self.employee_table).values()):
+			if isinstance(value, np.ndarray):
+				value.flags.writeable = False
+		self._frozen = True
+
+
+	def extract(self, mission_ids: list[int], employee_ids: list[int]) -> Instance:
+		"""
+		Builds the part of the instance made of some missions and employees, with all the centers
+		The missions and the employees are copied and renumbered from 1 in the given order, mission i of the part being mission_ids[i - 1]
+		and employee i being employee_ids[i - 1], so that a solution of the part is mapped back by these lists
+		:param mission_ids: ids of the missions of the part
+		:param employee_ids: ids of the employees of the part
+		:return: the part, as an instance
+		"""
+		missions = dict()
+		for new_id, mission_id in enumerate(mission_ids, 1):
+			mission = self.missions[mission_id]
+			missions[new_id] = Mission(new_id, mission.day, mission.start_time, mission.end_time, mission.skill, mission.speciality)
+		employees = dict()
+		for new_id, employee_id in enumerate(employee_ids, 1):
+			employee = self.employees[employee_id]
+			employees[new_id] = Employee(new_id, employee.center_id, employee.skill, employee.speciality)
+		return Instance(employees, missions, self.centers, SubsetDistanceProvider(self.distance_provider, mission_ids))
+
+
+	def __setattr__(self, name: str, value: Any) -> None:
+		if getattr(self, "_frozen", False):
+			raise AttributeError("an Instance cannot be modified once built")
+		super().__setattr__(name, value)
+
+
+	def __str__(self) -> str:
+		return f"{self.missions_nb} missions, {self.employees_nb} employees, {self.centers_nb} centers"
+
+
+	def __repr__(self) -> str:
+		return self.__str__()
@@ -1,14 +1,20 @@
 class Mission:
 	"""
 	Represents a mission that will be assigned to an employee.
+	The skill and speciality codes are the interned integer values of the skill and speciality, set when the instance is built,
+	so that the hot loops compare integers instead of strings
 	"""
 
+	__slots__ = ("id", "day", "start_time", "end_time", "skill", "speciality", "skill_code", "speciality_code")
+
 	id: int  			# id of the mission, unique
 	day: int  			# day at which the mission takes place
 	start_time: float  	# start time of the mission in minutes
 	end_time: float  	# end time of the mission in minutes
 	skill: str  		# skill required for the mission (LPC, LSF)
 	speciality: str  	# speciality required for the mission (Musique, Mecanique, ect.)
+	skill_code: int  	# integer code of the skill, -1 until interned by the instance
+	speciality_code: int  # integer code of the speciality, -1 until interned by the instance
 
 
 	def __init__(self, id: int, day: int, start_time: float, end_time: float, skill: str, speciality: str) -> None:
@@ -18,6 +24,8 @@ class Mission:
 		self.end_time = end_time
 		self.skill = skill
 		self.speciality = speciality
+		self.skill_code = -1
+		self.speciality_code = -1
 
 
 	def __str__(self) -> str:
@@ -0,0 +1,37 @@
+import numpy as np
+from models.mission import Mission
+
+
+class MissionTable:
+	"""
+	Struct of arrays view of the missions of an instance, one numpy column per attribute
+	The columns are indexed by mission id, index 0 being an unused slot
+	The skills and specialities are stored as the integer codes interned by the instance
+	"""
+
+	day: np.ndarray  			# day of each mission
+	start: np.ndarray  			# start time of each mission
+	end: np.ndarray  			# end time of each mission
+	duration: np.ndarray  		# duration of each mission
+	skill: np.ndarray  			# skill code of each mission, -1 for the unused slot
+	speciality: np.ndarray  	# speciality code of each mission, -1 for the unused slot
+
+
+	def __init__(self, missions: dict[int, Mission]) -> None:
+		size = max(missions, default=0) + 1
+		self.day = np.zeros(size, dtype=np.int64)
+		self.start = np.zeros(size, dtype=np.float64)
+		self.end = np.zeros(size, dtype=np.float64)
+		self.skill = np.full(size, -1, dtype=np.int64)
+		self.speciality = np.full(size, -1, dtype=np.int64)
+		for mission_id, mission in missions.items():
+			self.day[mission_id] = mission.day
+			self.start[mission_id] = mission.start_time
+			self.end[mission_id] = mission.end_time
+			self.skill[mission_id] = mission.skill_code
+			self.speciality[mission_id] = mission.speciality_code
+		self.duration = self.end - self.start
+
+
+	def __len__(self) -> int:
+		return len(self.day) - 1
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import numpy as np
+from models.solution import Solution
+from models.fitness import FITNESS_DTYPE
+
+
+class Population:
+	"""
+	Represents a population of the genetic algorithm as one integer matrix, one row per individual
+	"""
+
+	assignments: np.ndarray  # matrix of shape (individuals, missions), assignments[i, j] is the id of the employee assigned to mission j + 1 in individual i, 0 if unassigned
+	fitnesses: np.ndarray  	 # fitness of each individual, array of FITNESS_DTYPE
+
+
+	def __init__(self, assignments: np.ndarray, fitnesses: np.ndarray = None) -> None:
+		self.assignments = assignments
+		if fitnesses is None:
+			fitnesses = np.zeros(len(assignments), dtype=FITNESS_DTYPE)
+		self.fitnesses = fitnesses
+
+
+	@staticmethod
+	def from_solutions(solutions: list[Solution], missions_nb: int) -> Population:
+		"""
+		Builds a population from a list of solutions
+		:param solutions: the solutions to put in the population
+		:param missions_nb: number of missions of the instance
+		:return: the population
+		"""
+		assignments = np.zeros((len(solutions), missions_nb), dtype=np.int32)
+		for i, solution in enumerate(solutions):
+			assignments[i] = solution.to_array(missions_nb)
+		return Population(assignments)
+
+
+	def get_solution(self, index: int) -> Solution:
+		"""
+		Returns the individual at the given index as a Solution
+		:param index: index of the individual in the population
+		:return: the corresponding solution
+		"""
+		return Solution.from_array(self.assignments[index])
+
+
+	def __len__(self) -> int:
+		return len(self.assignments)
+
+
+	def __str__(self) -> str:
+		return f"Population of {len(self)} individuals"
+
+
+	def __repr__(self) -> str:
+		return self.__str__()
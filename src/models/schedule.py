@@ -1,21 +1,31 @@
+from __future__ import annotations
+from bisect import bisect_left
+from typing import TYPE_CHECKING
 from models.mission import Mission
 from config import *
 
+if TYPE_CHECKING:  # the instance imports the employees, which import the schedule
+	from models.instance import Instance
+
 
 class Schedule:
 	"""
 	Represents the schedule of an employee (his assigned missions)
+	The missions are kept in one bucket per day, sorted by start time, with the start times in a parallel list,
+	so that finding where a mission goes in its day is a binary search and the checks only look at its two neighbours
 	"""
-	
-	missions: list[Mission]  			# list of the employee's missions, we keep the list sorted by day and start_hour
-	distance_traveled: float  			# distance traveled by the employee to complete his missions
-	weekly_work_time: float  			# hours worked during the week
-	daily_work_time: dict[int, float]  	# hours worked during each day, the key is the day and the value the time worked
-	daily_start_time: dict[int, float]  # start time of the employee's day, the key is the day and the value the time he leaves the center
-	daily_end_time: dict[int, float]  	# end time of the employee's day, the key is the day and the value the time he goes back at the center
+
+	missions_by_day: dict[int, list[Mission]]  	# missions of each day, sorted by start_hour, the key is the day
+	starts_by_day: dict[int, list[float]]  		# start times of the missions of each day, in the same order as missions_by_day
+	distance_traveled: float  					# distance traveled by the employee to complete his missions
+	weekly_work_time: float  					# hours worked during the week
+	daily_work_time: dict[int, float]  			# hours worked during each day, the key is the day and the value the time worked
+	daily_start_time: dict[int, float]  		# start time of the employee's day, the key is the day and the value the time he leaves the center
+	daily_end_time: dict[int, float]  			# end time of the employee's day, the key is the day and the value the time he goes back at the center
 
 	def __init__(self) -> None:
-		self.missions = []
+		self.missions_by_day = dict()
+		self.starts_by_day = dict()
 		self.distance_traveled = 0
 		self.weekly_work_time = 0
 		self.daily_work_time = dict()
@@ -23,6 +33,14 @@ class Schedule:
 		self.daily_end_time = dict()
 
 
+	@property
+	def missions(self) -> list[Mission]:
+		"""
+		List of the employee's missions, sorted by day and start_hour
+		"""
+		return [mission for day in sorted(self.missions_by_day) for mission in self.missions_by_day[day]]
+
+
 	def reset_schedule(self) -> None:
 		"""
 		Resets the schedule
@@ -30,139 +48,125 @@ class Schedule:
 		self.__init__()
 
 
-	def can_fit_in_schedule(self, mission: Mission, distance_matrix: list[list[bool]], centers_nb: int, employee_center_id: int) -> bool:
+	def can_fit_in_schedule(self, mission: Mission, instance: Instance, employee_center_id: int) -> bool:
 		"""
 		Checks if the mission can fit in the schedule
 		:param mission: the mission to check
-		:param distance_matrix: the distance matrix
-		:param centers_nb: the number of centers used in the distance matrix indices
+		:param instance: the instance, giving the distances and travel times
+		:param employee_center_id: the id of the center where the employee is based
 		:return: True if the mission can fit in the schedule, False otherwise
 		"""
 		mission_duration = mission.end_time - mission.start_time
-		missions_of_day = [m for m in self.missions if m.day == mission.day]
-		added_travel_distance = 0
-		travel_time = 0
-		travel_time_bis = 0
+		missions_of_day = self.missions_by_day.get(mission.day)
+		travel_times = instance.mission_travel_time_table
+		departure_distances = instance.departure_distance_table[employee_center_id]
+		departure_travel_times = instance.departure_travel_time_table[employee_center_id]
+		return_travel_times = instance.return_travel_time_table
 
-		if len(missions_of_day) == 0:
-			added_travel_distance = distance_matrix[employee_center_id - 1][centers_nb + mission.id - 1] \
-									+ distance_matrix[centers_nb + mission.id - 1][employee_center_id - 1]
-			
-			return mission_duration + (added_travel_distance / TRAVEL_SPEED) <= MAX_DAILY_WORK_TIME \
-					and self.weekly_work_time + mission_duration + (added_travel_distance / TRAVEL_SPEED) <= MAX_WEEKLY_WORK_TIME \
-					and mission.end_time + (distance_matrix[centers_nb + mission.id - 1][employee_center_id - 1] / TRAVEL_SPEED) - (mission.start_time - (distance_matrix[employee_center_id - 1][centers_nb + mission.id - 1])) <= MAX_DAILY_TIME_RANGE
-
-		elif mission.end_time < missions_of_day[0].start_time:
+		if not missions_of_day:
+			added_travel_time = departure_travel_times[mission.id] + return_travel_times[mission.id][employee_center_id]
+
+			return mission_duration + added_travel_time <= MAX_DAILY_WORK_TIME \
+					and self.weekly_work_time + mission_duration + added_travel_time <= MAX_WEEKLY_WORK_TIME \
+					and mission.end_time + return_travel_times[mission.id][employee_center_id] - (mission.start_time - departure_distances[mission.id]) <= MAX_DAILY_TIME_RANGE
+
+		position = bisect_left(self.starts_by_day[mission.day], mission.start_time)  # number of missions of the day starting before the mission
+
+		if position == 0:
 			# if the mission checked is before the first mission of the day
-			added_travel_distance = distance_matrix[employee_center_id - 1][centers_nb + mission.id - 1] \
-									+ distance_matrix[centers_nb + mission.id - 1][centers_nb + missions_of_day[0].id - 1] \
-									- distance_matrix[employee_center_id - 1][centers_nb + missions_of_day[0].id - 1]
-			travel_time = distance_matrix[centers_nb + mission.id - 1][centers_nb + missions_of_day[0].id - 1] / TRAVEL_SPEED
-			
-			return mission.end_time + travel_time <= missions_of_day[0].start_time \
-					and mission_duration + (added_travel_distance / TRAVEL_SPEED) + self.daily_work_time[mission.day] <= MAX_DAILY_WORK_TIME \
-					and mission_duration + (added_travel_distance / TRAVEL_SPEED) + self.weekly_work_time <= MAX_WEEKLY_WORK_TIME \
-					and missions_of_day[-1].end_time + (distance_matrix[centers_nb + missions_of_day[-1].id - 1][employee_center_id - 1] / TRAVEL_SPEED) - (mission.start_time - (distance_matrix[employee_center_id - 1][centers_nb + mission.id - 1])) <= MAX_DAILY_TIME_RANGE
-
-		elif mission.start_time > missions_of_day[-1].end_time:
-			# if the mission checked is after the last mission of the day
-			added_travel_distance = distance_matrix[centers_nb + missions_of_day[-1].id - 1][centers_nb + mission.id - 1] \
-									+ distance_matrix[centers_nb + mission.id - 1][employee_center_id - 1] \
-									- distance_matrix[centers_nb + missions_of_day[-1].id - 1][employee_center_id - 1]
-			travel_time = distance_matrix[centers_nb + missions_of_day[-1].id - 1][centers_nb + mission.id - 1] / TRAVEL_SPEED
-			return missions_of_day[-1].end_time + travel_time <= mission.start_time \
-					and mission_duration + (added_travel_distance / TRAVEL_SPEED) + self.daily_work_time[mission.day] <= MAX_DAILY_WORK_TIME \
-					and mission_duration + (added_travel_distance / TRAVEL_SPEED) + self.weekly_work_time <= MAX_WEEKLY_WORK_TIME \
-					and mission.end_time + (distance_matrix[centers_nb + mission.id - 1][employee_center_id - 1] / TRAVEL_SPEED) - (missions_of_day[0].start_time - (distance_matrix[employee_center_id - 1][centers_nb + missions_of_day[0].id - 1])) <= MAX_DAILY_TIME_RANGE
+			first_mission = missions_of_day[0]
+			if mission.end_time >= first_mission.start_time:
+				return False
+			added_travel_time = departure_travel_times[mission.id] + travel_times[mission.id][first_mission.id] - departure_travel_times[first_mission.id]
 
-		else:
-			# else, it may fit between two missions during the day
-			prev_mission = missions_of_day[0]
+			return mission.end_time + travel_times[mission.id][first_mission.id] <= first_mission.start_time \
+					and mission_duration + added_travel_time + self.daily_work_time[mission.day] <= MAX_DAILY_WORK_TIME \
+					and mission_duration + added_travel_time + self.weekly_work_time <= MAX_WEEKLY_WORK_TIME \
+					and missions_of_day[-1].end_time + return_travel_times[missions_of_day[-1].id][employee_center_id] - (mission.start_time - departure_distances[mission.id]) <= MAX_DAILY_TIME_RANGE
 
-			for i in range(len(missions_of_day) - 1):
-				next_mission = missions_of_day[i + 1]
+		elif position == len(missions_of_day):
+			# if the mission checked is after the last mission of the day
+			last_mission = missions_of_day[-1]
+			if mission.start_time <= last_mission.end_time:
+				return False
+			added_travel_time = travel_times[last_mission.id][mission.id] + return_travel_times[mission.id][employee_center_id] - return_travel_times[last_mission.id][employee_center_id]
 
-				if mission.start_time > prev_mission.end_time and mission.end_time < next_mission.start_time:
-					# checks if employee has the time to travel from mission i to the checked mission, and from the checked mission to the mission i + 1
-					added_travel_distance = distance_matrix[centers_nb + prev_mission.id - 1][centers_nb + mission.id - 1] \
-											+ distance_matrix[centers_nb + mission.id - 1][centers_nb + next_mission.id - 1] \
-											- distance_matrix[centers_nb + prev_mission.id - 1][centers_nb + next_mission.id - 1]
+			return last_mission.end_time + travel_times[last_mission.id][mission.id] <= mission.start_time \
+					and mission_duration + added_travel_time + self.daily_work_time[mission.day] <= MAX_DAILY_WORK_TIME \
+					and mission_duration + added_travel_time + self.weekly_work_time <= MAX_WEEKLY_WORK_TIME \
+					and mission.end_time + return_travel_times[mission.id][employee_center_id] - (missions_of_day[0].start_time - departure_distances[missions_of_day[0].id]) <= MAX_DAILY_TIME_RANGE
 
-					travel_time = distance_matrix[centers_nb + prev_mission.id - 1][centers_nb + mission.id - 1] / TRAVEL_SPEED
-					travel_time_bis = distance_matrix[centers_nb + mission.id - 1][centers_nb + next_mission.id - 1] / TRAVEL_SPEED
-					
-					return mission_duration + (added_travel_distance / TRAVEL_SPEED) + self.daily_work_time[mission.day] <= MAX_DAILY_WORK_TIME \
-							and prev_mission.end_time + travel_time <= mission.start_time \
-							and mission.end_time + travel_time_bis <= next_mission.start_time \
-							and mission_duration + (added_travel_distance / TRAVEL_SPEED) + self.weekly_work_time <= MAX_WEEKLY_WORK_TIME
+		else:
+			# else, it may fit between the two missions around its start time
+			prev_mission = missions_of_day[position - 1]
+			next_mission = missions_of_day[position]
+			if mission.start_time <= prev_mission.end_time or mission.end_time >= next_mission.start_time:
+				return False
 
-				prev_mission = next_mission
+			# checks if employee has the time to travel from the previous mission to the checked mission, and from the checked mission to the next one
+			travel_time = travel_times[prev_mission.id][mission.id]
+			travel_time_bis = travel_times[mission.id][next_mission.id]
+			added_travel_time = travel_time + travel_time_bis - travel_times[prev_mission.id][next_mission.id]
 
-		return False  # no time frame found where the mission can fit
+			return mission_duration + added_travel_time + self.daily_work_time[mission.day] <= MAX_DAILY_WORK_TIME \
+					and prev_mission.end_time + travel_time <= mission.start_time \
+					and mission.end_time + travel_time_bis <= next_mission.start_time \
+					and mission_duration + added_travel_time + self.weekly_work_time <= MAX_WEEKLY_WORK_TIME
 
 
-	def add_mission(self, mission: Mission, distance_matrix: list[list[float]], centers_nb: int, employee_center_id: int) -> None:
+	def add_mission(self, mission: Mission, instance: Instance, employee_center_id: int) -> None:
 		"""
 		Adds a mission to the schedule while keeping it sorted
 		We consider that the mission had been checked with can_fit_in_schedule() before
 		When adding a mission, updates the total distance traveled by the employee and the time worked during the week and the day
 		Replaces the travel time took into account when inserting previous missions
 		:param mission: the mission to add
-		:param distance_matrix: the distance matrix
-		:param centers_nb: the number of centers used in the distance matrix indices
+		:param instance: the instance, giving the distances and travel times
 		:param employee_center_id: the id of the center where the employee is based
 		"""
 		day = mission.day
-		missions_of_day = [m for m in self.missions if m.day == day]
+		missions_of_day = self.missions_by_day.setdefault(day, [])
+		starts_of_day = self.starts_by_day.setdefault(day, [])
+		distances = instance.mission_distance_table
+		travel_times = instance.mission_travel_time_table
+		departure_distances = instance.departure_distance_table[employee_center_id]
+		departure_travel_times = instance.departure_travel_time_table[employee_center_id]
+		return_distances = instance.return_distance_table
+		return_travel_times = instance.return_travel_time_table
 
-		added_travel_distance = 0
-		mission_insert_index = 0  # index where the mission will be inserted in the schedule
+		position = bisect_left(starts_of_day, mission.start_time)  # index where the mission will be inserted in the missions of the day
 
 		if len(missions_of_day) == 0:
-			added_travel_distance = distance_matrix[employee_center_id - 1][centers_nb + mission.id - 1] \
-									+ distance_matrix[centers_nb + mission.id - 1][employee_center_id - 1]
-									# distance center->mission->center
-			self.daily_start_time[day] = mission.start_time - (distance_matrix[employee_center_id - 1][centers_nb + mission.id - 1] / TRAVEL_SPEED)
-			self.daily_end_time[day] = mission.end_time + (distance_matrix[centers_nb + mission.id - 1][employee_center_id - 1] / TRAVEL_SPEED)
-			for i, m in enumerate(self.missions):
-				if m.day > day:
-					mission_insert_index = i
-					break
-			else:
-				mission_insert_index = len(self.missions)
-
-
-		elif mission.end_time < missions_of_day[0].start_time:
+			added_travel_distance = departure_distances[mission.id] + return_distances[mission.id][employee_center_id]  # distance center->mission->center
+			added_travel_time = departure_travel_times[mission.id] + return_travel_times[mission.id][employee_center_id]
+			self.daily_start_time[day] = mission.start_time - departure_travel_times[mission.id]
+			self.daily_end_time[day] = mission.end_time + return_travel_times[mission.id][employee_center_id]
+
+		elif position == 0:
 			# if the new mission is before the first mission of the day
-			added_travel_distance = distance_matrix[employee_center_id - 1][centers_nb + mission.id - 1] \
-									+ distance_matrix[centers_nb + mission.id - 1][centers_nb + missions_of_day[0].id - 1] \
-									- distance_matrix[employee_center_id - 1][centers_nb + missions_of_day[0].id - 1]
-									# distance center->mission->first_mission_of_day, minus center->first_mission_of_day
-			self.daily_start_time[day] = mission.start_time - (distance_matrix[employee_center_id - 1][centers_nb + mission.id - 1] / TRAVEL_SPEED)
-			mission_insert_index = self.missions.index(missions_of_day[0])
-
-		elif mission.start_time > missions_of_day[-1].end_time:
+			first_mission = missions_of_day[0]
+			added_travel_distance = departure_distances[mission.id] + distances[mission.id][first_mission.id] - departure_distances[first_mission.id]
+			# distance center->mission->first_mission_of_day, minus center->first_mission_of_day
+			added_travel_time = departure_travel_times[mission.id] + travel_times[mission.id][first_mission.id] - departure_travel_times[first_mission.id]
+			self.daily_start_time[day] = mission.start_time - departure_travel_times[mission.id]
+
+		elif position == len(missions_of_day):
 			# if the new mission is after the last mission of the day
-			added_travel_distance = distance_matrix[centers_nb + missions_of_day[-1].id - 1][centers_nb + mission.id - 1] \
-									+ distance_matrix[centers_nb + mission.id - 1][employee_center_id - 1] \
-									- distance_matrix[centers_nb + missions_of_day[-1].id - 1][employee_center_id - 1]
-									# distance last_mission_of_day->mission->center, minus last_mission_of_day->center
-			self.daily_end_time[day] = mission.end_time + (distance_matrix[centers_nb + mission.id - 1][employee_center_id - 1] / TRAVEL_SPEED)
-			mission_insert_index = self.missions.index(missions_of_day[-1]) + 1
+			last_mission = missions_of_day[-1]
+			added_travel_distance = distances[last_mission.id][mission.id] + return_distances[mission.id][employee_center_id] - return_distances[last_mission.id][employee_center_id]
+			# distance last_mission_of_day->mission->center, minus last_mission_of_day->center
+			added_travel_time = travel_times[last_mission.id][mission.id] + return_travel_times[mission.id][employee_center_id] - return_travel_times[last_mission.id][employee_center_id]
+			self.daily_end_time[day] = mission.end_time + return_travel_times[mission.id][employee_center_id]
 
 		else:
 			# else, it fits between two missions during the day
-			for i in range(len(missions_of_day) - 1):
-
-				if mission.start_time > missions_of_day[i].end_time and mission.end_time < missions_of_day[i + 1].start_time:
-					added_travel_distance = distance_matrix[centers_nb + missions_of_day[i].id - 1][centers_nb + mission.id - 1] \
-											+ distance_matrix[centers_nb + mission.id - 1][centers_nb + missions_of_day[i + 1].id - 1] \
-											- distance_matrix[centers_nb + missions_of_day[i].id - 1][centers_nb + missions_of_day[i + 1].id - 1]  
-											# distance mission i->mission->mission i+1, minus distance mission i->mission i+1
-					mission_insert_index = self.missions.index(missions_of_day[i + 1])
-					break
+			prev_mission = missions_of_day[position - 1]
+			next_mission = missions_of_day[position]
+			added_travel_distance = distances[prev_mission.id][mission.id] + distances[mission.id][next_mission.id] - distances[prev_mission.id][next_mission.id]
+			# distance previous mission->mission->next mission, minus distance previous mission->next mission
+			added_travel_time = travel_times[prev_mission.id][mission.id] + travel_times[mission.id][next_mission.id] - travel_times[prev_mission.id][next_mission.id]
 
-		added_work_time = mission.end_time - mission.start_time + added_travel_distance / TRAVEL_SPEED  # time taken to travel
+		added_work_time = mission.end_time - mission.start_time + added_travel_time
 
 		if day not in self.daily_work_time:
 			self.daily_work_time[day] = added_work_time
@@ -171,7 +175,8 @@ class Schedule:
 
 		self.weekly_work_time += added_work_time
 		self.distance_traveled += added_travel_distance
-		self.missions.insert(mission_insert_index, mission)
+		missions_of_day.insert(position, mission)
+		starts_of_day.insert(position, mission.start_time)
 
 
 	def is_empty_for_day(self, day: int) -> bool:
@@ -180,15 +185,7 @@ class Schedule:
 		:param day: the day to check
 		:return: True if the employee has no mission for the given day, False otherwise
 		"""
-		for i in range(len(self.missions) - 1, -1, -1):
-
-			if self.missions[i].day < day:
-				return True
-
-			if self.missions[i].day == day:
-				return False
-
-		return True
+		return not self.missions_by_day.get(day)
 
 
 	def __str__(self) -> str:
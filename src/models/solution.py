@@ -1,9 +1,12 @@
 from __future__ import annotations
 from random import randint, random
-import json
+import numpy as np
 from models.employee import Employee
 from models.mission import Mission
-from utils import *
+from models.instance import Instance
+from models.solution_state import SolutionState
+from models.fitness import Fitness
+from fitness_cache import FitnessCache, zobrist_key
 from config import *
 
 
@@ -13,37 +16,102 @@ class Solution:
 	"""
 	
 	assignments: dict[int, int]  # hash table to store employees assigned to mission, assigments[i] is the id of the employee assigned to mission of id i
+	state: SolutionState  		 # incremental evaluation state, None until enable_incremental_evaluation() is called
+	evaluation: tuple[bool,Fitness]  # validity and fitness stored by check_and_get_fitness(), None until computed or when the assignments changed
+	hash_value: int  			 # Zobrist hash of the assignments, None until first computed, then updated by assign() and unassign()
 
 
 	def __init__(self) -> None:
 		self.assignments = dict()
+		self.state = None
+		self.evaluation = None
+		self.hash_value = None
 
 
-	def get_fitness(self, employees: dict[int, Employee], missions: dict[int, Mission], distance_matrix: list[list[float]], centers_nb: int) -> float:
+	def enable_incremental_evaluation(self, instance: Instance) -> None:
 		"""
-		Computes all the fitnesses of the employees in one integer
-		Using powers of ten, we can still use cascade sorting. 
-		The first fitness is the most important, the second is less important, etc.
-		The assignments number, the first, is the dominant number, multiplied by 10^8
-		Then, to sort the travel cost (second fitness) in the opposite order of the two others, we take 10^8 - the travel cost in thousands.
-		Finally, the number of specialities is the third fitness, it is stored in the last 3 digits.
+		Builds the incremental evaluation state of the solution
+		Once enabled, the changes made with assign() and unassign() only re-evaluate the days of the employees they touched
+		:param instance: the instance
+		"""
+		self.state = SolutionState(instance, self.assignments)
+		self.evaluation = None
+
+
+	def assign(self, mission_id: int, employee_id: int) -> None:
+		"""
+		Assigns a mission to an employee, replacing its previous assignment
+		:param mission_id: id of the mission
+		:param employee_id: id of the employee
+		"""
+		previous_employee_id = self.assignments.get(mission_id)
+		if previous_employee_id == employee_id:
+			return
+		if self.state is not None:
+			if previous_employee_id is not None:
+				self.state.remove(mission_id, previous_employee_id)
+			self.state.add(mission_id, employee_id)
+		if self.hash_value is not None:
+			if previous_employee_id is not None:
+				self.hash_value ^= zobrist_key(mission_id, previous_employee_id)
+			self.hash_value ^= zobrist_key(mission_id, employee_id)
+		self.assignments[mission_id] = employee_id
+		self.evaluation = None
+
+
+	def unassign(self, mission_id: int) -> None:
+		"""
+		Removes the assignment of a mission
+		:param mission_id: id of the mission
+		"""
+		employee_id = self.assignments.pop(mission_id)
+		if self.state is not None:
+			self.state.remove(mission_id, employee_id)
+		if self.hash_value is not None:
+			self.hash_value ^= zobrist_key(mission_id, employee_id)
+		self.evaluation = None
 
-		Example : 75 missions assigned, 1205 travel cost, 30 corresponding specialities:
-		75 * 10^8 + (10^8 - 1205 * 10^3) + 30 = 7,598,795,030
 
-		:param employees: list of employees
-		:param missions: dict of missions
-		:param distance_matrix: matrix of distances between center-center, centers-missions, missions-missions
-		:param centers_nb: number of centers
+	def copy(self) -> Solution:
+		"""
+		Copies the solution, with its incremental evaluation state if enabled
+		:return: the copy
+		"""
+		solution = Solution()
+		solution.assignments = dict(self.assignments)
+		if self.state is not None:
+			solution.state = self.state.copy()
+		solution.evaluation = self.evaluation
+		solution.hash_value = self.hash_value
+		return solution
+
+
+	def get_fitness(self, instance: Instance) -> Fitness:
+		"""
+		Computes all the fitnesses of the solution
+		The fitnesses are compared in cascade: the first is the most important, the second is less important, etc.
+		The assignments number is the first, the travel cost the second (sorted in the opposite order of the two others),
+		and the number of corresponding specialities the third
+
+		Example : 75 missions assigned, 1205 travel cost, 30 corresponding specialities: Fitness(75, 1205, 30)
+
+		:param instance: the instance
 		:return: the fitness of the solution
 		"""
+		is_valid, fitness = self.check_and_get_fitness(instance)
+		if is_valid:
+			return fitness
+
+		# the validity check stopped at the first mission that does not fit, the schedules are replayed without checks
+		employees = instance.employees
+		missions = instance.missions
 
 		# Fitness one: number of missions assigned
 		nb_assignments = len(self.assignments)
 
 		# Fitness two: travel cost for employees
 		for mission_id, assigned_employee_id in self.assignments.items():
-			employees[assigned_employee_id].schedule.add_mission(missions[mission_id], distance_matrix, centers_nb, employees[assigned_employee_id].center_id)
+			employees[assigned_employee_id].schedule.add_mission(missions[mission_id], instance, employees[assigned_employee_id].center_id)
 
 		total_distance = 0
 		for _, employee in employees.items():
@@ -56,93 +124,154 @@ class Solution:
 		# Fitness three: number of specialities
 		count = len(self.assignments)
 		for mission_id, assigned_employee_id in self.assignments.items():
-			if employees[assigned_employee_id].speciality != missions[mission_id].speciality:
+			if employees[assigned_employee_id].speciality_code != missions[mission_id].speciality_code:
 				count -= 1
 
 		specialities_count = count
 
-		return int(nb_assignments * 1e8 + (1e8 - travel_cost * 1e3) + specialities_count)
+		return Fitness(nb_assignments, travel_cost, specialities_count)
 
 
-	def mutate(self, missions: dict[Mission], employees: dict[int, Employee], mutated_genes_per_chromosome_rate: float) -> None:
+	def check_and_get_fitness(self, instance: Instance) -> tuple[bool,Fitness]:
+		"""
+		Checks the validity of the solution and computes its fitness in a single pass over the schedules
+		The missions are added in chronological order, so each one is appended at the end of its employee's day,
+		and the pass stops at the first mission that does not fit
+		The result is stored in the solution until its assignments are changed with assign() or unassign()
+		:param instance: the instance
+		:return: True if the solution is valid, False otherwise, and the fitness of the solution (None if it is invalid)
+		"""
+		if self.evaluation is not None:
+			return self.evaluation
+
+		if self.state is not None:
+			is_valid = self.state.is_valid()
+			fitness = Fitness(len(self.assignments), int(COST_PER_KM * self.state.get_total_distance()), self.state.specialities_count) if is_valid else None
+			self.evaluation = (is_valid, fitness)
+			return self.evaluation
+
+		employees = instance.employees
+		missions = instance.missions
+		is_valid = True
+		specialities_count = 0
+
+		for mission_id in instance.chronological_order.tolist():
+			employee_id = self.assignments.get(mission_id)
+			if employee_id is None:
+				continue
+
+			mission = missions[mission_id]
+			employee = employees[employee_id]
+
+			if mission.skill_code != employee.skill_code or not employee.schedule.can_fit_in_schedule(mission, instance, employee.center_id):
+				is_valid = False
+				break
+
+			employee.schedule.add_mission(mission, instance, employee.center_id)
+			specialities_count += employee.speciality_code == mission.speciality_code
+
+		total_distance = 0
+		for _, employee in employees.items():
+			total_distance += employee.schedule.distance_traveled
+			employee.reset_schedule()
+
+		fitness = Fitness(len(self.assignments), int(COST_PER_KM * total_distance), specialities_count) if is_valid else None
+		self.evaluation = (is_valid, fitness)
+
+		return self.evaluation
+
+
+	def mutate(self, instance: Instance, mutated_genes_per_chromosome_rate: float) -> None:
 		"""
 		Mutates the solution to add diversity
 		Selects two genes randomly and swaps them
 		If one of the genes is not assigned, it is assigned to a random employee
+		:param instance: the instance
+		:param mutated_genes_per_chromosome_rate: rate of the assigned genes to mutate
 		"""
+		missions = instance.missions
+		employees = instance.employees
 		for _ in range(randint(1, max(int(mutated_genes_per_chromosome_rate * len(self.assignments)), 1))):
 			gene1 = randint(1, len(missions))
-			skill = missions[gene1].skill
+			skill = missions[gene1].skill_code
 
 			if gene1 not in self.assignments:
-				self.assignments[gene1] = randint(1, len(employees))
+				employee_id = randint(1, len(employees))
 
-				while employees[self.assignments[gene1]].skill != skill:
-					self.assignments[gene1] = randint(1, len(employees))
+				while employees[employee_id].skill_code != skill:
+					employee_id = randint(1, len(employees))
+
+				self.assign(gene1, employee_id)
 
 			else:
 				gene2 = randint(1, len(missions))
-				while missions[gene2].skill != skill:
+				while missions[gene2].skill_code != skill:
 					gene2 = randint(1, len(missions))
 
 				if gene2 not in self.assignments:
-					self.assignments[gene2] = self.assignments[gene1]
+					self.assign(gene2, self.assignments[gene1])
 
 					if random() < .5:
-						self.assignments.pop(gene1)
+						self.unassign(gene1)
 
 				else:
-					self.assignments[gene1], self.assignments[gene2] = self.assignments[gene2], self.assignments[gene1]
+					employee1, employee2 = self.assignments[gene1], self.assignments[gene2]
+					self.assign(gene1, employee2)
+					self.assign(gene2, employee1)
 
 
-	def evaluate(self, distance_matrix: list[list[float]], employees: dict[int, Employee], missions: dict[int, Mission], centers_nb: int, fitness_memo: dict[Solution, int] = None) -> list[float|float|float]:
+	def evaluate(self, instance: Instance, fitness_cache: FitnessCache = None) -> Fitness:
 		"""
 		Evaluates the solution, i.e. computes the fitnesses
-		:param distance_matrix: the distance matrix
-		:param employees: the employees
-		:param missions: the missions
+		:param instance: the instance
+		:param fitness_cache: cache of the validity and fitness of the solutions, keyed by their hash, see FitnessCache
 		:return: the fitness of the solution
 		"""
-		if fitness_memo is None:
-			return self.get_fitness(employees, missions, distance_matrix, centers_nb)
+		if fitness_cache is None:
+			return self.get_fitness(instance)
 
-		if self not in fitness_memo:
-			fitness_memo[self] = self.get_fitness(employees, missions, distance_matrix, centers_nb)
-		
-		return fitness_memo[self]
+		key = self.get_hash()
+		evaluation = fitness_cache.get(key)
+		if evaluation is None:
+			evaluation = (self.is_valid(instance), self.get_fitness(instance))
+			fitness_cache.put(key, evaluation)
 
+		return evaluation[1]
 
-	def is_valid(self, employees: dict[int, Employee], missions: dict[int, Mission], distance_matrix: list[list[float]], centers_nb: int) -> bool:
+
+	def is_valid(self, instance: Instance) -> bool:
 		"""
 		Checks if the solution is valid, i.e. if no mission overlaps another mission for each employee
-		:param employees: the employees
-		:param missions: the missions
-		:param distance_matrix: the distance matrix
-		:param centers_nb: the number of centers used in the distance matrix indices
+		:param instance: the instance
 		:return: True if the solution is valid, False otherwise
 		"""
-		is_valid = True
+		return self.check_and_get_fitness(instance)[0]
 		
-		for mission_id, mission in missions.items():
 
-			if mission_id not in self.assignments:
-				continue
+	def to_array(self, missions_nb: int) -> np.ndarray:
+		"""
+		Converts the assignments to a vector, used as a row of a Population
+		:param missions_nb: number of missions of the instance
+		:return: vector where the value at index i is the id of the employee assigned to mission i + 1, 0 if unassigned
+		"""
+		array = np.zeros(missions_nb, dtype=np.int32)
+		for mission_id, employee_id in self.assignments.items():
+			array[mission_id - 1] = employee_id
+		return array
 
-			if mission.skill != employees[self.assignments[mission_id]].skill:
-				is_valid = False
-				break
 
-			if employees[self.assignments[mission_id]].schedule.can_fit_in_schedule(mission, distance_matrix, centers_nb, employees[self.assignments[mission_id]].center_id):
-				employees[self.assignments[mission_id]].schedule.add_mission(mission, distance_matrix, centers_nb, employees[self.assignments[mission_id]].center_id)
-			else:
-				is_valid = False
-				break
+	@staticmethod
+	def from_array(array: np.ndarray) -> Solution:
+		"""
+		Builds a solution from an assignments vector
+		:param array: vector where the value at index i is the id of the employee assigned to mission i + 1, 0 if unassigned
+		:return: the corresponding solution
+		"""
+		solution = Solution()
+		for index in np.flatnonzero(array):
+			solution.assignments[int(index) + 1] = int(array[index])
+		return solution
 
-		for _, employee in employees.items():
-			employee.reset_schedule()
-			
-		return is_valid
-		
 
 	def __eq__(self, other: Solution) -> bool:
 		return self.assignments == other.assignments
@@ -160,5 +289,17 @@ class Solution:
 		return self.__str__()
 
 
+	def get_hash(self) -> int:
+		"""
+		Returns the 64 bits Zobrist hash of the assignments, same value as zobrist_hash() on the corresponding population row
+		:return: the hash
+		"""
+		if self.hash_value is None:
+			self.hash_value = 0
+			for mission_id, employee_id in self.assignments.items():
+				self.hash_value ^= zobrist_key(mission_id, employee_id)
+		return self.hash_value
+
+
 	def __hash__(self) -> int:
-		return hash(json.dumps(self.assignments, sort_keys=True))
+		return self.get_hash()
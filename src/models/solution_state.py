@@ -0,0 +1,161 @@
+from __future__ import annotations
+from bisect import insort
+from models.instance import Instance
+from config import *
+
+
+def evaluate_day_route(instance: Instance, employee_center_id: int, route: list[int]) -> tuple[bool,float,float]:
+	"""
+	Evaluates the route of an employee during one day, with the same constraints as Schedule.can_fit_in_schedule
+	:param instance: the instance
+	:param employee_center_id: the id of the center where the employee is based
+	:param route: ids of the missions of the day, sorted by start time
+	:return: whether the route is feasible, the distance traveled and the time worked during the day
+	"""
+	missions = instance.missions
+	distances = instance.mission_distance_table
+	travel_times = instance.mission_travel_time_table
+
+	first_mission = missions[route[0]]
+	distance = instance.departure_distance_table[employee_center_id][first_mission.id]
+	work_time = first_mission.end_time - first_mission.start_time + instance.departure_travel_time_table[employee_center_id][first_mission.id]
+	is_feasible = True
+
+	prev_mission = first_mission
+	for mission_id in route[1:]:
+		mission = missions[mission_id]
+		travel_time = travel_times[prev_mission.id][mission_id]
+		if mission.start_time <= prev_mission.end_time or prev_mission.end_time + travel_time > mission.start_time:
+			is_feasible = False
+		distance += distances[prev_mission.id][mission_id]
+		work_time += mission.end_time - mission.start_time + travel_time
+		prev_mission = mission
+
+	return_travel_time = instance.return_travel_time_table[prev_mission.id][employee_center_id]
+	distance += instance.return_distance_table[prev_mission.id][employee_center_id]
+	work_time += return_travel_time
+
+	is_feasible = is_feasible \
+					and work_time <= MAX_DAILY_WORK_TIME \
+					and prev_mission.end_time + return_travel_time - (first_mission.start_time - instance.departure_distance_table[employee_center_id][first_mission.id]) <= MAX_DAILY_TIME_RANGE
+
+	return is_feasible, distance, work_time
+
+
+class SolutionState:
+	"""
+	Incremental evaluation state of a solution
+	Caches the route of each employee for each day with its evaluation, so that changing a few genes
+	only re-evaluates the days of the employees it touched instead of rebuilding every schedule
+	"""
+
+	instance: Instance  										# the instance the solution is evaluated on
+	routes: dict[int, dict[int, list[int]]]  					# routes[employee_id][day] is the list of mission ids of the employee on that day, sorted by start time
+	route_evaluations: dict[int, dict[int, tuple[bool,float,float]]]  	# feasibility, distance and work time of each route, indexed as routes
+	weekly_work_time: dict[int, float]  						# time worked during the week by each employee
+	dirty_routes: set[tuple[int,int]]  							# routes changed since their last evaluation
+	specialities_count: int  									# number of missions assigned to an employee of the same speciality
+	skill_mismatches: int  										# number of missions assigned to an employee of another skill
+
+
+	def __init__(self, instance: Instance, assignments: dict[int, int] = None) -> None:
+		self.instance = instance
+		self.routes = dict()
+		self.route_evaluations = dict()
+		self.weekly_work_time = dict()
+		self.dirty_routes = set()
+		self.specialities_count = 0
+		self.skill_mismatches = 0
+
+		if assignments is not None:
+			for mission_id, employee_id in assignments.items():
+				self.add(mission_id, employee_id)
+
+
+	def add(self, mission_id: int, employee_id: int) -> None:
+		"""
+		Adds a mission to the route of an employee
+		:param mission_id: id of the mission
+		:param employee_id: id of the employee
+		"""
+		mission = self.instance.missions[mission_id]
+		employee = self.instance.employees[employee_id]
+		missions = self.instance.missions
+
+		insort(self.routes.setdefault(employee_id, dict()).setdefault(mission.day, []), mission_id, key=lambda m: (missions[m].start_time, m))
+		self.dirty_routes.add((employee_id, mission.day))
+		self.specialities_count += employee.speciality_code == mission.speciality_code
+		self.skill_mismatches += employee.skill_code != mission.skill_code
+
+
+	def remove(self, mission_id: int, employee_id: int) -> None:
+		"""
+		Removes a mission from the route of an employee
+		:param mission_id: id of the mission
+		:param employee_id: id of the employee
+		"""
+		mission = self.instance.missions[mission_id]
+		employee = self.instance.employees[employee_id]
+
+		self.routes[employee_id][mission.day].remove(mission_id)
+		self.dirty_routes.add((employee_id, mission.day))
+		self.specialities_count -= employee.speciality_code == mission.speciality_code
+		self.skill_mismatches -= employee.skill_code != mission.skill_code
+
+
+	def refresh(self) -> None:
+		"""
+		Re-evaluates the routes changed since the last refresh, and the weekly work time of their employees
+		"""
+		if not self.dirty_routes:
+			return
+
+		touched_employees = set()
+		for employee_id, day in self.dirty_routes:
+			route = self.routes[employee_id].get(day)
+			evaluations = self.route_evaluations.setdefault(employee_id, dict())
+			if route:
+				evaluations[day] = evaluate_day_route(self.instance, self.instance.employees[employee_id].center_id, route)
+			else:
+				self.routes[employee_id].pop(day, None)
+				evaluations.pop(day, None)
+			touched_employees.add(employee_id)
+		self.dirty_routes.clear()
+
+		for employee_id in touched_employees:
+			self.weekly_work_time[employee_id] = sum(evaluation[2] for evaluation in self.route_evaluations[employee_id].values())
+
+
+	def is_valid(self) -> bool:
+		"""
+		Checks the constraints of every route and the weekly work time of every employee
+		:return: True if the solution is valid, False otherwise
+		"""
+		self.refresh()
+		return self.skill_mismatches == 0 \
+				and all(evaluation[0] for evaluations in self.route_evaluations.values() for evaluation in evaluations.values()) \
+				and all(work_time <= MAX_WEEKLY_WORK_TIME for work_time in self.weekly_work_time.values())
+
+
+	def get_total_distance(self) -> float:
+		"""
+		Computes the total distance traveled by the employees
+		:return: the total distance
+		"""
+		self.refresh()
+		return sum(evaluation[1] for evaluations in self.route_evaluations.values() for evaluation in evaluations.values())
+
+
+	def copy(self) -> SolutionState:
+		"""
+		Copies the state, the routes lists are copied so that the copy can be changed independently
+		:return: the copy
+		"""
+		self.refresh()
+		state = SolutionState(self.instance)
+		state.routes = {employee_id: {day: list(route) for day, route in routes.items()} for employee_id, routes in self.routes.items()}
+		state.route_evaluations = {employee_id: dict(evaluations) for employee_id, evaluations in self.route_evaluations.items()}
+		state.weekly_work_time = dict(self.weekly_work_time)
+		state.specialities_count = self.specialities_count
+		state.skill_mismatches = self.skill_mismatches
+		return state
@@ -0,0 +1,81 @@
+from __future__ import annotations
+from multiprocessing import Pool
+from os import cpu_count
+import numpy as np
+from models.instance import Instance
+from population_evaluator import PopulationEvaluator
+
+
+# evaluator of a worker process, set once by _init_evaluation_worker so that the instance is not sent with every task
+_worker_evaluator: PopulationEvaluator = None
+
+
+def _init_evaluation_worker(instance: Instance) -> None:
+	"""
+	Initializes an evaluation worker process with the instance
+	:param instance: the instance
+	"""
+	global _worker_evaluator
+	_worker_evaluator = PopulationEvaluator(instance)
+
+
+def _evaluate_chunk(assignments: np.ndarray) -> tuple[np.ndarray,np.ndarray]:
+	"""
+	Evaluates a chunk of a population matrix in a worker process
+	:param assignments: rows of the population matrix
+	:return: the validity mask and the fitnesses of the rows
+	"""
+	return _worker_evaluator.evaluate(assignments)
+
+
+class ParallelEvaluator:
+	"""
+	Evaluates population matrices on a persistent pool of worker processes
+	The instance is sent to the workers once, by the pool initializer, then each task only carries rows of the matrix
+	and sends back the validity mask and the fitness integers
+	Same interface as PopulationEvaluator, so the genetic algorithm can use either
+	"""
+
+	instance: Instance  				# the instance
+	workers_nb: int  					# number of worker processes
+	min_chunk_size: int  				# minimum number of rows sent to a worker, smaller batches are evaluated in the calling process
+	local_evaluator: PopulationEvaluator  # evaluator used for the small batches
+	pool: Pool  						# the worker processes
+
+
+	def __init__(self, instance: Instance, workers_nb: int = None, min_chunk_size: int = 64) -> None:
+		self.instance = instance
+		self.workers_nb = workers_nb or cpu_count() or 1
+		self.min_chunk_size = min_chunk_size
+		self.local_evaluator = PopulationEvaluator(instance)
+		self.pool = Pool(self.workers_nb, initializer=_init_evaluation_worker, initargs=(instance,))
+
+
+	def evaluate(self, assignments: np.ndarray) -> tuple[np.ndarray,np.ndarray]:
+		"""
+		Checks the validity and computes the fitness of every individual of a population, split between the workers
+		:param assignments: population matrix of shape (individuals, missions), 0 meaning unassigned
+		:return: the validity mask and the fitnesses of the individuals
+		"""
+		chunks_nb = min(self.workers_nb, len(assignments) // self.min_chunk_size)
+		if chunks_nb <= 1:
+			return self.local_evaluator.evaluate(assignments)
+
+		results = self.pool.map(_evaluate_chunk, np.array_split(assignments, chunks_nb))
+		return np.concatenate([valid for valid, _ in results]), np.concatenate([fitnesses for _, fitnesses in results])
+
+
+	def close(self) -> None:
+		"""
+		Stops the worker processes
+		"""
+		self.pool.close()
+		self.pool.join()
+
+
+	def __enter__(self) -> ParallelEvaluator:
+		return self
+
+
+	def __exit__(self, *_) -> None:
+		self.close()
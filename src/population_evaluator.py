@@ -0,0 +1,107 @@
+import numpy as np
+from config import *
+from models.instance import Instance
+from models.fitness import make_fitnesses
+
+
+class PopulationEvaluator:
+	"""
+	Evaluates a whole population matrix (individuals x missions, 0 = unassigned) in a few array operations
+	It checks the same constraints as Schedule.can_fit_in_schedule and computes the same fitness as Solution.get_fitness
+	"""
+
+	instance: Instance  				# the instance, giving the precomputed arrays
+	chronological_order: np.ndarray  	# columns of the population matrix sorted by day and start time of their mission
+
+
+	def __init__(self, instance: Instance) -> None:
+		self.instance = instance
+		# the columns are evaluated in chronological order, so that the missions of an employee's day are consecutive once grouped by employee
+		self.chronological_order = instance.chronological_order - 1
+
+
+	def evaluate(self, assignments: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+		"""
+		Checks the validity and computes the fitness of every individual of a population
+		The assigned genes of all the individuals are flattened and grouped by (individual, employee, day),
+		each group being the route of an employee during a day, so that every constraint becomes an array operation
+		:param assignments: population matrix of shape (individuals, missions), 0 meaning unassigned
+		:return: the validity mask and the fitnesses of the individuals, as an array of FITNESS_DTYPE
+		"""
+		instance = self.instance
+		mission_table = instance.mission_table
+		employee_table = instance.employee_table
+		individuals_nb = len(assignments)
+		ordered = assignments[:, self.chronological_order]
+		rows, cols = np.nonzero(ordered)
+		missions = instance.chronological_order[cols]
+		employees = ordered[rows, cols].astype(np.int64)
+
+		nb_assignments = np.bincount(rows, minlength=individuals_nb)
+		invalid = np.zeros(individuals_nb, dtype=bool)
+
+		# skills and specialities
+		invalid[rows[mission_table.skill[missions] != employee_table.skill[employees]]] = True
+		specialities_count = np.bincount(rows[mission_table.speciality[missions] == employee_table.speciality[employees]], minlength=individuals_nb)
+
+		if len(rows) == 0:
+			return ~invalid, self._encode(nb_assignments, np.zeros(individuals_nb), specialities_count)
+
+		# groups the genes by individual and employee, the stable sort keeps the chronological order inside each group
+		group = rows * len(employee_table.skill) + employees
+		permutation = np.argsort(group, kind="stable")
+		rows, missions, employees, group = rows[permutation], missions[permutation], employees[permutation], group[permutation]
+		days = mission_table.day[missions]
+		centers = employee_table.center[employees]
+		starts = mission_table.start[missions]
+		ends = mission_table.end[missions]
+
+		first_of_day = np.ones(len(rows), dtype=bool)
+		first_of_day[1:] = (group[1:] != group[:-1]) | (days[1:] != days[:-1])
+		last_of_day = np.ones(len(rows), dtype=bool)
+		last_of_day[:-1] = first_of_day[1:]
+		day_index = np.cumsum(first_of_day) - 1
+
+		# travels between two consecutive missions of the same day
+		current = np.flatnonzero(~first_of_day)
+		previous = current - 1
+		legs_distance = instance.distance_provider.get_mission_distances(missions[previous], missions[current])
+		legs_travel_time = legs_distance / TRAVEL_SPEED
+		legs_valid = (starts[current] > ends[previous]) & (ends[previous] + legs_travel_time <= starts[current])
+		invalid[rows[current[~legs_valid]]] = True
+
+		# travels center->first mission of the day and last mission of the day->center
+		firsts = np.flatnonzero(first_of_day)
+		lasts = np.flatnonzero(last_of_day)
+		departure_distance = instance.departure_distances[centers[firsts], missions[firsts]]
+		return_distance = instance.return_distances[missions[lasts], centers[lasts]]
+		return_travel_time = instance.return_travel_times[missions[lasts], centers[lasts]]
+		days_nb = len(firsts)
+
+		day_distance = departure_distance + return_distance + np.bincount(day_index[current], weights=legs_distance, minlength=days_nb)
+		day_travel_time = instance.departure_travel_times[centers[firsts], missions[firsts]] + return_travel_time + np.bincount(day_index[current], weights=legs_travel_time, minlength=days_nb)
+		day_work_time = np.bincount(day_index, weights=mission_table.duration[missions], minlength=days_nb) + day_travel_time
+		day_time_range = ends[lasts] + return_travel_time - (starts[firsts] - departure_distance)
+		day_rows = rows[firsts]
+		invalid[day_rows[day_work_time > MAX_DAILY_WORK_TIME]] = True
+		invalid[day_rows[day_time_range > MAX_DAILY_TIME_RANGE]] = True
+
+		# weekly work time of each employee
+		day_group = group[firsts]
+		first_of_week = np.ones(days_nb, dtype=bool)
+		first_of_week[1:] = day_group[1:] != day_group[:-1]
+		week_index = np.cumsum(first_of_week) - 1
+		weekly_work_time = np.bincount(week_index, weights=day_work_time)
+		invalid[day_rows[first_of_week][weekly_work_time > MAX_WEEKLY_WORK_TIME]] = True
+
+		total_distance = np.bincount(day_rows, weights=day_distance, minlength=individuals_nb)
+
+		return ~invalid, self._encode(nb_assignments, total_distance, specialities_count)
+
+
+	@staticmethod
+	def _encode(nb_assignments: np.ndarray, total_distance: np.ndarray, specialities_count: np.ndarray) -> np.ndarray:
+		"""
+		Builds the fitnesses of the individuals, see Solution.get_fitness
+		"""
+		return make_fitnesses(nb_assignments, (COST_PER_KM * total_distance).astype(np.int64), specialities_count)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from contextlib import nullcontext
+from pathlib import Path
+from time import perf_counter
+from typing import Any, ContextManager, TextIO
+import csv
+import json
+import numpy as np
+from models.population import Population
+from fitness_cache import zobrist_hash
+
+
+TRACE_FIELDS = ("iteration", "elapsed_time", "best_assignments_nb", "best_travel_cost", "best_specialities_nb",
+				"mean_assignments_nb", "mean_travel_cost", "mean_specialities_nb", "diversity", "unique_individuals",
+				"children_nb", "accepted_nb", "cache_hits", "cache_misses")  # columns of the per-generation trace
+
+
+class PhaseTimer:
+	"""
+	Context manager adding the time spent in a block to a phase of a profiler
+	"""
+
+	__slots__ = ("profiler", "phase", "start_time")
+
+	profiler: Profiler  # profiler the time is added to
+	phase: str  		# name of the phase
+	start_time: float  	# time at which the block was entered
+
+
+	def __init__(self, profiler: Profiler, phase: str) -> None:
+		self.profiler = profiler
+		self.phase = phase
+		self.start_time = 0.
+
+
+	def __enter__(self) -> PhaseTimer:
+		self.start_time = perf_counter()
+		return self
+
+
+	def __exit__(self, *_: Any) -> None:
+		self.profiler.times[self.phase] = self.profiler.times.get(self.phase, 0.) + perf_counter() - self.start_time
+		self.profiler.calls[self.phase] = self.profiler.calls.get(self.phase, 0) + 1
+
+
+class Profiler:
+	"""
+	Records where the time of the genetic algorithm goes, phase by phase, with counters of the events of each generation,
+	and optionally writes a trace of the population after each generation, as CSV or JSON lines depending on the extension of its file
+	"""
+
+	enabled = True
+
+	times: dict[str, float]  		# total time spent in each phase, in seconds
+	calls: dict[str, int]  			# number of times each phase was run
+	counters: dict[str, int]  		# events counted since the start, such as the cache hits
+	timers: dict[str, PhaseTimer]  	# timer of each phase, reused between the calls
+	generation_counters: dict[str, int]  # events counted since the last generation recorded
+	trace_file: TextIO  			# file of the trace, None if no trace is written
+	trace_writer: csv.DictWriter  	# writer of the trace when it is written as CSV, None otherwise
+	start_time: float  				# time at which the profiler was created
+
+
+	def __init__(self, trace_path: Path = None) -> None:
+		"""
+		:param trace_path: file where the per-generation trace is written, as CSV if its extension is .csv and as JSON lines otherwise, None for no trace
+		"""
+		self.times = dict()
+		self.calls = dict()
+		self.counters = dict()
+		self.timers = dict()
+		self.generation_counters = dict()
+		self.trace_file = None
+		self.trace_writer = None
+		self.start_time = perf_counter()
+
+		if trace_path is not None:
+			self.trace_file = open(trace_path, "w", newline="")
+			if Path(trace_path).suffix.lower() == ".csv":
+				self.trace_writer = csv.DictWriter(self.trace_file, TRACE_FIELDS)
+				self.trace_writer.writeheader()
+
+
+	def measure(self, phase: str) -> ContextManager:
+		"""
+		Returns a context manager measuring the time spent in a block
+		:param phase: name of the phase the block belongs to
+		:return: the context manager
+		"""
+		timer = self.timers.get(phase)
+		if timer is None:
+			timer = self.timers[phase] = PhaseTimer(self, phase)
+		return timer
+
+
+	def count(self, name: str, value: int = 1) -> None:
+		"""
+		Counts events
+		:param name: name of the counter
+		:param value: number of events
+		"""
+		self.counters[name] = self.counters.get(name, 0) + value
+		self.generation_counters[name] = self.generation_counters.get(name, 0) + value
+
+
+	def record_generation(self, iteration: int, population: Population) -> None:
+		"""
+		Records the state of the population after a generation, and writes it to the trace
+		The diversity is the mean share of the genes of the individuals that differ from the best individual
+		:param iteration: number of the generation
+		:param population: the population, sorted by decreasing fitness
+		"""
+		if self.trace_file is not None:
+			fitnesses = population.fitnesses
+			best = fitnesses[0]
+			row = {
+				"iteration": iteration,
+				"elapsed_time": round(perf_counter() - self.start_time, 6),
+				"best_assignments_nb": int(best["assignments_nb"]),
+				"best_travel_cost": int(best["travel_cost"]),
+				"best_specialities_nb": int(best["specialities_nb"]),
+				"mean_assignments_nb": float(fitnesses["assignments_nb"].mean()),
+				"mean_travel_cost": float(fitnesses["travel_cost"].mean()),
+				"mean_specialities_nb": float(fitnesses["specialities_nb"].mean()),
+				"diversity": float((population.assignments != population.assignments[0]).mean()),
+				"unique_individuals": len(np.unique(zobrist_hash(population.assignments))),
+				"children_nb": self.generation_counters.get("children", 0),
+				"accepted_nb": self.generation_counters.get("accepted_children", 0),
+				"cache_hits": self.generation_counters.get("cache_hits", 0),
+				"cache_misses": self.generation_counters.get("cache_misses", 0)
+			}
+			if self.trace_writer is not None:
+				self.trace_writer.writerow(row)
+			else:
+				self.trace_file.write(json.dumps(row) + "\n")
+		self.generation_counters.clear()
+
+
+	def get_report(self) -> str:
+		"""
+		Returns the time spent in each phase and the counters, in a readable way
+		:return: the report
+		"""
+		total_time = perf_counter() - self.start_time
+		lines = [f"  Profile over {round(total_time, 3)}s:"]
+		for phase, phase_time in sorted(self.times.items(), key=lambda item: -item[1]):
+			calls = self.calls[phase]
+			lines.append(f"    {phase}: {round(phase_time, 3)}s ({round(100 * phase_time / total_time, 1)}%), {calls} calls, {round(1e6 * phase_time / calls, 1)} us per call")
+		children, accepted = self.counters.get("children", 0), self.counters.get("accepted_children", 0)
+		if children:
+			lines.append(f"    accepted children: {accepted}/{children} ({round(100 * accepted / children, 1)}%)")
+		hits, misses = self.counters.get("cache_hits", 0), self.counters.get("cache_misses", 0)
+		if hits + misses:
+			lines.append(f"    cache: {hits} hits, {misses} misses ({round(100 * hits / (hits + misses), 1)}% hit rate)")
+		for name, value in sorted(self.counters.items()):
+			if name not in ("children", "accepted_children", "cache_hits", "cache_misses"):
+				lines.append(f"    {name}: {value}")
+		return "\n".join(lines)
+
+
+	def close(self) -> None:
+		"""
+		Closes the trace file
+		"""
+		if self.trace_file is not None:
+			self.trace_file.close()
+			self.trace_file = None
+
+
+class NullProfiler(Profiler):
+	"""
+	Profiler recording nothing, used when the profiling is disabled so that the instrumented code costs almost nothing
+	"""
+
+	enabled = False
+
+	NULL_CONTEXT = nullcontext()  # reusable context manager doing nothing
+
+
+	def measure(self, phase: str) -> ContextManager:
+		return self.NULL_CONTEXT
+
+
+	def count(self, name: str, value: int = 1) -> None:
+		pass
+
+
+	def record_generation(self, iteration: int, population: Population) -> None:
+		pass
+
+
+NULL_PROFILER = NullProfiler()  # shared disabled profiler
@@ -0,0 +1,133 @@
+from __future__ import annotations
+from config import *
+from models.instance import Instance
+from models.solution import Solution
+from run_controller import RunController
+from genetic_algorithm import genetic_algorithm
+
+
+def adapt_solution(solution: Solution, instance: Instance, unavailable_employees: set[int] = frozenset(), cancelled_missions: set[int] = frozenset()) -> tuple[Solution,set[int]]:
+	"""
+	Keeps the assignments of a previous solution that still make sense in the instance, which may have changed since:
+	the mission and the employee must exist and have the same skill, the mission must not be cancelled and the employee must be available
+	The schedules are not checked, the kept assignments may not be valid
+	:param solution: the previous solution
+	:param instance: the instance
+	:param unavailable_employees: ids of the employees that cannot work anymore
+	:param cancelled_missions: ids of the missions that are cancelled
+	:return: the adapted solution, and the ids of the missions whose assignment was dropped
+	"""
+	adapted_solution = Solution()
+	dropped_missions = set()
+	for mission_id, employee_id in solution.assignments.items():
+		if mission_id not in instance.missions or mission_id in cancelled_missions:
+			continue
+		if employee_id in instance.employees and employee_id not in unavailable_employees and instance.employees[employee_id].skill == instance.missions[mission_id].skill:
+			adapted_solution.assignments[mission_id] = employee_id
+		else:
+			dropped_missions.add(mission_id)
+	return adapted_solution, dropped_missions
+
+
+def get_invalid_employees(solution: Solution, instance: Instance) -> set[int]:
+	"""
+	Finds the employees whose schedule is not valid, the missions being added to the schedules in chronological order as in Solution.check_and_get_fitness
+	:param solution: the solution
+	:param instance: the instance
+	:return: the ids of the employees having a mission that does not fit in their schedule
+	"""
+	employees = instance.employees
+	missions = instance.missions
+	invalid_employees = set()
+	for mission_id in instance.chronological_order.tolist():
+		employee_id = solution.assignments.get(mission_id)
+		if employee_id is None:
+			continue
+		employee = employees[employee_id]
+		if employee.schedule.can_fit_in_schedule(missions[mission_id], instance, employee.center_id):
+			employee.schedule.add_mission(missions[mission_id], instance, employee.center_id)
+		else:
+			invalid_employees.add(employee_id)
+
+	for employee in employees.values():
+		employee.reset_schedule()
+	return invalid_employees
+
+
+def get_nearest_employees(instance: Instance, mission_id: int, employees_nb: int, excluded_employees: set[int] = frozenset()) -> list[int]:
+	"""
+	Returns the employees having the skill of a mission whose centers are the nearest to it
+	:param instance: the instance
+	:param mission_id: id of the mission
+	:param employees_nb: maximum number of employees returned
+	:param excluded_employees: ids of the employees that cannot be returned
+	:return: the ids of the employees, nearest first
+	"""
+	candidates = [employee_id for employee_id in instance.employees_by_skill.get(instance.missions[mission_id].skill, []) if employee_id not in excluded_employees]
+	candidates.sort(key=lambda employee_id: (instance.departure_distance_table[instance.employees[employee_id].center_id][mission_id], employee_id))
+	return candidates[:employees_nb]
+
+
+def reoptimize(instance: Instance, solution: Solution, size: int, crossover_rate: float, mutation_rate: float, max_execution_time: float, k: int, mutated_genes_per_chromosome_rate: float, unavailable_employees: set[int] = frozenset(), cancelled_missions: set[int] = frozenset(), changed_missions: set[int] = frozenset(), added_missions: set[int] = frozenset(), controller: RunController = None) -> Solution:
+	"""
+	Re-optimises a previous solution after a few changes of the instance, re-solving the schedules of the affected employees only
+	The affected employees are the employees of the cancelled and changed missions, the employees whose schedule is not valid anymore,
+	and, for each added mission and each mission that lost its employee, the REOPTIMIZATION_CANDIDATE_EMPLOYEES nearest employees with its skill
+	The part of the instance made of the affected employees, their missions and the unassigned missions of their skills is solved by the genetic algorithm,
+	starting from the previous assignments, and the other schedules are kept as they are
+	As the fitnesses add up over the employees, an improvement of the part is an improvement of the whole solution
+	The missions keep their ids: a changed mission is edited in place in missions.csv and an added mission is appended to it
+	:param instance: the instance, with the changes
+	:param solution: the previous solution
+	:param size: population size of the genetic algorithm
+	:param crossover_rate: probability of crossover
+	:param mutation_rate: probability of mutation
+	:param max_execution_time: time budget of the genetic algorithm, in seconds
+	:param k: size of the tournaments
+	:param mutated_genes_per_chromosome_rate: rate of the assigned genes to mutate
+	:param unavailable_employees: ids of the employees that cannot work anymore
+	:param cancelled_missions: ids of the missions that are cancelled, left unassigned
+	:param changed_missions: ids of the missions whose day, times, skill or speciality changed
+	:param added_missions: ids of the missions that are not in the previous solution
+	:param controller: controller of the run of the genetic algorithm on the part, a RunController stopping at max_execution_time by default
+	:return: the re-optimised solution
+	"""
+	adapted_solution, dropped_missions = adapt_solution(solution, instance, unavailable_employees, cancelled_missions)
+	affected_employees = {employee_id for mission_id, employee_id in solution.assignments.items() if (mission_id in cancelled_missions or mission_id in changed_missions or mission_id in dropped_missions) and employee_id in instance.employees}
+	affected_employees |= get_invalid_employees(adapted_solution, instance)
+	affected_employees -= set(unavailable_employees)
+
+	# the missions that lost their employee, or never had one, are offered to the nearest employees with their skill
+	pending_missions = (dropped_missions | set(added_missions) | set(changed_missions)) - set(cancelled_missions) - set(adapted_solution.assignments)
+	for mission_id in sorted(pending_missions):
+		if mission_id in instance.missions:
+			affected_employees.update(get_nearest_employees(instance, mission_id, REOPTIMIZATION_CANDIDATE_EMPLOYEES, unavailable_employees))
+
+	employee_ids = sorted(affected_employees)
+	skills = {instance.employees[employee_id].skill for employee_id in employee_ids}
+	mission_ids = []  # missions of the affected employees, and unassigned missions they may take
+	for mission_id, mission in sorted(instance.missions.items()):
+		employee_id = adapted_solution.assignments.get(mission_id)
+		if employee_id in affected_employees or (employee_id is None and mission_id not in cancelled_missions and mission.skill in skills):
+			mission_ids.append(mission_id)
+	print(f"  Re-optimising {len(mission_ids)} missions of {len(employee_ids)} affected employees out of {instance.employees_nb}")
+	if not mission_ids:
+		return adapted_solution
+
+	part = instance.extract(mission_ids, employee_ids)
+	mission_part_ids = {mission_id: part_id for part_id, mission_id in enumerate(mission_ids, 1)}
+	employee_part_ids = {employee_id: part_id for part_id, employee_id in enumerate(employee_ids, 1)}
+	initial_solution = Solution()
+	for mission_id in mission_ids:
+		if mission_id in adapted_solution.assignments:
+			initial_solution.assignments[mission_part_ids[mission_id]] = employee_part_ids[adapted_solution.assignments[mission_id]]
+
+	part_solution = genetic_algorithm(part, size, crossover_rate, mutation_rate, max_execution_time, k, mutated_genes_per_chromosome_rate, controller=controller, initial_solutions=[initial_solution])
+
+	reoptimized_solution = Solution()
+	for mission_id, employee_id in adapted_solution.assignments.items():
+		if employee_id not in affected_employees:
+			reoptimized_solution.assignments[mission_id] = employee_id
+	for part_id, employee_part_id in part_solution.assignments.items():
+		reoptimized_solution.assignments[mission_ids[part_id - 1]] = employee_ids[employee_part_id - 1]
+	return reoptimized_solution
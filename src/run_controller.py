@@ -0,0 +1,182 @@
+from __future__ import annotations
+from time import time
+from models.fitness import Fitness
+
+
+STALL_ACTIONS = ("stop", "restart", "perturb")  # what the genetic algorithm does once the search stalls
+
+
+class RunController:
+	"""
+	Decides when the genetic algorithm stops, and when it restarts or perturbs its population
+	A run stops at its deadline, after a maximum number of iterations, once the best fitness reaches a target,
+	once its number of assignments is within a gap of an upper bound, such as the one of exact_solver.get_assignments_upper_bound,
+	or once it stalls, i.e. the best fitness did not improve for a number of iterations or seconds
+	Instead of stopping when it stalls, the run can spend its remaining budget on a restart from a new population,
+	or on a perturbation of the current population, both keeping the best individual
+	"""
+
+	max_execution_time: float  	# hard deadline of the run, in seconds from its start
+	max_iterations: int  		# maximum number of iterations, None for no limit
+	stall_iterations: int  		# number of iterations without improvement after which the run stalls, None for no limit
+	stall_time: float  			# seconds without improvement after which the run stalls, None for no limit
+	target_fitness: Fitness  	# fitness at which the run stops, None for no target
+	stall_action: str  			# one of STALL_ACTIONS
+	max_restarts: int  			# maximum number of restarts or perturbations, None for no limit, the run stops when it stalls once more
+	upper_bound: int  			# upper bound of the number of missions that can be assigned, None for no bound
+	gap: float  				# the run stops once the best number of assignments is at most this fraction of upper_bound below it
+	start_time: float  			# time at which the run started
+	iterations: int  			# number of iterations run
+	best_fitness: Fitness  		# best fitness seen, None before the first update
+	last_improvement_iteration: int  # iteration of the last improvement, or of the last restart
+	last_improvement_time: float  	# time of the last improvement, or of the last restart
+	restarts: int  				# number of restarts or perturbations done
+	stop_reason: str  			# why the run stopped, None while it runs
+
+
+	def __init__(self, max_execution_time: float, max_iterations: int = None, stall_iterations: int = None, stall_time: float = None, target_fitness: Fitness = None, stall_action: str = "stop", max_restarts: int = None, upper_bound: int = None, gap: float = 0.) -> None:
+		if stall_action not in STALL_ACTIONS:
+			raise ValueError(f"unknown stall action {stall_action}, expected one of {STALL_ACTIONS}")
+		self.max_execution_time = max_execution_time
+		self.max_iterations = max_iterations
+		self.stall_iterations = stall_iterations
+		self.stall_time = stall_time
+		self.target_fitness = target_fitness
+		self.stall_action = stall_action
+		self.max_restarts = max_restarts
+		self.upper_bound = upper_bound
+		self.gap = gap
+		self.start()
+
+
+	def start(self) -> None:
+		"""
+		Starts the clock of the run, and forgets the previous run
+		"""
+		self.start_time = time()
+		self.iterations = 0
+		self.best_fitness = None
+		self.last_improvement_iteration = 0
+		self.last_improvement_time = self.start_time
+		self.restarts = 0
+		self.stop_reason = None
+
+
+	def update(self, best_fitness: Fitness) -> bool:
+		"""
+		Records the best fitness of the population after an iteration, or of the initial population
+		:param best_fitness: best fitness of the population
+		:return: True if it improved the best fitness seen, False otherwise
+		"""
+		if self.best_fitness is not None and best_fitness <= self.best_fitness:
+			return False
+		self.best_fitness = best_fitness
+		self.last_improvement_iteration = self.iterations
+		self.last_improvement_time = time()
+		return True
+
+
+	def next_iteration(self) -> None:
+		"""
+		Counts an iteration
+		"""
+		self.iterations += 1
+
+
+	def is_stalled(self) -> bool:
+		"""
+		Checks whether the best fitness did not improve for stall_iterations iterations or stall_time seconds
+		:return: True if the run stalls, False otherwise
+		"""
+		return (self.stall_iterations is not None and self.iterations - self.last_improvement_iteration >= self.stall_iterations) \
+				or (self.stall_time is not None and time() - self.last_improvement_time >= self.stall_time)
+
+
+	def can_restart(self) -> bool:
+		"""
+		Checks whether a stall restarts or perturbs the population instead of stopping the run
+		:return: True if a restart is left, False otherwise
+		"""
+		return self.stall_action != "stop" and (self.max_restarts is None or self.restarts < self.max_restarts)
+
+
+	def should_restart(self) -> bool:
+		"""
+		Checks whether the run stalls and should restart or perturb its population instead of stopping
+		A restart is counted, and the stall counters start again from the current iteration
+		:return: True if the population should be restarted or perturbed, False otherwise
+		"""
+		if not self.can_restart() or not self.is_stalled():
+			return False
+		self.restarts += 1
+		self.last_improvement_iteration = self.iterations
+		self.last_improvement_time = time()
+		return True
+
+
+	def should_stop(self) -> bool:
+		"""
+		Checks the stop conditions, and records the reason of the stop
+		:return: True if the run should stop, False otherwise
+		"""
+		if time() - self.start_time >= self.max_execution_time:
+			self.stop_reason = "deadline"
+		elif self.max_iterations is not None and self.iterations >= self.max_iterations:
+			self.stop_reason = "iterations"
+		elif self.target_fitness is not None and self.best_fitness is not None and self.best_fitness >= self.target_fitness:
+			self.stop_reason = "target"
+		elif self.upper_bound is not None and self.best_fitness is not None and self.upper_bound - self.best_fitness.assignments_nb <= self.gap * self.upper_bound:
+			self.stop_reason = "gap"
+		elif self.is_stalled() and not self.can_restart():
+			self.stop_reason = "stall"
+		return self.stop_reason is not None
+
+
+	def get_state(self) -> dict[str, float]:
+		"""
+		Returns the counters of the run, to resume it later with set_state()
+		The times are saved relative to the start of the run, so that a resumed run keeps its remaining budget
+		:return: the counters by name
+		"""
+		now = time()
+		state = {
+			"iterations": self.iterations,
+			"elapsed_time": now - self.start_time,
+			"last_improvement_iteration": self.last_improvement_iteration,
+			"time_since_improvement": now - self.last_improvement_time,
+			"restarts": self.restarts
+		}
+		if self.best_fitness is not None:
+			state.update(best_assignments_nb=self.best_fitness.assignments_nb, best_travel_cost=self.best_fitness.travel_cost, best_specialities_nb=self.best_fitness.specialities_nb)
+		return state
+
+
+	def set_state(self, state: dict[str, float]) -> None:
+		"""
+		Resumes a run from the counters returned by get_state()
+		:param state: the counters by name
+		"""
+		now = time()
+		self.start_time = now - state["elapsed_time"]
+		self.iterations = int(state["iterations"])
+		self.last_improvement_iteration = int(state["last_improvement_iteration"])
+		self.last_improvement_time = now - state["time_since_improvement"]
+		self.restarts = int(state["restarts"])
+		self.best_fitness = Fitness(int(state["best_assignments_nb"]), int(state["best_travel_cost"]), int(state["best_specialities_nb"])) if "best_assignments_nb" in state else None
+		self.stop_reason = None
+
+
+	def get_elapsed_time(self) -> float:
+		"""
+		Returns the time since the start of the run
+		:return: the time in seconds
+		"""
+		return time() - self.start_time
+
+
+	def __str__(self) -> str:
+		return f"{self.iterations} iterations, {self.restarts} restarts, stopped by {self.stop_reason}" if self.stop_reason is not None else f"{self.iterations} iterations, {self.restarts} restarts, running"
+
+
+	def __repr__(self) -> str:
+		return self.__str__()
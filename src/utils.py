@@ -1,9 +1,17 @@
 import csv
 from pathlib import Path
+import numpy as np
 from models.mission import Mission
 from models.employee import Employee
 from models.center import Center
+from models.instance import Instance
+from models.distance_provider import DistanceProvider, DenseDistanceProvider, CoordinatesDistanceProvider, SparseDistanceProvider
 from models.solution import Solution
+from models.fitness import Fitness
+from instance_cache import open_cached_array
+
+
+DISTANCE_MODELS = ("auto", "dense", "coordinates", "sparse")
 
 
 def open_missions_csv(path_to_folder: Path) -> dict[int, Mission]:
@@ -60,6 +68,70 @@ def open_distances_matrix(path_to_folder: Path) -> list[list[float]]:
 		for row in reader:
 			distances.append([float(x) for x in row])
 	return distances
+
+
+def open_coordinates_csv(path_to_folder: Path) -> np.ndarray:
+	"""
+	Opens the coordinates csv file, one row per point in the order of the distance matrix (centers first, then missions)
+	:param path_to_folder: path to the folder of the csv file
+	:return: array of shape (points, 2), planar positions in km or latitudes and longitudes in degrees
+	"""
+	return np.loadtxt(path_to_folder / "coordinates.csv", delimiter=",", ndmin=2)
+
+
+def open_sparse_distances_csv(path_to_folder: Path) -> np.ndarray:
+	"""
+	Opens the sparse distances csv file, one row per given distance as origin,destination,distance
+	The origin and destination are indices of points in the order of the distance matrix
+	:param path_to_folder: path to the folder of the csv file
+	:return: array of shape (distances, 3) of the origins, destinations and distances
+	"""
+	return np.loadtxt(path_to_folder / "sparse_distances.csv", delimiter=",", ndmin=2)
+
+
+def open_distance_provider(path_to_folder: Path, centers_nb: int, distance_model: str = "auto", metric: str = "euclidean", use_cache: bool = True) -> DistanceProvider:
+	"""
+	Opens the distances of an instance folder with the chosen distance model
+	"dense" reads the full matrix of distances.csv, "coordinates" computes the distances from coordinates.csv,
+	"sparse" reads the distances of sparse_distances.csv and computes the missing ones from coordinates.csv,
+	"auto" picks the first of dense, sparse and coordinates whose files exist in the folder
+	The csv files are compiled once into a memory-mapped binary cache, see instance_cache.open_cached_array()
+	:param path_to_folder: path to the folder of the instance
+	:param centers_nb: number of centers of the instance
+	:param distance_model: one of DISTANCE_MODELS
+	:param metric: metric of the coordinates, "euclidean" for positions in km, "haversine" for latitudes and longitudes
+	:param use_cache: False to always parse the csv files
+	:return: the distance provider
+	"""
+	if distance_model == "auto":
+		if (path_to_folder / "distances.csv").exists():
+			distance_model = "dense"
+		elif (path_to_folder / "sparse_distances.csv").exists():
+			distance_model = "sparse"
+		else:
+			distance_model = "coordinates"
+
+	if distance_model == "dense":
+		return DenseDistanceProvider(open_cached_array(path_to_folder, "distances.csv", lambda folder: np.array(open_distances_matrix(folder), dtype=np.float64), use_cache), centers_nb)
+	if distance_model == "coordinates":
+		return CoordinatesDistanceProvider(open_cached_array(path_to_folder, "coordinates.csv", open_coordinates_csv, use_cache), centers_nb, metric)
+	if distance_model == "sparse":
+		sparse_distances = open_cached_array(path_to_folder, "sparse_distances.csv", open_sparse_distances_csv, use_cache)
+		return SparseDistanceProvider(open_cached_array(path_to_folder, "coordinates.csv", open_coordinates_csv, use_cache), centers_nb, sparse_distances[:, 0].astype(np.int64), sparse_distances[:, 1].astype(np.int64), sparse_distances[:, 2], metric)
+	raise ValueError(f"unknown distance model {distance_model}, expected one of {DISTANCE_MODELS}")
+
+
+def open_instance(path_to_folder: Path, distance_model: str = "auto", metric: str = "euclidean", use_cache: bool = True) -> Instance:
+	"""
+	Opens all the csv files of an instance folder and precompiles them in an Instance
+	:param path_to_folder: path to the folder of the instance
+	:param distance_model: how the distances are read or computed, see open_distance_provider()
+	:param metric: metric of the coordinates, see open_distance_provider()
+	:param use_cache: False to always parse the csv files instead of using the binary cache
+	:return: the instance
+	"""
+	centers = open_centers_csv(path_to_folder)
+	return Instance(open_employees_csv(path_to_folder), open_missions_csv(path_to_folder), centers, open_distance_provider(path_to_folder, len(centers), distance_model, metric, use_cache))
 	
 
 def prompt_instance_parameters() -> list[int|int]:
@@ -145,7 +217,7 @@ def prompt_genetic_algorithm_parameters(default_size: int, default_crossover_rat
 	return size, crossover_rate, mutation_rate, max_execution_time, k, mutated_genes_per_chromosome_rate
 		
 
-def save_solution_assignments(solution: Solution, missions: dict[Mission], employees: dict[int, Employee], instance_path: Path, evaluation: float) -> None:
+def save_solution_assignments(solution: Solution, missions: dict[Mission], employees: dict[int, Employee], instance_path: Path, evaluation: Fitness) -> None:
 	"""
 	Saves the assignments of a solution in a .csv file
 
@@ -156,17 +228,19 @@ def save_solution_assignments(solution: Solution, missions: dict[Mission], emplo
 	:param evaluation: evaluation of the solution
 	"""
 
-	fitnesses = get_solution_individual_fitnesses(evaluation)
-
 	# make sure to create a new file if there is already a solution.csv file
-	file_name = "solution0.csv"
-
-	while (instance_path / file_name).exists():
-		file_name = f"solution{int(file_name[8]) + 1}.csv"
-
-	with open(instance_path / file_name, 'w') as f:
+	# the file is opened in exclusive mode, so that processes saving solutions of the same instance at once never pick the same file
+	solution_nb = 0
+	while True:
+		try:
+			f = open(instance_path / f"solution{solution_nb}.csv", 'x')
+			break
+		except FileExistsError:
+			solution_nb += 1
+
+	with f:
 		f.write(f"assignments_nb,travel_cost,corresponding_specialities_nb\n")
-		f.write(f"{fitnesses[0]},{fitnesses[1]},{fitnesses[2]}\n")
+		f.write(f"{evaluation.assignments_nb},{evaluation.travel_cost},{evaluation.specialities_nb}\n")
 		f.write(f"mission_id,employee_id,center_id\n")
 		for i in range(1, len(missions) + 1):
 			if i in solution.assignments:
@@ -175,6 +249,24 @@ def save_solution_assignments(solution: Solution, missions: dict[Mission], emplo
 				f.write(f"{missions[i].id},0,0\n")
 
 
+def open_solution_csv(path: Path) -> Solution:
+	"""
+	Opens a solution file written by save_solution_assignments
+	The fitnesses written in the file are not read, as the instance may have changed since the solution was saved
+	:param path: path to the solution file
+	:return: the solution, with the ids of the file
+	"""
+	solution = Solution()
+	with open(path, newline='') as csvfile:
+		reader = csv.reader(csvfile)
+		for _ in range(3):  # header and values of the fitnesses, then header of the assignments
+			next(reader)
+		for row in reader:
+			if row and int(row[1]) != 0:
+				solution.assignments[int(row[0])] = int(row[1])
+	return solution
+
+
 def print_solution_assignments(solution: Solution, missions: dict[Mission], employees: dict[int, Employee]) -> None:
 	"""
 	Prints the solution in a readable way
@@ -189,21 +281,11 @@ def print_solution_assignments(solution: Solution, missions: dict[Mission], empl
 			print(f"Mission {missions[i].id} not assigned")
 
 
-def get_solution_individual_fitnesses(evaluation: float) -> tuple[int|int|int]:
-	"""
-	Returns the individual fitnesses of a solution
-	:param evaluation: evaluation of the solution
-	:return: tuple of the individual fitnesses
-	"""
-	return int(evaluation // 1e8), int(1e5 - int(evaluation % 1e8 / 1e3)), int(evaluation % 1e3)
-
-
-def print_solution_evaluation(evaluation: float) -> None:
+def print_solution_evaluation(evaluation: Fitness) -> None:
 	"""
 	Prints the solution evaluation in a readable way
-	:param solution: solution to print
+	:param evaluation: fitness of the solution
 	"""
-	individual_fitnesses = get_solution_individual_fitnesses(evaluation)
-	print(f"Number of missions assigned: {individual_fitnesses[0]}")
-	print(f"Total travel cost of the employees: {individual_fitnesses[1]}")
-	print(f"Number of corresponding specialities: {individual_fitnesses[2]}")
+	print(f"Number of missions assigned: {evaluation.assignments_nb}")
+	print(f"Total travel cost of the employees: {evaluation.travel_cost}")
+	print(f"Number of corresponding specialities: {evaluation.specialities_nb}")
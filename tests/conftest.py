@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the modules of the solver import each other from src, as when it is run from there
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,55 @@
+from pathlib import Path
+import random
+import numpy as np
+from models.fitness import Fitness, make_fitnesses
+from models.population import Population
+from fitness_cache import FitnessCache
+from checkpoint import Checkpoint
+from utils import open_instance
+from genetic_algorithm import genetic_algorithm
+
+
+INSTANCES_PATH = Path(__file__).resolve().parents[1] / "src" / "instances"
+
+
+def test_checkpoint_round_trip(tmp_path: Path) -> None:
+	population = Population(np.array([[1, 0, 2], [2, 1, 0]], dtype=np.int32), make_fitnesses(np.array([2, 2]), np.array([10, 12]), np.array([1, 0])))
+	fitness_cache = FitnessCache(10)
+	fitness_cache.put(2**64 - 1, (True, Fitness(2, 10, 1)))
+	fitness_cache.put(5, (False, Fitness(3, 7, 2)))
+	random.seed(3)
+	np.random.seed(3)
+	Checkpoint(population, population.assignments[0].copy(), fitness_cache, {2**64 - 1}, {"iterations": 4., "elapsed_time": 1.5}).save(tmp_path / "checkpoint.npz")
+	expected_random, expected_numpy_random = random.random(), np.random.random()
+
+	checkpoint = Checkpoint.load(tmp_path / "checkpoint.npz", 3)
+	assert np.array_equal(checkpoint.population.assignments, population.assignments)
+	assert np.array_equal(checkpoint.population.fitnesses, population.fitnesses)
+	assert dict(checkpoint.fitness_cache.entries) == dict(fitness_cache.entries)
+	assert checkpoint.searched == {2**64 - 1}
+	assert checkpoint.counters == {"iterations": 4., "elapsed_time": 1.5}
+	checkpoint.restore_random_states()
+	assert (random.random(), np.random.random()) == (expected_random, expected_numpy_random)
+
+
+def test_resume_matches_uninterrupted_run(tmp_path: Path) -> None:
+	instance = open_instance(INSTANCES_PATH / "30Missions-2centres", use_cache=False)
+	checkpoint_path = tmp_path / "checkpoint.npz"
+
+	def run(iterations: int, checkpoint: Path = None, resume: bool = False) -> np.ndarray:
+		solution = genetic_algorithm(instance, 30, .7, .8, 1000, 5, .025, max_iterations=iterations, local_search_elites=1, checkpoint_path=checkpoint, checkpoint_interval=0, resume=resume)
+		return solution.to_array(instance.missions_nb)
+
+	random.seed(0)
+	np.random.seed(0)
+	uninterrupted = run(40)
+
+	random.seed(0)
+	np.random.seed(0)
+	run(20, checkpoint_path)
+	# the resumed run draws its random numbers from the states saved in the checkpoint
+	random.seed(1)
+	np.random.seed(1)
+	resumed = run(40, checkpoint_path, True)
+
+	assert np.array_equal(resumed, uninterrupted)
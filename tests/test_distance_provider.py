@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from config import TRAVEL_SPEED
+from models.distance_provider import DistanceProvider, DenseDistanceProvider, CoordinatesDistanceProvider, SparseDistanceProvider, SubsetDistanceProvider
+
+
+CENTERS_NB = 2
+MISSIONS_NB = 20
+
+
+def get_coordinates(metric: str) -> np.ndarray:
+	"""
+	Draws the positions of the centers and the missions, in km for the euclidean metric and in degrees for the haversine one
+	:param metric: metric of the positions
+	:return: array of shape (points, 2), the centers first, then the missions
+	"""
+	generator = np.random.default_rng(0)
+	if metric == "euclidean":
+		return generator.uniform(0, 100, (CENTERS_NB + MISSIONS_NB, 2))
+	return np.stack((generator.uniform(43, 49, CENTERS_NB + MISSIONS_NB), generator.uniform(-1, 7, CENTERS_NB + MISSIONS_NB)), axis=1)
+
+
+def get_sparse_provider(metric: str) -> SparseDistanceProvider:
+	"""
+	Builds a sparse provider with some distances given in one direction only, and one given in both directions with different values
+	:param metric: metric of the positions
+	:return: the provider
+	"""
+	return SparseDistanceProvider(get_coordinates(metric), CENTERS_NB, [0, 3, 5, 7, 8], [4, 9, 2, 8, 7], [12.5, 7., 40., 3., 4.], metric, 1.5)
+
+
+def get_providers() -> list[DistanceProvider]:
+	"""
+	:return: a provider of each kind
+	"""
+	coordinates = CoordinatesDistanceProvider(get_coordinates("euclidean"), CENTERS_NB)
+	return [
+		coordinates,
+		CoordinatesDistanceProvider(get_coordinates("haversine"), CENTERS_NB, "haversine"),
+		get_sparse_provider("euclidean"),
+		get_sparse_provider("haversine"),
+		DenseDistanceProvider(get_full_matrix(coordinates), CENTERS_NB),
+		SubsetDistanceProvider(get_sparse_provider("euclidean"), np.array([3, 1, 17, 8, 20])),
+	]
+
+
+def get_full_matrix(provider: DistanceProvider) -> np.ndarray:
+	"""
+	:param provider: the provider
+	:return: the matrix of the distances between all the points, computed with the vectorized distances
+	"""
+	points_nb = provider.centers_nb + provider.missions_nb
+	origins, destinations = np.meshgrid(np.arange(points_nb), np.arange(points_nb), indexing="ij")
+	return provider.get_distances(origins, destinations)
+
+
+@pytest.mark.parametrize("provider", get_providers(), ids=lambda provider: type(provider).__name__)
+def test_vectorized_distances_match_scalar_distances(provider: DistanceProvider) -> None:
+	matrix = get_full_matrix(provider)
+	points_nb = provider.centers_nb + provider.missions_nb
+	for origin in range(points_nb):
+		for destination in range(points_nb):
+			assert matrix[origin, destination] == provider.get_distance(origin, destination)
+
+	table = provider.get_mission_distance_table(TRAVEL_SPEED)
+	departure_distances = provider.get_departure_distances()
+	return_distances = provider.get_return_distances()
+	for mission_id in range(1, provider.missions_nb + 1):
+		mission = mission_id + provider.centers_nb - 1
+		for destination_mission_id in range(1, provider.missions_nb + 1):
+			assert table[mission_id][destination_mission_id] == matrix[mission, destination_mission_id + provider.centers_nb - 1] / TRAVEL_SPEED
+		for center_id in range(1, provider.centers_nb + 1):
+			assert departure_distances[center_id, mission_id] == matrix[center_id - 1, mission]
+			assert return_distances[mission_id, center_id] == matrix[mission, center_id - 1]
+
+
+@pytest.mark.parametrize("metric", CoordinatesDistanceProvider.METRICS)
+def test_sparse_distances(metric: str) -> None:
+	provider = get_sparse_provider(metric)
+	reference = CoordinatesDistanceProvider(get_coordinates(metric), CENTERS_NB, metric)
+	given = {(0, 4): 12.5, (4, 0): 12.5, (3, 9): 7., (9, 3): 7., (5, 2): 40., (2, 5): 40., (7, 8): 3., (8, 7): 4.}
+	matrix = get_full_matrix(provider)
+	reference_matrix = get_full_matrix(reference)
+	for origin in range(CENTERS_NB + MISSIONS_NB):
+		for destination in range(CENTERS_NB + MISSIONS_NB):
+			expected = given.get((origin, destination), 1.5 * reference_matrix[origin, destination])
+			assert matrix[origin, destination] == expected
+
+
+def test_subset_distances_match_provider() -> None:
+	provider = get_sparse_provider("euclidean")
+	mission_ids = np.array([3, 1, 17, 8, 20])
+	subset = SubsetDistanceProvider(provider, mission_ids)
+	points = np.concatenate((np.arange(CENTERS_NB), mission_ids + CENTERS_NB - 1))
+	assert np.array_equal(get_full_matrix(subset), get_full_matrix(provider)[np.ix_(points, points)])
@@ -0,0 +1,32 @@
+from itertools import product
+from pathlib import Path
+from models.solution import Solution
+from exact_solver import solve_exact
+from utils import open_instance
+
+
+INSTANCES_PATH = Path(__file__).resolve().parents[1] / "src" / "instances"
+
+
+def test_solve_exact_matches_brute_force() -> None:
+	instance = open_instance(INSTANCES_PATH / "30Missions-2centres", use_cache=False)
+	skill = instance.missions[1].skill
+	mission_ids = [mission_id for mission_id in instance.chronological_order.tolist() if instance.missions[mission_id].skill == skill][:8]
+	employee_ids = instance.employees_by_skill[skill][:2]
+	part = instance.extract(mission_ids, employee_ids)
+
+	best_fitness = None
+	for choices in product(range(part.employees_nb + 1), repeat=part.missions_nb):
+		solution = Solution()
+		for mission_id, employee_id in enumerate(choices, 1):
+			if employee_id != 0:
+				solution.assignments[mission_id] = employee_id
+		if solution.is_valid(part):
+			fitness = solution.get_fitness(part)
+			best_fitness = fitness if best_fitness is None or fitness > best_fitness else best_fitness
+
+	solution, upper_bound, is_optimal = solve_exact(part)
+	assert is_optimal
+	assert solution.is_valid(part)
+	assert solution.get_fitness(part) == best_fitness
+	assert upper_bound == best_fitness.assignments_nb
@@ -0,0 +1,22 @@
+from itertools import product
+from random import Random
+import numpy as np
+from models.fitness import Fitness, make_fitnesses, get_fitness_keys
+
+
+def check_keys_order(fitnesses: list[Fitness]) -> None:
+	"""
+	Checks that the keys of some fitnesses are ordered as the fitnesses
+	:param fitnesses: the fitnesses
+	"""
+	keys = get_fitness_keys(make_fitnesses(*(np.array(values, dtype=np.int64) for values in zip(*fitnesses)))).tolist()
+	for (fitness1, key1), (fitness2, key2) in product(zip(fitnesses, keys), repeat=2):
+		assert (key1 < key2) == (fitness1 < fitness2)
+		assert (key1 == key2) == (fitness1.get_key() == fitness2.get_key())
+
+
+def test_fitness_keys_order() -> None:
+	rng = Random(0)
+	check_keys_order([Fitness(rng.randint(0, 5), rng.randint(0, 20), rng.randint(0, 5)) for _ in range(60)])
+	# the product of the ranges exceeds 63 bits, the keys are the ranks of the fitnesses
+	check_keys_order([Fitness(rng.randint(0, 2**40), rng.choice((0, 2**40, rng.randint(0, 2**40))), rng.randint(0, 3)) for _ in range(60)])
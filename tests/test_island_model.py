@@ -0,0 +1,15 @@
+from random import Random
+import numpy as np
+from models.fitness import make_fitnesses
+from models.population import Population
+from island_model import TOPOLOGIES, migrate
+
+
+def test_migrate_keeps_island_sizes() -> None:
+	for topology in TOPOLOGIES:
+		populations = [Population(np.full((4, 3), island, dtype=np.int32), make_fitnesses(np.array([5, 4, 3, 2]), np.ones(4, dtype=np.int64), np.zeros(4, dtype=np.int64))) for island in range(3)]
+		# more migrants than individuals, several sources with the fully connected topology
+		migrate(populations, 6, topology, Random(0))
+		assert [len(population) for population in populations] == [4, 4, 4]
+		for population in populations:
+			assert np.all(np.diff(population.fitnesses["assignments_nb"]) <= 0)
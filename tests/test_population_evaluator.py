@@ -0,0 +1,39 @@
+from pathlib import Path
+import random
+import numpy as np
+import pytest
+from models.fitness import Fitness
+from models.solution import Solution
+from population_evaluator import PopulationEvaluator
+from genetic_algorithm_utils import get_nearest_neighbour_solution, crossover_assignments, mutate_assignments
+from utils import open_instance
+
+
+INSTANCES_PATH = Path(__file__).resolve().parents[1] / "src" / "instances"
+
+
+@pytest.mark.parametrize("instance_name", ["30Missions-2centres", "94Missions-3centres", "200Missions-2centres"])
+def test_evaluate_matches_scalar_evaluation(instance_name: str) -> None:
+	instance = open_instance(INSTANCES_PATH / instance_name, use_cache=False)
+	random.seed(0)
+	np.random.seed(0)
+	parents = np.array([get_nearest_neighbour_solution(instance).to_array(instance.missions_nb) for _ in range(20)])
+	children1, children2 = crossover_assignments(parents, parents[::-1])
+	children = np.concatenate((children1, children2))
+	for child in children[::2]:
+		mutate_assignments(child, instance, .05)
+	# a few genes mutated in a valid solution often keep it valid, unlike a crossover
+	mutants = parents.copy()
+	for mutant in mutants:
+		mutate_assignments(mutant, instance, .01)
+	assignments = np.concatenate((parents, mutants, children))
+
+	is_valid, fitnesses = PopulationEvaluator(instance).evaluate(assignments)
+	# the nearest neighbour solutions are valid, the children may not be
+	assert is_valid[:len(parents)].all()
+	assert is_valid[len(parents):].any() and not is_valid.all()
+	for individual_assignments, individual_is_valid, fitness in zip(assignments, is_valid, fitnesses):
+		solution = Solution.from_array(individual_assignments)
+		assert individual_is_valid == solution.is_valid(instance)
+		if individual_is_valid:
+			assert Fitness.from_record(fitness) == solution.get_fitness(instance)
@@ -0,0 +1,52 @@
+from pathlib import Path
+import random
+import pytest
+from models.instance import Instance
+from models.solution import Solution
+from genetic_algorithm_utils import get_nearest_neighbour_solution
+from utils import open_instance
+
+
+INSTANCES_PATH = Path(__file__).resolve().parents[1] / "src" / "instances"
+
+
+def check_matches_scalar_evaluation(solution: Solution, instance: Instance) -> bool:
+	"""
+	Checks that the incremental evaluation of a solution gives the validity and the fitness of the scalar one
+	:param solution: the solution, with its incremental evaluation enabled
+	:param instance: the instance
+	:return: True if the solution is valid, False otherwise
+	"""
+	reference = Solution()
+	reference.assignments = dict(solution.assignments)
+	is_valid = reference.is_valid(instance)
+	assert solution.is_valid(instance) == is_valid
+	if is_valid:
+		assert solution.get_fitness(instance) == reference.get_fitness(instance)
+	return is_valid
+
+
+@pytest.mark.parametrize("instance_name", ["30Missions-2centres", "94Missions-3centres"])
+def test_incremental_evaluation_matches_scalar_evaluation(instance_name: str) -> None:
+	instance = open_instance(INSTANCES_PATH / instance_name, use_cache=False)
+	random.seed(0)
+	solution = get_nearest_neighbour_solution(instance)
+	solution.enable_incremental_evaluation(instance)
+	assert check_matches_scalar_evaluation(solution, instance)
+
+	valid_mutants_nb = 0
+	for _ in range(100):
+		# the mutants are copies, so the state of the solution must not be changed by their mutations
+		mutant = solution.copy()
+		mutant.mutate(instance, .01)
+		valid_mutants_nb += check_matches_scalar_evaluation(mutant, instance)
+		assert check_matches_scalar_evaluation(solution, instance)
+	assert valid_mutants_nb > 0
+
+	for _ in range(50):
+		solution.mutate(instance, .02)
+		check_matches_scalar_evaluation(solution, instance)
+
+	for mission_id in list(solution.assignments)[::3]:
+		solution.unassign(mission_id)
+		check_matches_scalar_evaluation(solution, instance)